@@ -1,16 +1,31 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_from_directory
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_from_directory, g, has_app_context, has_request_context, Response, stream_with_context
 from werkzeug.security import generate_password_hash, check_password_hash
+import base64
+import hmac
 import json
+import math
 from pathlib import Path
 import sqlite3
 from sqlite3 import Connection
 import os
-import random
 from datetime import datetime, timedelta
 import threading
 import time
-import smtplib
-from email.message import EmailMessage
+
+from cache import TTLCache
+from db import ConnectionPool
+from intervals import DaySchedule, overlap_error
+from janitor import Janitor
+from leases import LeaderLease
+from mailer import Mailer
+from metrics import RequestMetrics, render_stats
+from migrations import run_migrations, REMIND_AT_EPOCH_SQL, SYNC_TABLES
+from moods import DEFAULT_MOOD, MOOD_SCORES
+from outbox import CoalescingGate, OutboxDispatcher, enqueue_email
+from scheduler import DeadlineScheduler
+from sqltrace import SQLTracer
+from tips import pick_wellness_tip
+from units import compute_bmi, parse_height, parse_number, parse_weight
 
 
 
@@ -18,41 +33,77 @@ from email.message import EmailMessage
 app = Flask(__name__)
 app.secret_key = os.environ.get('MOMCARE_SECRET', 'change-this-secret-for-production')
 
-DB_PATH = Path(__file__).parent / 'users.db'
+DB_PATH = Path(os.environ.get('MOMCARE_DB_PATH') or Path(__file__).parent / 'users.db')
 
 
-def get_db() -> Connection:
-    # Create a short-lived connection with a higher timeout and pragmatic settings
-    # to reduce "database is locked" errors under concurrent access.
-    conn = sqlite3.connect(DB_PATH, timeout=30)
-    conn.row_factory = sqlite3.Row
-    try:
-        # Enable WAL mode for better concurrency (writers don't block readers)
-        conn.execute('PRAGMA journal_mode=WAL;')
-        # Moderate synchronous to improve performance while WAL is active
-        conn.execute('PRAGMA synchronous=NORMAL;')
-        # Enable foreign keys if used
-        conn.execute('PRAGMA foreign_keys=ON;')
-    except Exception:
-        # best-effort; don't fail if PRAGMA isn't supported
-        pass
-    return conn
+request_metrics = RequestMetrics()
+
+
+# Slow statements (MOMCARE_SLOW_QUERY_MS) are kept in memory; create_app()
+# also opens the rotating slow-query log (SLOW_QUERY_LOG).
+sql_tracer = SQLTracer(
+    slow_ms=float(os.environ.get('MOMCARE_SLOW_QUERY_MS', 100)),
+    repeat_threshold=int(os.environ.get('MOMCARE_SQL_REPEAT_THRESHOLD', 10)),
+)
 
-def cleanup_old_tasks(user_email: str):
-    """Delete tasks appearing strictly before today's local date."""
-    if not user_email:
-        return
-    try:
-        conn = get_db()
-        cur = conn.cursor()
-        today_iso = datetime.now().strftime('%Y-%m-%d')
-        # Only delete tasks from previous days if they are COMPLETED.
-        # This allows pending tasks to carry over.
-        cur.execute('DELETE FROM tasks WHERE user_email = ? AND task_date < ? AND completed = 1', (user_email, today_iso))
-        conn.commit()
-        conn.close()
-    except Exception:
-        pass
+
+def record_query(sql, seconds, rows):
+    in_request = has_request_context() and '_sql_count' in g
+    route = request.endpoint if in_request else threading.current_thread().name
+    normalized = sql_tracer.record(sql, seconds, rows, route)
+    # Statements run by background threads have no request to charge
+    if in_request:
+        g._sql_count += 1
+        g._sql_seconds += seconds
+        g._sql_statements[normalized] = g._sql_statements.get(normalized, 0) + 1
+
+
+db_pool = ConnectionPool(DB_PATH, max_connections=int(os.environ.get('MOMCARE_DB_POOL_SIZE', 8)), on_query=record_query)
+
+
+def get_db() -> Connection:
+    # Inside a request every caller shares one pooled connection bound to
+    # flask.g; it goes back to the pool when the app context tears down.
+    # Outside a request (startup, scripts) the pool reuses the calling
+    # thread's connection and conn.close() hands it back.
+    if has_app_context():
+        conn = g.get('_db_conn')
+        if conn is not None:
+            db_pool.note_reuse()
+            return conn
+        conn = db_pool.acquire()
+        conn._pinned = True
+        g._db_conn = conn
+        return conn
+    return db_pool.acquire()
+
+
+@app.before_request
+def start_request_timer():
+    g._request_started = time.perf_counter()
+    g._sql_count = 0
+    g._sql_seconds = 0.0
+    g._sql_statements = {}
+
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('_request_started')
+    if started is not None:
+        # Streamed bodies (GET /api/tasks) are timed up to their first byte
+        size = None if response.is_streamed else response.calculate_content_length()
+        request_metrics.observe(request.endpoint or 'unmatched', request.method, response.status_code,
+                                time.perf_counter() - started, g._sql_count, g._sql_seconds, size)
+        sql_tracer.check_repeats(request.endpoint or 'unmatched', g._sql_statements)
+    return response
+
+
+@app.teardown_appcontext
+def release_db(exc):
+    conn = g.pop('_db_conn', None)
+    if conn is not None:
+        conn._pinned = False
+        db_pool.release(conn)
 
 
 def month_iso_or_current() -> str:
@@ -72,329 +123,12 @@ def month_iso_or_current() -> str:
 
 
 def init_db():
-    """Create users table if it doesn't exist, and migrate from users.json if present."""
+    """Bring users.db up to the current schema version (see migrations.py)."""
     conn = get_db()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            first TEXT NOT NULL,
-            last TEXT NOT NULL,
-            email TEXT NOT NULL UNIQUE,
-            birthdate TEXT,
-            password_hash TEXT NOT NULL,
-            security_question TEXT,
-            security_answer TEXT,
-            gender TEXT,
-            height TEXT,
-            weight TEXT,
-            profile_picture TEXT
-        )
-        """
-    )
-    # Ensure older DBs have the expected security columns
-    try:
-        cur.execute("PRAGMA table_info(users)")
-        user_cols = [r[1] for r in cur.fetchall()]
-        if 'security_question' not in user_cols:
-            try:
-                cur.execute("ALTER TABLE users ADD COLUMN security_question TEXT")
-            except Exception:
-                pass
-        if 'security_answer' not in user_cols:
-            try:
-                cur.execute("ALTER TABLE users ADD COLUMN security_answer TEXT")
-            except Exception:
-                pass
-        if 'gender' not in user_cols:
-            try:
-                cur.execute("ALTER TABLE users ADD COLUMN gender TEXT")
-            except Exception:
-                pass
-        if 'height' not in user_cols:
-            try:
-                cur.execute("ALTER TABLE users ADD COLUMN height TEXT")
-            except Exception:
-                pass
-        if 'weight' not in user_cols:
-            try:
-                cur.execute("ALTER TABLE users ADD COLUMN weight TEXT")
-            except Exception:
-                pass
-        if 'profile_picture' not in user_cols:
-            try:
-                cur.execute("ALTER TABLE users ADD COLUMN profile_picture TEXT")
-            except Exception:
-                pass
-            try:
-                cur.execute("ALTER TABLE users ADD COLUMN profile_picture TEXT")
-            except Exception:
-                pass
-    except Exception:
-        # best-effort, proceed without failing init
-        pass
-
-    # Migration for expenses table (is_eco)
     try:
-        cur.execute("PRAGMA table_info(expenses)")
-        exp_cols = [r[1] for r in cur.fetchall()]
-        if 'is_eco' not in exp_cols:
-            try:
-                cur.execute("ALTER TABLE expenses ADD COLUMN is_eco INTEGER DEFAULT 0")
-            except Exception:
-                pass
-    except Exception:
-        pass
-  
-    # Create monthly_budgets table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS monthly_budgets (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_email TEXT NOT NULL,
-            month_iso TEXT NOT NULL,
-            income REAL DEFAULT 0,
-            budget_limit REAL DEFAULT 0,
-            month INTEGER,
-            year INTEGER,
-            created_at TEXT,
-            UNIQUE(user_email, month_iso)
-        )
-        """
-    )
-
-
-    # Create tasks table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_email TEXT NOT NULL,
-            title TEXT NOT NULL,
-            start_time REAL,
-            duration REAL,
-            color TEXT,
-            is_priority INTEGER DEFAULT 0,
-            task_date TEXT,
-            completed INTEGER DEFAULT 0,
-            notified INTEGER DEFAULT 0,
-            created_at TEXT
-        )
-        """
-    )
-
-    # Add notified column to existing tasks table if it doesn't exist
-    try:
-        cur.execute("PRAGMA table_info(tasks)")
-        task_cols = [r[1] for r in cur.fetchall()]
-        if 'notified' not in task_cols:
-            try:
-                cur.execute("ALTER TABLE tasks ADD COLUMN notified INTEGER DEFAULT 0")
-            except Exception:
-                pass
-    except Exception:
-        pass
-
-# Create expenses table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS expenses (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_email TEXT NOT NULL,
-            month_iso TEXT NOT NULL,
-            category TEXT,
-            description TEXT,
-            color TEXT,
-            amount REAL NOT NULL DEFAULT 0,
-            expense_date TEXT,
-            is_eco INTEGER DEFAULT 0,
-            created_at TEXT
-        )
-        """
-    )
-
-    # Create grocery_items table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS grocery_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_email TEXT NOT NULL,
-            item_name TEXT NOT NULL,
-            quantity INTEGER DEFAULT 1,
-            estimated_cost REAL,
-            category TEXT,
-            is_checked INTEGER DEFAULT 0,
-            month_iso TEXT,
-            month INTEGER,
-            year INTEGER,
-            created_at TEXT
-        )
-        """
-    )
-
-    # Create reminders table (one per user)
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS reminders (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_email TEXT NOT NULL UNIQUE,
-            message TEXT,
-            created_at TEXT,
-            updated_at TEXT
-        )
-        """
-    )
-    
-    # Create spending_categories table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS spending_categories (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_email TEXT NOT NULL,
-            name TEXT NOT NULL,
-            color TEXT NOT NULL,
-            is_default INTEGER DEFAULT 0,
-            created_at TEXT,
-            UNIQUE(user_email, name)
-        )
-        """
-    )
-    
-    # Seed default categories helper (internal check inside init_db if needed)
-    # Note: We'll actually seed them when a user is created or first accesses budget
-    # Create reminder_items table for multiple scheduled reminders
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS reminder_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_email TEXT NOT NULL,
-            title TEXT,
-            message TEXT,
-            remind_at TEXT,
-            is_recurring INTEGER DEFAULT 0,
-            recurrence_rule TEXT,
-            email_sent INTEGER DEFAULT 0,
-            created_at TEXT,
-            updated_at TEXT
-        )
-        """
-    )
-    # Migration: detect older schema variations and migrate data if necessary
-    cur.execute("PRAGMA table_info(grocery_items)")
-    cols = [r[1] for r in cur.fetchall()]
-    # If the DB has an old schema (item, qty, cost, month_str, purchased), rebuild table
-    old_style = set(["item", "qty", "cost", "month_str", "purchased"]).issubset(set(cols))
-    # If only month_iso is missing but month_str exists, add month_iso and copy values
-    if "month_iso" not in cols and "month_str" in cols and not old_style:
-        try:
-            cur.execute("ALTER TABLE grocery_items ADD COLUMN month_iso TEXT")
-            cur.execute("UPDATE grocery_items SET month_iso = month_str WHERE month_str IS NOT NULL")
-        except Exception:
-            # ignore; best-effort migration
-            pass
-
-    # Create daily_moods table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS daily_moods (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_email TEXT NOT NULL,
-            date TEXT NOT NULL,
-            mood TEXT,
-            mood_score INTEGER,
-            created_at TEXT,
-            UNIQUE(user_email, date)
-        )
-        """
-    )
-
-    # Create daily_wellness table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS daily_wellness (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_email TEXT NOT NULL,
-            date TEXT NOT NULL,
-            sleep TEXT,
-            water TEXT,
-            activity TEXT,
-            stress INTEGER,
-            created_at TEXT,
-            UNIQUE(user_email, date)
-        )
-        """
-    )
-
-
-    if old_style:
-        # Create new table with the desired schema
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS grocery_items_new (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_email TEXT NOT NULL,
-                item_name TEXT NOT NULL,
-                quantity INTEGER DEFAULT 1,
-                estimated_cost REAL,
-                category TEXT,
-                is_checked INTEGER DEFAULT 0,
-                month_iso TEXT,
-                year INTEGER,
-                created_at TEXT
-            )
-            """
-        )
-        # Copy and map old columns to new columns
-        try:
-            cur.execute(
-                "INSERT INTO grocery_items_new (id, user_email, item_name, quantity, estimated_cost, category, is_checked, month_iso, created_at) "
-                "SELECT id, user_email, item AS item_name, qty AS quantity, cost AS estimated_cost, category, purchased AS is_checked, month_str AS month_iso, NULL FROM grocery_items"
-            )
-            cur.execute("DROP TABLE grocery_items")
-            cur.execute("ALTER TABLE grocery_items_new RENAME TO grocery_items")
-        except Exception:
-            # If migration fails, ignore to avoid crashing init; developer should inspect DB
-            pass
-    conn.commit()
-
-
-    # Migrate existing users from users.json if present
-    data_file = Path(__file__).parent / 'users.json'
-    if data_file.exists():
-        try:
-            with open(data_file, 'r', encoding='utf-8') as f:
-                users = json.load(f)
-        except Exception:
-            users = []
-
-
-        if users:
-            for u in users:
-                try:
-                    cur.execute(
-                        "INSERT OR IGNORE INTO users (first, last, email, birthdate, password_hash) VALUES (?, ?, ?, ?, ?)",
-                        (u.get('first'), u.get('last'), u.get('email'), u.get('birthdate'), u.get('password_hash')),
-                    )
-                except Exception:
-                    # ignore individual insert errors
-                    pass
-            conn.commit()
-            # rename migrated file to keep a backup
-            try:
-                data_file.rename(data_file.with_suffix('.json.bak'))
-            except Exception:
-                pass
-
-
-    conn.close()
-
-# Ensure DB schema exists on startup
-try:
-    init_db()
-except Exception as _:
-    # don't prevent app from starting if init has issues; log to console
-    print('Warning: init_db() failed to run during startup')
+        run_migrations(conn)
+    finally:
+        conn.close()
 
 
 
@@ -530,9 +264,14 @@ def login():
     session['user_email'] = email
     session['user_first'] = first
 
-    # Start a background thread to send the login notification email
-    # Replace 'YOUR_GMAIL_USERNAME' and 'YOUR_GMAIL_APP_PASSWORD' with real credentials for this to work
-    threading.Thread(target=send_login_email, args=(email, first), daemon=True).start()
+    # Queue the login notification email; the outbox worker sends it
+    conn = get_db()
+    cur = conn.cursor()
+    if login_alerts.admit(email, lambda: email_outbox.pending_count(cur, 'login')):
+        queue_login_email(cur, email, first)
+        conn.commit()
+        email_outbox.wake()
+    conn.close()
 
     return redirect(url_for('dashboard'))
 
@@ -606,6 +345,20 @@ def api_reminder():
     return jsonify({'message': message, 'updated_at': now})
 
 
+def valid_remind_at(value):
+    """None (no due time) or a YYYY-MM-DD[THH:MM[:SS]] string the scheduler can turn into an epoch."""
+    if value is None:
+        return True
+    if not isinstance(value, str):
+        return False
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return False
+    # strftime('%s') in SQLite only understands the extended YYYY-MM-DD form
+    return len(value) >= 10 and value[4] == '-' and parsed.tzinfo is None
+
+
 @app.route('/api/reminders', methods=['GET', 'POST'])
 def api_reminders():
     user_email = session.get('user_email')
@@ -625,15 +378,19 @@ def api_reminders():
     data = request.get_json() or {}
     title = data.get('title', '')
     message = data.get('message', '')
-    remind_at = data.get('remind_at')
+    remind_at = data.get('remind_at') or None
+    if not valid_remind_at(remind_at):
+        conn.close()
+        return jsonify({'error': 'remind_at must be an ISO date/time, e.g. 2026-01-31T09:30'}), 400
     is_recurring = 1 if data.get('is_recurring') else 0
     recurrence_rule = data.get('recurrence_rule')
     now = datetime.utcnow().isoformat()
     try:
-        cur.execute('INSERT INTO reminder_items (user_email, title, message, remind_at, is_recurring, recurrence_rule, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
-                    (user_email, title, message, remind_at, is_recurring, recurrence_rule, now, now))
+        cur.execute('INSERT INTO reminder_items (user_email, title, message, remind_at, remind_at_epoch, is_recurring, recurrence_rule, created_at, updated_at) VALUES (?, ?, ?, ?, ' + REMIND_AT_EPOCH_SQL.format('?') + ', ?, ?, ?, ?)',
+                    (user_email, title, message, remind_at, remind_at, is_recurring, recurrence_rule, now, now))
         conn.commit()
         new_id = cur.lastrowid
+        reminder_scheduler.wake()
         cur.execute('SELECT id, title, message, remind_at, is_recurring, recurrence_rule, created_at, updated_at FROM reminder_items WHERE id = ?', (new_id,))
         row = cur.fetchone()
         conn.close()
@@ -656,23 +413,28 @@ def api_reminder_item(item_id):
         cur.execute('DELETE FROM reminder_items WHERE id = ? AND user_email = ?', (item_id, user_email))
         conn.commit()
         conn.close()
+        reminder_scheduler.wake()
         return jsonify({'deleted': True})
 
     # PUT -> update
     data = request.get_json() or {}
     title = data.get('title', '')
     message = data.get('message', '')
-    remind_at = data.get('remind_at')
+    remind_at = data.get('remind_at') or None
+    if not valid_remind_at(remind_at):
+        conn.close()
+        return jsonify({'error': 'remind_at must be an ISO date/time, e.g. 2026-01-31T09:30'}), 400
     is_recurring = 1 if data.get('is_recurring') else 0
     recurrence_rule = data.get('recurrence_rule')
     now = datetime.utcnow().isoformat()
     try:
-        cur.execute('UPDATE reminder_items SET title = ?, message = ?, remind_at = ?, is_recurring = ?, recurrence_rule = ?, updated_at = ? WHERE id = ? AND user_email = ?',
-                    (title, message, remind_at, is_recurring, recurrence_rule, now, item_id, user_email))
+        cur.execute('UPDATE reminder_items SET title = ?, message = ?, remind_at = ?, remind_at_epoch = ' + REMIND_AT_EPOCH_SQL.format('?') + ', is_recurring = ?, recurrence_rule = ?, updated_at = ? WHERE id = ? AND user_email = ?',
+                    (title, message, remind_at, remind_at, is_recurring, recurrence_rule, now, item_id, user_email))
         if cur.rowcount == 0:
             conn.close()
             return jsonify({'error': 'Not found'}), 404
         conn.commit()
+        reminder_scheduler.wake()
         cur.execute('SELECT id, title, message, remind_at, is_recurring, recurrence_rule, created_at, updated_at FROM reminder_items WHERE id = ?', (item_id,))
         row = cur.fetchone()
         conn.close()
@@ -729,20 +491,87 @@ def verify_security_answer():
     return redirect(url_for('index', reset_success='true'))
 
 
+# Computed mood/wellness widgets keyed on (user_email, date). Mood, wellness
+# and profile writes invalidate the user's entry for today; the TTL bounds
+# staleness for writes served by other processes.
+mood_cache = TTLCache(
+    maxsize=int(os.environ.get('MOMCARE_MOOD_CACHE_SIZE', 2048)),
+    ttl=int(os.environ.get('MOMCARE_MOOD_CACHE_TTL', 60)),
+)
+
+
+def invalidate_mood_cache(user_email):
+    mood_cache.pop((user_email, datetime.now().strftime('%Y-%m-%d')))
+
+
 def get_mood_wellness_data(user_email: str):
     """
     Helper to get mood and wellness data for a user.
     Fetches real mood data from the DB and calculates weekly summary and tips.
+    Results are cached per user and day; treat the returned dict as read-only.
     """
     today_date = datetime.now().strftime('%Y-%m-%d')
+    cached = mood_cache.get((user_email, today_date))
+    if cached is not None:
+        return cached
+
     conn = get_db()
     cur = conn.cursor()
     
     # Get today's mood and score
     cur.execute('SELECT mood, mood_score FROM daily_moods WHERE user_email = ? AND date = ?', (user_email, today_date))
     row = cur.fetchone()
-    current_mood = row['mood'] if row and row['mood'] else 'Neutral'
-    current_mood_score = int(row['mood_score']) if row and row['mood_score'] is not None else 2
+
+    # Get today's wellness
+    cur.execute('SELECT sleep, water, activity, stress FROM daily_wellness WHERE user_email = ? AND date = ?', (user_email, today_date))
+    w_row = cur.fetchone()
+
+    # Get weekly data
+    dates = current_week_dates()
+    placeholders = ','.join(['?'] * 7)
+    cur.execute(f'SELECT date, mood_score FROM daily_moods WHERE user_email = ? AND date IN ({placeholders})', (user_email, *dates))
+    week_rows = cur.fetchall()
+
+    # Get user profile for BMI-based wellness context
+    cur.execute('SELECT height, weight, height_m, weight_kg FROM users WHERE email = ?', (user_email,))
+    profile_row = cur.fetchone()
+    conn.close()
+
+    data = build_mood_wellness_data(user_email, today_date, row, w_row, week_rows, profile_row)
+    mood_cache.set((user_email, today_date), data)
+    return data
+
+
+def profile_measurements(profile_row):
+    """(height_m, weight_kg) from a users row, 0.0 when unset."""
+    if not profile_row:
+        return 0.0, 0.0
+    height_m = profile_row['height_m']
+    weight_kg = profile_row['weight_kg']
+    # Rows written outside edit_profile may only have the text columns
+    if height_m is None:
+        height_m = parse_height(profile_row['height'])
+    if weight_kg is None:
+        weight_kg = parse_weight(profile_row['weight'])
+    return height_m, weight_kg
+
+
+def current_week_dates():
+    """ISO dates (Monday..Sunday) of the current week."""
+    dt = datetime.now()
+    start_of_week = dt - timedelta(days=dt.weekday())
+    return [(start_of_week + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(7)]
+
+
+def build_mood_wellness_data(user_email, today_date, row, w_row, week_rows, profile_row):
+    """
+    Compute the mood/wellness widget from already-fetched rows.
+    row: today's mood (mood, mood_score) or None; w_row: today's wellness or None;
+    week_rows: (date, mood_score) rows for this week;
+    profile_row: (height, weight, height_m, weight_kg).
+    """
+    current_mood = row['mood'] if row and row['mood'] else DEFAULT_MOOD
+    current_mood_score = int(row['mood_score']) if row and row['mood_score'] is not None else MOOD_SCORES[DEFAULT_MOOD]
 
     mood_icon_map = {
         'Happy': 'far fa-smile',
@@ -752,9 +581,6 @@ def get_mood_wellness_data(user_email: str):
     }
     mood_icon = mood_icon_map.get(current_mood, 'far fa-meh')
 
-    # Get today's wellness
-    cur.execute('SELECT sleep, water, activity, stress FROM daily_wellness WHERE user_email = ? AND date = ?', (user_email, today_date))
-    w_row = cur.fetchone()
     if w_row:
         sleep = w_row['sleep']
         water = w_row['water']
@@ -766,18 +592,9 @@ def get_mood_wellness_data(user_email: str):
         activity = 'Light Stretching'
         stress = 5
 
-    # Get weekly data
-    dt = datetime.now()
-    start_of_week = dt - timedelta(days=dt.weekday())
-    dates = [(start_of_week + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(7)]
-    
     week_data = [2] * 7
-    placeholders = ','.join(['?'] * 7)
-    cur.execute(f'SELECT date, mood_score FROM daily_moods WHERE user_email = ? AND date IN ({placeholders})', (user_email, *dates))
-    rows = cur.fetchall()
-    
     mood_counts = {}
-    for r in rows:
+    for r in week_rows:
         d_str = r['date']
         try:
             d_date = datetime.strptime(d_str, '%Y-%m-%d')
@@ -790,65 +607,12 @@ def get_mood_wellness_data(user_email: str):
         except:
             pass
 
-    # Get user profile for BMI-based wellness context
-    cur.execute('SELECT height, weight FROM users WHERE email = ?', (user_email,))
-    profile_row = cur.fetchone()
-    height_value = profile_row['height'] if profile_row and profile_row['height'] else None
-    weight_value = profile_row['weight'] if profile_row and profile_row['weight'] else None
-    print(f"DEBUG get_mood_wellness_data: user_email='{user_email}', profile_row={profile_row}, height_value={repr(height_value)}, weight_value={repr(weight_value)}")
-
-    def parse_number(val, default=0.0):
-        if not val:
-            return default
-        import re
-        match = re.search(r'(\d+\.?\d*)', str(val).strip())
-        if match:
-            try:
-                return float(match.group(1))
-            except Exception:
-                pass
-        return default
-
-    def parse_height(val):
-        if val is None or val == '' or val == '0':
-            return 0.0
-        val_str = str(val).strip().lower()
-        import re
-        numbers = re.findall(r'\d+\.?\d*', val_str)
-        if not numbers:
-            return 0.0
-        if 'cm' in val_str:
-            return float(numbers[0]) / 100.0
-        if 'in' in val_str or 'inch' in val_str or '"' in val_str:
-            return float(numbers[0]) * 0.0254
-        if 'ft' in val_str or 'feet' in val_str or "'" in val_str:
-            feet = float(numbers[0])
-            inches = float(numbers[1]) if len(numbers) > 1 else 0
-            return (feet * 12 + inches) * 0.0254
-        # Assume cm
-        return float(numbers[0]) / 100.0
-
-    def parse_weight(val):
-        if val is None or val == '' or val == '0':
-            return 0.0
-        val_str = str(val).strip().lower()
-        import re
-        numbers = re.findall(r'\d+\.?\d*', val_str)
-        if not numbers:
-            return 0.0
-        num = float(numbers[0])
-        if 'lbs' in val_str or 'pounds' in val_str or 'lb' in val_str:
-            return num * 0.453592
-        return num  # assume kg
-
-    height_m = parse_height(height_value)
-    weight_kg = parse_weight(weight_value)
-
-    bmi = None
+    height_m, weight_kg = profile_measurements(profile_row)
+
+    bmi = compute_bmi(height_m, weight_kg)
     bmi_category = 'Not Set'
     bmi_score = 50  # Neutral score if BMI not available
-    if height_m > 0 and weight_kg > 0:
-        bmi = round(weight_kg / (height_m * height_m), 1)
+    if bmi is not None:
         if bmi < 18.5:
             bmi_category = 'Underweight'
             bmi_score = 60
@@ -862,8 +626,6 @@ def get_mood_wellness_data(user_email: str):
             bmi_category = 'Obese'
             bmi_score = 40
 
-    print(f"DEBUG BMI: user_email='{user_email}', height_value='{height_value}', weight_value='{weight_value}', height_m={height_m}, weight_kg={weight_kg}, bmi={bmi}")
-
     def cap_int(v):
         return max(0, min(100, int(round(v))))
 
@@ -913,66 +675,8 @@ def get_mood_wellness_data(user_email: str):
     }
     weakest_factor = min(scores_map, key=scores_map.get)
     
-    import random
-    
-    # Ensure the tip is consistent for the user on this day and score
-    random.seed(f"{user_email}_{today_date}_{overall_score}_{weakest_factor}")
-
-    # Granular Evaluations (6 scoring tiers)
-    if overall_score >= 90:
-        eval_prefixes = ['Outstanding wellness!', 'Exceptional work!', 'You are thriving!']
-    elif overall_score >= 80:
-        eval_prefixes = ['Excellent progress!', 'Great consistency!', 'Looking very good!']
-    elif overall_score >= 70:
-        eval_prefixes = ['Good job!', 'Solid effort.', 'You are on the right track.']
-    elif overall_score >= 60:
-        eval_prefixes = ['Fair effort.', 'Making progress.', 'Some fine-tuning needed.']
-    elif overall_score >= 40:
-        eval_prefixes = ['Needs improvement.', 'Room for growth.', 'Let us focus a bit more.']
-    else:
-        eval_prefixes = ['Action required.', 'Please prioritize your well-being.', 'Take a step back to care for yourself.']
-
-    prefix = random.choice(eval_prefixes)
-
-    if overall_score >= 90:
-        good_tips = [
-            'Keep up the healthy habits.',
-            'Maintain your routine for optimal wellness.',
-            'You are balancing things perfectly.'
-        ]
-        wellness_tip = f"{prefix} {random.choice(good_tips)}"
-    else:
-        if weakest_factor == 'sleep':
-            sleep_tips = [
-                'Try going to bed 15 minutes earlier tonight.',
-                'Avoid screens for an hour before bed.',
-                'A consistent bedtime routine can greatly improve your rest.'
-            ]
-            wellness_tip = f"{prefix} {random.choice(sleep_tips)}"
-        elif weakest_factor == 'water':
-            water_tips = [
-                'Try drinking a full glass of water right now!',
-                'Keep a reusable water bottle near you.',
-                'Sip water every hour to stay hydrated.'
-            ]
-            wellness_tip = f"{prefix} {random.choice(water_tips)}"
-        elif weakest_factor == 'activity':
-            activity_tips = [
-                'Adding 10 minutes of light stretching can help.',
-                'Try taking a short walk outside.',
-                'Consider a quick 15-minute home workout.'
-            ]
-            wellness_tip = f"{prefix} {random.choice(activity_tips)}"
-        else: # stress
-            stress_tips = [
-                'Try taking 5 minutes for deep breathing.',
-                'Consider a quick meditation or a warm bath.',
-                'Step away from work for a brief mental reset.'
-            ]
-            wellness_tip = f"{prefix} {random.choice(stress_tips)}"
-
-    # Reset the random seed so we don't mess up other randomized functions
-    random.seed()
+    # Same tip for the user on this day and score, in every thread/process
+    wellness_tip = pick_wellness_tip(user_email, today_date, overall_score, weakest_factor)
 
     if stress_val <= 3:
         stress_category = 'low'
@@ -981,8 +685,6 @@ def get_mood_wellness_data(user_email: str):
     else:
         stress_category = 'high'
 
-    conn.close()
-
     return {
         'sleep': str(sleep),
         'water': str(water),
@@ -1010,63 +712,14 @@ def debug_bmi():
     
     conn = get_db()
     cur = conn.cursor()
-    cur.execute('SELECT height, weight FROM users WHERE email = ?', (user_email,))
+    cur.execute('SELECT height, weight, height_m, weight_kg FROM users WHERE email = ?', (user_email,))
     profile_row = cur.fetchone()
     conn.close()
     
-    height_value = profile_row['height'] if profile_row and 'height' in profile_row else None
-    weight_value = profile_row['weight'] if profile_row and 'weight' in profile_row else None
-    
-    def parse_number(val, default=0.0):
-        if not val:
-            return default
-        import re
-        match = re.search(r'(\d+\.?\d*)', str(val).strip())
-        if match:
-            try:
-                return float(match.group(1))
-            except Exception:
-                pass
-        return default
-    
-    def parse_height(val):
-        if val is None or val == '' or val == '0':
-            return 0.0
-        val_str = str(val).strip().lower()
-        import re
-        numbers = re.findall(r'\d+\.?\d*', val_str)
-        if not numbers:
-            return 0.0
-        if 'cm' in val_str:
-            return float(numbers[0]) / 100.0
-        if 'in' in val_str or 'inch' in val_str or '"' in val_str:
-            return float(numbers[0]) * 0.0254
-        if 'ft' in val_str or 'feet' in val_str or "'" in val_str:
-            feet = float(numbers[0])
-            inches = float(numbers[1]) if len(numbers) > 1 else 0
-            return (feet * 12 + inches) * 0.0254
-        # Assume cm
-        return float(numbers[0]) / 100.0
-    
-    def parse_weight(val):
-        if val is None or val == '' or val == '0':
-            return 0.0
-        val_str = str(val).strip().lower()
-        import re
-        numbers = re.findall(r'\d+\.?\d*', val_str)
-        if not numbers:
-            return 0.0
-        num = float(numbers[0])
-        if 'lbs' in val_str or 'pounds' in val_str or 'lb' in val_str:
-            return num * 0.453592
-        return num  # assume kg
-    
-    height_m = parse_height(height_value)
-    weight_kg = parse_weight(weight_value)
-    
-    bmi = None
-    if height_m > 0 and weight_kg > 0:
-        bmi = round(weight_kg / (height_m * height_m), 1)
+    height_value = profile_row['height'] if profile_row else None
+    weight_value = profile_row['weight'] if profile_row else None
+    height_m, weight_kg = profile_measurements(profile_row)
+    bmi = compute_bmi(height_m, weight_kg)
     
     return jsonify({
         'raw_height': height_value,
@@ -1077,23 +730,199 @@ def debug_bmi():
     })
 
 
+# Scalar dashboard widgets (task counts, budget, spend, top category, today's
+# mood/wellness and BMI inputs) computed in a single round trip.
+DASHBOARD_SCALARS_SQL = """
+    WITH budget AS (
+        SELECT income, budget_limit FROM monthly_budgets
+        WHERE user_email = :email
+        ORDER BY month_iso = :month DESC, month_iso DESC
+        LIMIT 1
+    ),
+    cats AS (
+        SELECT name FROM spending_categories WHERE user_email = :email
+        UNION SELECT 'Groceries'
+        UNION SELECT 'Others'
+    ),
+    month_spend AS (
+        -- Maintained by triggers on expenses and grocery_items (migration 6)
+        SELECT category AS cat, total AS amt
+        FROM monthly_spend_rollup
+        WHERE user_email = :email AND month_iso = :month
+    ),
+    cat_totals AS (
+        SELECT CASE WHEN cat IN (SELECT name FROM cats) THEN cat ELSE 'Others' END AS cat,
+               ROUND(SUM(amt), 2) AS total
+        FROM month_spend
+        GROUP BY 1
+    ),
+    top_cat AS (
+        SELECT cat, total FROM cat_totals WHERE total > 0 ORDER BY total DESC LIMIT 1
+    ),
+    wellness AS (
+        SELECT id, sleep, water, activity, stress FROM daily_wellness
+        WHERE user_email = :email AND date = :today
+    ),
+    mood AS (
+        SELECT mood, mood_score FROM daily_moods
+        WHERE user_email = :email AND date = :today
+    )
+    SELECT
+        (SELECT COUNT(*) FROM tasks
+         WHERE user_email = :email AND completed = 0 AND task_date < :today) AS overdue_count,
+        (SELECT COALESCE(SUM(amount), 0) FROM expenses
+         WHERE user_email = :email AND expense_date = :today)
+        + (SELECT COALESCE(SUM(estimated_cost), 0) FROM grocery_items
+           WHERE user_email = :email AND purchased_on = :today) AS total_spent_today,
+        (SELECT COALESCE(SUM(total), 0) FROM cat_totals) AS total_spent_month,
+        (SELECT income FROM budget) AS income,
+        (SELECT budget_limit FROM budget) AS budget_limit,
+        (SELECT cat FROM top_cat) AS top_category,
+        (SELECT total FROM top_cat) AS top_category_total,
+        (SELECT mood FROM mood) AS mood,
+        (SELECT mood_score FROM mood) AS mood_score,
+        wellness.id AS wellness_id, wellness.sleep, wellness.water, wellness.activity, wellness.stress,
+        users.height, users.weight, users.height_m, users.weight_kg
+    FROM (SELECT 1)
+    LEFT JOIN wellness
+    LEFT JOIN users ON users.email = :email
+"""
+
+# Row-valued dashboard widgets (today's tasks, upcoming reminders, this week's
+# mood scores) in a second round trip, tagged by kind.
+DASHBOARD_LISTS_SQL = """
+    SELECT 'task' AS kind, id, title, start_time, duration, color, is_priority, completed,
+           task_date AS at, NULL AS score
+    FROM tasks
+    WHERE user_email = :email AND task_date = :today
+    UNION ALL
+    SELECT 'reminder', id, title, NULL, NULL, NULL, NULL, NULL, remind_at, NULL
+    FROM reminder_items
+    WHERE user_email = :email AND remind_at >= :today AND remind_at < :reminders_until
+    UNION ALL
+    SELECT 'mood', id, NULL, NULL, NULL, NULL, NULL, NULL, date, mood_score
+    FROM daily_moods
+    WHERE user_email = :email AND date BETWEEN :week_start AND :week_end
+    ORDER BY kind, start_time, at
+"""
+
+
+def get_dashboard_summary(user_email: str, month_iso: str) -> dict:
+    """
+    Compute every dashboard widget for user_email and month_iso (YYYY-MM)
+    in two queries. Used by /dashboard and /api/dashboard/summary.
+    """
+    now = datetime.now()
+    today_iso = now.strftime('%Y-%m-%d')
+    week = current_week_dates()
+    params = {
+        'email': user_email,
+        'month': month_iso,
+        'today': today_iso,
+        # Upcoming reminders: today through the next 2 days
+        'reminders_until': (now + timedelta(days=3)).strftime('%Y-%m-%d'),
+        'week_start': week[0],
+        'week_end': week[-1],
+    }
+
+    conn = get_db()
+    cur = conn.cursor()
+    cur.execute(DASHBOARD_SCALARS_SQL, params)
+    agg = cur.fetchone()
+    cur.execute(DASHBOARD_LISTS_SQL, params)
+    list_rows = cur.fetchall()
+    conn.close()
+
+    tasks = []
+    upcoming_reminders = []
+    week_rows = []
+    for r in list_rows:
+        if r['kind'] == 'task':
+            tasks.append({
+                'id': r['id'],
+                'title': r['title'],
+                'start_time': r['start_time'],
+                'duration': r['duration'],
+                'color': r['color'],
+                'is_priority': bool(r['is_priority']),
+                'task_date': r['at'],
+                'completed': bool(r['completed'])
+            })
+        elif r['kind'] == 'reminder':
+            try:
+                # remind_at is stored as ISO string, e.g., "2023-10-27T14:30"
+                r_dt = datetime.fromisoformat(r['at'])
+            except (TypeError, ValueError):
+                continue
+            # Format for display: "Oct 27, 2:30 PM"
+            upcoming_reminders.append({'title': r['title'], 'time': r_dt.strftime('%b %d, %I:%M %p')})
+        else:
+            week_rows.append({'date': r['at'], 'mood_score': r['score']})
+
+    # Progress and pending count are based on today's tasks only
+    pending_count = len([t for t in tasks if not t['completed']])
+    total_today = len(tasks)
+    progress_percentage = int(((total_today - pending_count) / total_today) * 100) if total_today > 0 else 0
+
+    income = agg['income'] or 0
+    budget_limit = agg['budget_limit'] or 0
+    total_spent_month = agg['total_spent_month']
+
+    top_expense_category = "None"
+    if agg['top_category'] is not None:
+        top_expense_category = f"{agg['top_category']} (₱{agg['top_category_total']:,.2f})"
+
+    # Status Indicator based on Budget Limit (Alert)
+    budget_color = "green"
+    budget_icon = "fa-check-circle"
+    budget_percent = 0
+    if budget_limit > 0:
+        budget_percent = (total_spent_month / budget_limit) * 100
+        if budget_percent > 100:
+            budget_color = "red"
+            budget_icon = "fa-exclamation-circle"
+        elif budget_percent >= 70:
+            budget_color = "orange"
+            budget_icon = "fa-exclamation-triangle"
+    elif total_spent_month > 0:
+        budget_color = "red"
+        budget_icon = "fa-exclamation-circle"
+
+    mood_data = mood_cache.get((user_email, today_iso))
+    if mood_data is None:
+        mood_row = {'mood': agg['mood'], 'mood_score': agg['mood_score']}
+        wellness_row = None
+        if agg['wellness_id'] is not None:
+            wellness_row = {k: agg[k] for k in ('sleep', 'water', 'activity', 'stress')}
+        profile_row = {k: agg[k] for k in ('height', 'weight', 'height_m', 'weight_kg')}
+        mood_data = build_mood_wellness_data(user_email, today_iso, mood_row, wellness_row, week_rows, profile_row)
+        mood_cache.set((user_email, today_iso), mood_data)
+
+    return {
+        'month_iso': month_iso,
+        'tasks': tasks,
+        'pending_count': pending_count,
+        'progress_percentage': progress_percentage,
+        'overdue_count': agg['overdue_count'],
+        'income': income,
+        'budget_limit': budget_limit,
+        'total_spent_today': agg['total_spent_today'],
+        'total_spent_month': total_spent_month,
+        'remaining_budget': budget_limit - total_spent_month,
+        'budget_percent': budget_percent,
+        'budget_color': budget_color,
+        'budget_icon': budget_icon,
+        'top_expense_category': top_expense_category,
+        'upcoming_reminders': upcoming_reminders,
+        'mood_data': mood_data
+    }
+
+
 @app.route('/dashboard')
 def dashboard():
     first = session.get('user_first')
     today = datetime.now().strftime('%B %d, %Y')
     user_email = session.get('user_email')
-   
-    tasks = []
-    income = 0
-    budget_limit = 0
-    total_spent_today = 0
-    total_spent_month = 0
-    pending_count = 0
-    progress_percentage = 0
-    top_expense_category = "None"
-    remaining_budget = 0
-    budget_color = "green"
-    budget_icon = "fa-check-circle"
     selected_month_iso = datetime.now().strftime('%Y-%m')
     selected_month = datetime.now().strftime('%B %Y')
     
@@ -1112,181 +941,209 @@ def dashboard():
         except ValueError:
             pass
 
-    conn = get_db()
-    cur = conn.cursor()
-    
-    # Auto-delete tasks from previous days
-    cleanup_old_tasks(user_email)
+    summary = get_dashboard_summary(user_email, selected_month_iso)
+
+    return render_template('dashboard.html', first=first, today=today, tasks=summary['tasks'],
+                           progress_percentage=summary['progress_percentage'],
+                           pending_count=summary['pending_count'],
+                           income=summary['income'],
+                           budget_limit=summary['budget_limit'], 
+                           total_spent_today=summary['total_spent_today'],
+                           total_spent_month=summary['total_spent_month'],
+                           remaining_budget=summary['remaining_budget'],
+                           top_expense_category=summary['top_expense_category'],
+                           selected_month=selected_month,
+                           selected_month_iso=selected_month_iso,
+                           budget_color=summary['budget_color'],
+                           budget_icon=summary['budget_icon'],
+                           mood_data=summary['mood_data'],
+                           upcoming_reminders=summary['upcoming_reminders'],
+                           overdue_count=summary['overdue_count'],
+                           budget_percent=summary['budget_percent'])
 
-    # Load tasks for display (all pending tasks)
-    # Load tasks for display (ONLY tasks for today)
-    today_iso = datetime.now().strftime('%Y-%m-%d')
-    cur.execute('SELECT * FROM tasks WHERE user_email = ? AND task_date = ? ORDER BY start_time ASC', (user_email, today_iso))
-    rows = cur.fetchall()
-    tasks = [dict(r) for r in rows]
-    
-    # Calculate pending count from today's tasks (or should it be all pending? User asked for "show task of current date", usually context implies list view)
-    # If we want pending count badge to show ALL pending work, we need a separate query. 
-    # But usually dashboard summary matches the list. Let's stick to today's pending count for the snapshot box for consistency with the list.
-    pending_count = len([t for t in tasks if not t['completed']])
 
-    # Calculate overdue count (tasks from previous days that are not completed)
-    cur.execute('SELECT COUNT(*) FROM tasks WHERE user_email = ? AND completed = 0 AND task_date < ?', (user_email, today_iso))
-    overdue_count = cur.fetchone()[0]
+@app.route('/api/dashboard/summary', methods=['GET'])
+def api_dashboard_summary():
+    user_email = session.get('user_email')
+    if not user_email:
+        return jsonify({'error': 'login required'}), 401
 
-    # Calculate Progress based on today's tasks
-    total_today = len(tasks)
-    done_today = total_today - pending_count
-    progress_percentage = int((done_today / total_today) * 100) if total_today > 0 else 0
+    return jsonify(get_dashboard_summary(user_email, month_iso_or_current()))
 
-    # 1. Budget Settings (Fallback)
-    cur.execute('SELECT income, budget_limit FROM monthly_budgets WHERE user_email = ? AND month_iso = ?', (user_email, selected_month_iso))
-    budget_row = cur.fetchone()
-    if budget_row:
-        income = budget_row['income']
-        budget_limit = budget_row['budget_limit']
-    else:
-        cur.execute('SELECT income, budget_limit FROM monthly_budgets WHERE user_email = ? ORDER BY month_iso DESC LIMIT 1', (user_email,))
-        latest_row = cur.fetchone()
-        if latest_row:
-            income = latest_row['income']
-            budget_limit = latest_row['budget_limit']
-        else:
-            income = 0
-            budget_limit = 0
+# JSON API endpoints for client-side integration
+TASK_FIELDS = ('id', 'title', 'start_time', 'duration', 'color', 'is_priority', 'task_date', 'completed')
+TASK_BOOL_FIELDS = ('is_priority', 'completed')
+TASKS_PAGE_MAX = 500
 
-    # 2. Daily Spend
-    cur.execute('SELECT amount FROM expenses WHERE user_email = ? AND expense_date = ?', (user_email, today_iso))
-    total_spent_today = sum(row['amount'] for row in cur.fetchall())
-    cur.execute('SELECT estimated_cost FROM grocery_items WHERE user_email = ? AND substr(created_at, 1, 10) = ? AND is_checked = 1', (user_email, today_iso))
-    total_spent_today += sum(row['estimated_cost'] or 0 for row in cur.fetchall())
-   
-    # 3. Monthly Spend
-    cur.execute('SELECT category, amount FROM expenses WHERE user_email = ? AND month_iso = ?', (user_email, selected_month_iso))
-    monthly_expenses_rows = cur.fetchall()
-    cur.execute('SELECT category, estimated_cost FROM grocery_items WHERE user_email = ? AND month_iso = ? AND is_checked = 1', (user_email, selected_month_iso))
-    grocery_rows = cur.fetchall()
-    total_spent_month = sum(row['amount'] for row in monthly_expenses_rows) + sum(row['estimated_cost'] or 0 for row in grocery_rows)
-   
-    # Calculate Top Category Dynamic
-    cur.execute('SELECT name FROM spending_categories WHERE user_email = ?', (user_email,))
-    cat_names = [row['name'] for row in cur.fetchall()]
-    # Ensure "Groceries" and "Others" are included as fallbacks
-    if "Groceries" not in cat_names: cat_names.append("Groceries")
-    if "Others" not in cat_names: cat_names.append("Others")
-    
-    cat_totals = {c: 0 for c in cat_names}
-    
-    for row in monthly_expenses_rows:
-        c = row['category']
-        if c not in cat_totals: c = "Others"
-        cat_totals[c] += row['amount']
-        
-    for row in grocery_rows:
-        c = row['category'] or "Groceries"
-        if c not in cat_totals: c = "Others"
-        cat_totals[c] += (row['estimated_cost'] or 0)
-       
-    if any(v > 0 for v in cat_totals.values()):
-        top_cat = max(cat_totals, key=cat_totals.get)
-        top_amt = cat_totals[top_cat]
-        if top_amt > 0:
-            top_expense_category = f"{top_cat} (₱{top_amt:,.2f})"
 
-    # Status Indicator based on Budget Limit (Alert)
-    if budget_limit > 0:
-        pct = (total_spent_month / budget_limit) * 100
-        if pct > 100:
-            budget_color = "red"
-            budget_icon = "fa-exclamation-circle"
-        elif pct >= 70:
-            budget_color = "orange"
-            budget_icon = "fa-exclamation-triangle"
-    elif total_spent_month > 0:
-        budget_color = "red"
-        budget_icon = "fa-exclamation-circle"
+def encode_task_cursor(row):
+    key = json.dumps([row['task_date'], row['start_time'], row['id']])
+    return base64.urlsafe_b64encode(key.encode('utf-8')).decode('ascii')
 
-    remaining_budget = budget_limit - total_spent_month
-    
-    budget_percent = 0
-    if budget_limit > 0:
-        budget_percent = (total_spent_month / budget_limit) * 100
-    # 4. Upcoming Reminders (Next 2 days)
-    upcoming_reminders = []
-    try:
-        cur.execute('SELECT title, remind_at FROM reminder_items WHERE user_email = ? AND remind_at IS NOT NULL ORDER BY remind_at ASC', (user_email,))
-        all_reminders = cur.fetchall()
-        
-        now_date = datetime.now().date()
-        limit_date = now_date + timedelta(days=2)
-        
-        for r in all_reminders:
-            try:
-                # remind_at is stored as ISO string, e.g., "2023-10-27T14:30"
-                r_dt = datetime.fromisoformat(r['remind_at'])
-                r_date = r_dt.date()
-                if now_date <= r_date <= limit_date:
-                    # Format for display: "Oct 27, 2:30 PM"
-                    display_time = r_dt.strftime('%b %d, %I:%M %p')
-                    upcoming_reminders.append({'title': r['title'], 'time': display_time})
-            except ValueError:
-                pass
-    except Exception:
-        pass
 
-    conn.close()
+def decode_task_cursor(cursor):
+    task_date, start_time, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    return task_date, start_time, int(task_id)
 
-    mood_data = get_mood_wellness_data(user_email)
 
-    return render_template('dashboard.html', first=first, today=today, tasks=tasks,
-                           progress_percentage=progress_percentage,
-                           pending_count=pending_count,
-                           income=income,
-                           budget_limit=budget_limit, 
-                           total_spent_today=total_spent_today,
-                           total_spent_month=total_spent_month,
-                           remaining_budget=remaining_budget,
-                           top_expense_category=top_expense_category,
-                           selected_month=selected_month,
-                           selected_month_iso=selected_month_iso,
-                           budget_color=budget_color,
-                           budget_icon=budget_icon,
-                           mood_data=mood_data,
-                           upcoming_reminders=upcoming_reminders,
-                           overdue_count=overdue_count,
-                           budget_percent=budget_percent)
+def task_keyset_after(task_date, start_time, task_id):
+    """WHERE clause for rows after (task_date, start_time, id) in ORDER BY task_date, start_time, id."""
+    if task_date is not None and start_time is not None:
+        # Row-value comparison: a range seek on idx_tasks_user_date_start
+        return '(task_date, start_time, id) > (?, ?, ?)', [task_date, start_time, task_id]
+    # NULLs sort first; spell the comparison out for them, column by column
+    params = []
+    if task_date is not None:
+        gt_date, eq_date = 'task_date > ?', 'task_date = ?'
+        params += [task_date, task_date]
+    else:
+        gt_date, eq_date = 'task_date IS NOT NULL', 'task_date IS NULL'
+    if start_time is not None:
+        after_time = '(start_time > ? OR (start_time = ? AND id > ?))'
+        params += [start_time, start_time, task_id]
+    else:
+        after_time = '(start_time IS NOT NULL OR id > ?)'
+        params += [task_id]
+    return f'({gt_date} OR ({eq_date} AND {after_time}))', params
+
+
+def valid_iso_date(value):
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+        return True
+    except (TypeError, ValueError):
+        return False
+
 
-# JSON API endpoints for client-side integration
 @app.route('/api/tasks', methods=['GET'])
 def api_get_tasks():
+    """
+    Tasks ordered by (task_date, start_time, id), streamed as a JSON array.
+
+    Optional query parameters:
+        from, to    inclusive YYYY-MM-DD bounds on task_date
+        completed   0 or 1
+        fields      comma-separated subset of TASK_FIELDS (id is always included)
+        limit       page size (max TASKS_PAGE_MAX); the X-Next-Cursor response
+                    header is set when more rows follow
+        cursor      value of X-Next-Cursor from the previous page
+    Without limit every matching task is returned, as before. Completed
+    tasks dated before today are never listed (the janitor purges them).
+    """
     user_email = session.get('user_email')
     if not user_email:
             return jsonify([])
    
-    # Enforce cleanup on API access too
-    cleanup_old_tasks(user_email)
+    args = request.args
+    fields = TASK_FIELDS
+    if args.get('fields'):
+        requested = [f.strip() for f in args['fields'].split(',') if f.strip()]
+        unknown = [f for f in requested if f not in TASK_FIELDS]
+        if unknown:
+            return jsonify({'error': f"unknown fields: {', '.join(unknown)}"}), 400
+        fields = ('id',) + tuple(f for f in TASK_FIELDS if f in requested and f != 'id')
+
+    # Completed tasks from earlier days are hidden here too, so nothing
+    # changes for clients between midnight and the janitor's purge.
+    where = ['user_email = ?', '(task_date >= ? OR task_date IS NULL OR completed IS NOT 1)']
+    params = [user_email, datetime.now().strftime('%Y-%m-%d')]
+    for arg, clause in (('from', 'task_date >= ?'), ('to', 'task_date <= ?')):
+        if args.get(arg):
+            if not valid_iso_date(args[arg]):
+                return jsonify({'error': f'{arg} must be YYYY-MM-DD'}), 400
+            where.append(clause)
+            params.append(args[arg])
+    if args.get('completed') in ('0', '1'):
+        where.append('completed = ?')
+        params.append(int(args['completed']))
+    if args.get('cursor'):
+        try:
+            clause, cursor_params = task_keyset_after(*decode_task_cursor(args['cursor']))
+        except Exception:
+            return jsonify({'error': 'invalid cursor'}), 400
+        where.append(clause)
+        params.extend(cursor_params)
+
+    limit = None
+    if args.get('limit'):
+        try:
+            limit = max(1, min(int(args['limit']), TASKS_PAGE_MAX))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
 
+    # Keyset columns are always selected so the next cursor can be built
+    columns = list(dict.fromkeys(fields + ('task_date', 'start_time')))
+    sql = f"SELECT {', '.join(columns)} FROM tasks WHERE {' AND '.join(where)} ORDER BY task_date, start_time, id"
     conn = get_db()
     cur = conn.cursor()
-    today_iso = datetime.now().strftime('%Y-%m-%d')
-    cur.execute('SELECT * FROM tasks WHERE user_email = ? ORDER BY task_date ASC, start_time ASC', (user_email,))
-    rows = cur.fetchall()
-    tasks = []
-    for r in rows:
-        tasks.append({
-            'id': r['id'],
-            'title': r['title'],
-            'start_time': r['start_time'],
-            'duration': r['duration'],
-            'color': r['color'],
-            'is_priority': bool(r['is_priority']),
-            'task_date': r['task_date'],
-            'completed': bool(r['completed'])
-        })
-    conn.close()
-    return jsonify(tasks)
+    headers = {}
+    if limit is not None:
+        cur.execute(sql + ' LIMIT ?', params + [limit + 1])
+        rows = cur.fetchall()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers['X-Next-Cursor'] = encode_task_cursor(rows[-1])
+    else:
+        cur.execute(sql, params)
+        rows = cur
+
+    def generate():
+        # Encode row by row so memory stays flat for long histories
+        yield '['
+        for i, r in enumerate(rows):
+            task = {f: (bool(r[f]) if f in TASK_BOOL_FIELDS else r[f]) for f in fields}
+            yield (',' if i else '') + json.dumps(task)
+        yield ']'
 
+    # The cursor is read after the app context tears down, so take the
+    # connection off g (release_db skips it) and release it exactly once,
+    # when the server closes the response.
+    g.pop('_db_conn', None)
 
+    def release_stream_conn():
+        conn._pinned = False
+        db_pool.release(conn)
+
+    response = Response(stream_with_context(generate()), mimetype='application/json', headers=headers)
+    response.call_on_close(release_stream_conn)
+    return response
+
+
+
+
+def parse_task_hours(value, field):
+    """start_time/duration as float hours, None when missing or blank; raises ValueError otherwise."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    try:
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise ValueError
+        hours = float(value)
+        if not math.isfinite(hours):
+            raise ValueError
+    except ValueError:
+        raise ValueError(f'{field} must be a number of hours') from None
+    return hours
+
+
+def find_task_overlap(cur, user_email, task_date, start_time, duration, exclude_id=None):
+    """
+    None if [start_time, start_time + duration) is free on task_date (or the
+    slot is incomplete), else {'conflicts': [ids], 'next_free_slot': hours or None}.
+    """
+    try:
+        start, length = float(start_time), float(duration)
+    except (TypeError, ValueError):
+        return None
+    if length <= 0:
+        return None
+    return overlap_error(DaySchedule.load(cur, user_email, task_date, exclude_id), start, length)
+
+
+def overlap_message(overlap):
+    if overlap['next_free_slot'] is None:
+        return 'Task overlaps an existing task and no later slot is free that day.'
+    return f"Task overlaps an existing task. Next free slot: {format_task_time(overlap['next_free_slot'])}."
 
 
 @app.route('/api/tasks', methods=['POST'])
@@ -1298,11 +1155,14 @@ def api_create_task():
 
     data = request.get_json() or {}
     title = data.get('title', '').strip()
-    start_time = data.get('start_time')
-    duration = data.get('duration')
     color = data.get('color')
     is_priority = 1 if data.get('is_priority') else 0
     task_date = data.get('task_date') or datetime.now().strftime('%Y-%m-%d')
+    try:
+        start_time = parse_task_hours(data.get('start_time'), 'start_time')
+        duration = parse_task_hours(data.get('duration'), 'duration')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
 
     if not title:
@@ -1312,7 +1172,10 @@ def api_create_task():
     conn = get_db()
     cur = conn.cursor()
     # server-side overlap validation when start_time and duration provided
-
+    overlap = find_task_overlap(cur, user_email, task_date, start_time, duration)
+    if overlap:
+        conn.close()
+        return jsonify({'error': overlap_message(overlap), **overlap}), 409
 
     cur.execute(
         'INSERT INTO tasks (user_email, title, start_time, duration, color, is_priority, task_date, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
@@ -1321,6 +1184,7 @@ def api_create_task():
     conn.commit()
     task_id = cur.lastrowid
     conn.close()
+    task_scheduler.wake()
 
 
     return jsonify({'id': task_id, 'title': title, 'start_time': start_time, 'duration': duration, 'color': color, 'is_priority': bool(is_priority), 'task_date': task_date, 'completed': False}), 201
@@ -1337,9 +1201,12 @@ def api_update_task(task_id):
 
     data = request.get_json() or {}
     title = data.get('title')
-    start_time = data.get('start_time')
-    duration = data.get('duration')
     color = data.get('color')
+    try:
+        start_time = parse_task_hours(data.get('start_time'), 'start_time')
+        duration = parse_task_hours(data.get('duration'), 'duration')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     is_priority = 1 if data.get('is_priority') else 0
     task_date = data.get('task_date')
     completed = 1 if data.get('completed') else 0
@@ -1361,6 +1228,11 @@ def api_update_task(task_id):
 
 
     # Only validate overlap when scheduling fields are being changed by the client
+    if start_time is not None or duration is not None or task_date is not None:
+        overlap = find_task_overlap(cur, user_email, prop_date, prop_start, prop_duration, exclude_id=task_id)
+        if overlap:
+            conn.close()
+            return jsonify({'error': overlap_message(overlap), **overlap}), 409
 
     # Boolean fields - Only update if present in payload
     completed_val = None
@@ -1383,6 +1255,7 @@ def api_update_task(task_id):
         return jsonify({'error': 'update failed'}), 500
    
     conn.close()
+    task_scheduler.wake()
     return jsonify({'ok': True})
 @app.route('/api/tasks/<int:task_id>', methods=['DELETE'])
 def api_delete_task(task_id):
@@ -1466,9 +1339,164 @@ def api_bulk_update_tasks():
         return jsonify({'error': 'update failed'}), 500
         
     conn.close()
+    task_scheduler.wake()
     return jsonify({'ok': True})
 
 
+TASKS_BATCH_MAX = 500
+TASK_WRITE_FIELDS = ('title', 'start_time', 'duration', 'color', 'is_priority', 'task_date', 'completed')
+# Accepted JSON types per field (null is always allowed); anything else is a 400, not a 500.
+# start_time and duration go through parse_task_hours() instead.
+TASK_FIELD_TYPES = {
+    'title': str,
+    'color': str,
+    'task_date': str,
+}
+
+
+def parse_task_op(op):
+    """Validate one /api/tasks/batch operation; returns (kind, task_id, fields) or raises ValueError."""
+    if not isinstance(op, dict):
+        raise ValueError('operation must be an object')
+    kind = op.get('op')
+    if kind not in ('create', 'update', 'delete'):
+        raise ValueError('op must be create, update or delete')
+    task_id = None
+    if kind != 'create':
+        task_id = op.get('id')
+        if not isinstance(task_id, int):
+            raise ValueError('id required')
+    fields = {f: op[f] for f in TASK_WRITE_FIELDS if f in op}
+    for f, types in TASK_FIELD_TYPES.items():
+        value = fields.get(f)
+        if value is not None and not isinstance(value, types):
+            raise ValueError(f'{f} must be a string')
+    for f in ('start_time', 'duration'):
+        if f in fields:
+            fields[f] = parse_task_hours(fields[f], f)
+    for f in TASK_BOOL_FIELDS:
+        if f in fields:
+            fields[f] = 1 if fields[f] else 0
+    if 'title' in fields:
+        fields['title'] = (fields['title'] or '').strip()
+        if not fields['title']:
+            raise ValueError('title required')
+    if kind == 'create' and 'title' not in fields:
+        raise ValueError('title required')
+    if fields.get('task_date') is not None and not valid_iso_date(fields['task_date']):
+        raise ValueError('task_date must be YYYY-MM-DD')
+    return kind, task_id, fields
+
+
+@app.route('/api/tasks/batch', methods=['POST'])
+def api_batch_tasks():
+    """
+    Apply a list of task operations in one transaction:
+        {"ops": [{"op": "create", "title": ..., "start_time": ..., ...},
+                 {"op": "update", "id": 5, "start_time": 10},
+                 {"op": "delete", "id": 7}]}
+    Either every operation is applied or none is. The response lists one
+    result per operation, in order; overlap checks run on the final state.
+    """
+    user_email = session.get('user_email')
+    if not user_email:
+        return jsonify({'error': 'unauthenticated'}), 401
+
+    ops = (request.get_json() or {}).get('ops')
+    if not isinstance(ops, list) or not ops:
+        return jsonify({'error': 'ops must be a non-empty list'}), 400
+    if len(ops) > TASKS_BATCH_MAX:
+        return jsonify({'error': f'at most {TASKS_BATCH_MAX} ops per batch'}), 400
+
+    parsed = []
+    results = []
+    for op in ops:
+        try:
+            kind, task_id, fields = parse_task_op(op)
+            parsed.append((kind, task_id, fields))
+            results.append({'op': kind, 'id': task_id, 'ok': True})
+        except ValueError as e:
+            parsed.append(None)
+            results.append({'op': op.get('op') if isinstance(op, dict) else None, 'ok': False, 'status': 400, 'error': str(e)})
+
+    def failed():
+        # Nothing was applied, so created rows don't exist either
+        for r in results:
+            if r['op'] == 'create':
+                r['id'] = None
+        status = next(r['status'] for r in results if not r['ok'])
+        return jsonify({'ok': False, 'results': results}), status
+
+    if any(p is None for p in parsed):
+        return failed()
+
+    conn = get_db()
+    cur = conn.cursor()
+    try:
+        cur.execute('BEGIN IMMEDIATE')
+        # Ownership of every referenced id in one query
+        ids = sorted({task_id for _, task_id, _ in parsed if task_id is not None})
+        owned = set()
+        if ids:
+            placeholders = ','.join('?' * len(ids))
+            cur.execute(f'SELECT id FROM tasks WHERE user_email = ? AND id IN ({placeholders})', [user_email] + ids)
+            owned = {r['id'] for r in cur.fetchall()}
+        for (kind, task_id, _), result in zip(parsed, results):
+            if kind != 'create' and task_id not in owned:
+                result.update(ok=False, status=404, error='not found')
+        if not all(r['ok'] for r in results):
+            conn.rollback()
+            conn.close()
+            return failed()
+
+        # Creates run one by one for their ids; updates and deletes are one
+        # executemany each. Everything shares the transaction (one commit).
+        now = datetime.now().isoformat()
+        today = datetime.now().strftime('%Y-%m-%d')
+        for (kind, _, fields), result in zip(parsed, results):
+            if kind == 'create':
+                cur.execute(
+                    'INSERT INTO tasks (user_email, title, start_time, duration, color, is_priority, task_date, completed, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (user_email, fields['title'], fields.get('start_time'), fields.get('duration'), fields.get('color'),
+                     fields.get('is_priority', 0), fields.get('task_date') or today, fields.get('completed', 0), now),
+                )
+                result['id'] = cur.lastrowid
+        cur.executemany(
+            'UPDATE tasks SET title = COALESCE(?, title), start_time = COALESCE(?, start_time), duration = COALESCE(?, duration), color = COALESCE(?, color), is_priority = COALESCE(?, is_priority), task_date = COALESCE(?, task_date), completed = COALESCE(?, completed) WHERE id = ? AND user_email = ?',
+            [tuple(fields.get(f) for f in TASK_WRITE_FIELDS) + (task_id, user_email)
+             for kind, task_id, fields in parsed if kind == 'update'],
+        )
+        cur.executemany(
+            'DELETE FROM tasks WHERE id = ? AND user_email = ?',
+            [(task_id, user_email) for kind, task_id, _ in parsed if kind == 'delete'],
+        )
+
+        # Overlaps are checked against the batch's final state
+        deleted = {task_id for kind, task_id, _ in parsed if kind == 'delete'}
+        for (kind, _, fields), result in zip(parsed, results):
+            if kind == 'delete' or result['id'] in deleted:
+                continue
+            if kind == 'update' and not ({'start_time', 'duration', 'task_date'} & fields.keys()):
+                continue
+            cur.execute('SELECT start_time, duration, task_date FROM tasks WHERE id = ?', (result['id'],))
+            row = cur.fetchone()
+            overlap = find_task_overlap(cur, user_email, row['task_date'], row['start_time'], row['duration'], exclude_id=result['id'])
+            if overlap:
+                result.update(ok=False, status=409, error=overlap_message(overlap), **overlap)
+        if not all(r['ok'] for r in results):
+            conn.rollback()
+            conn.close()
+            return failed()
+        conn.commit()
+    except sqlite3.Error as e:
+        conn.rollback()
+        conn.close()
+        print(f"[TASKS] batch failed: {e}", flush=True)
+        return jsonify({'error': 'batch failed'}), 500
+
+    conn.close()
+    task_scheduler.wake()
+    return jsonify({'ok': True, 'results': results})
 
 
 
@@ -1481,8 +1509,6 @@ def tasks():
         flash('Please sign in to view your tasks.')
         return redirect(url_for('index'))
 
-    cleanup_old_tasks(user_email)
-
     conn = get_db()
     cur = conn.cursor()
     today_iso = datetime.now().strftime('%Y-%m-%d')
@@ -1524,32 +1550,23 @@ def add_task():
 
 
     try:
-        start_time_val = float(start_time) if start_time else None
-    except Exception:
-        start_time_val = None
-
-
-    try:
-        duration_val = float(duration) if duration else None
-    except Exception:
-        duration_val = None
+        start_time_val = parse_task_hours(start_time, 'start_time')
+        duration_val = parse_task_hours(duration, 'duration')
+    except ValueError:
+        flash('Start time and duration must be numbers of hours.')
+        next_view = request.form.get('next') or 'tasks'
+        return redirect(url_for(next_view))
 
 
     conn = get_db()
     cur = conn.cursor()
     # server-side overlap check for form submissions
-    try:
-        if start_time_val is not None and duration_val is not None:
-            new_start = float(start_time_val)
-            new_end = new_start + float(duration_val)
-            cur.execute('SELECT id FROM tasks WHERE user_email = ? AND task_date = ? AND start_time IS NOT NULL AND duration IS NOT NULL AND (start_time < ? AND (start_time + duration) > ?)', (user_email, task_date, new_end, new_start))
-            if cur.fetchone():
-                conn.close()
-                flash('Task overlaps an existing task. Choose another time.')
-                next_view = request.form.get('next') or 'tasks'
-                return redirect(url_for(next_view))
-    except Exception:
-        pass
+    overlap = find_task_overlap(cur, user_email, task_date, start_time_val, duration_val)
+    if overlap:
+        conn.close()
+        flash(overlap_message(overlap))
+        next_view = request.form.get('next') or 'tasks'
+        return redirect(url_for(next_view))
 
 
     cur.execute(
@@ -1558,6 +1575,7 @@ def add_task():
     )
     conn.commit()
     conn.close()
+    task_scheduler.wake()
 
 
     flash('Task added.')
@@ -1671,20 +1689,22 @@ def budgetexpenses():
     cur.execute('SELECT * FROM expenses WHERE user_email = ? AND month_iso = ? ORDER BY expense_date DESC, created_at DESC', (user_email, selected_month_iso))
     rows = cur.fetchall()
     expenses = [dict(r) for r in rows]
-    total_spent = sum(r['amount'] for r in expenses)
     
     # Calculate Total Spent Today
     cur.execute('SELECT amount FROM expenses WHERE user_email = ? AND expense_date = ?', (user_email, today_iso))
     total_spent_today = sum(r['amount'] for r in cur.fetchall())
     # Add groceries from today
-    cur.execute('SELECT estimated_cost FROM grocery_items WHERE user_email = ? AND substr(created_at, 1, 10) = ? AND is_checked = 1', (user_email, today_iso))
+    cur.execute('SELECT estimated_cost FROM grocery_items WHERE user_email = ? AND purchased_on = ?', (user_email, today_iso))
     total_spent_today += sum(r['estimated_cost'] or 0 for r in cur.fetchall())
 
     # 3. Grocery Items (if valid for this month)
     cur.execute('SELECT * FROM grocery_items WHERE user_email = ? AND month_iso = ? ORDER BY is_checked ASC, created_at DESC', (user_email, selected_month_iso))
     g_rows = cur.fetchall()
     groceries = [dict(r) for r in g_rows]
-    total_spent += sum(r['estimated_cost'] or 0 for r in groceries if r['is_checked'])
+
+    # Month total (expenses + checked groceries) from the spend rollup
+    cur.execute('SELECT COALESCE(ROUND(SUM(total), 2), 0) FROM monthly_spend_rollup WHERE user_email = ? AND month_iso = ?', (user_email, selected_month_iso))
+    total_spent = cur.fetchone()[0]
 
     # 4. Spending Categories
     cur.execute('SELECT id, name, color FROM spending_categories WHERE user_email = ?', (user_email,))
@@ -1758,8 +1778,7 @@ def update_mood():
         return redirect(url_for('index'))
   
     mood_val = request.form.get('mood')
-    mood_score_map = {'Stressed': 0, 'Tired': 1, 'Neutral': 2, 'Happy': 3}
-    mood_score = mood_score_map.get(mood_val, 2)
+    mood_score = MOOD_SCORES.get(mood_val, MOOD_SCORES[DEFAULT_MOOD])
     date_str = datetime.now().strftime('%Y-%m-%d')
     now = datetime.now().isoformat()
 
@@ -1773,6 +1792,7 @@ def update_mood():
             DO UPDATE SET mood = excluded.mood, mood_score = excluded.mood_score
         """, (user_email, date_str, mood_val, mood_score, now))
         conn.commit()
+        invalidate_mood_cache(user_email)
         
         # After updating, fetch the fresh week_data to return to the frontend
         wellness_data = get_mood_wellness_data(user_email)
@@ -1832,6 +1852,7 @@ def update_wellness():
         pass
 
         conn.commit()
+        invalidate_mood_cache(user_email)
         success = True
         
         # Fetch the updated wellness tip
@@ -2040,10 +2061,13 @@ def edit_profile(user_id):
             return redirect(url_for('edit_profile', user_id=user_id))
 
         # Update user
-        cur.execute('UPDATE users SET first = ?, last = ?, email = ?, birthdate = ?, gender = ?, height = ?, weight = ?, profile_picture = ? WHERE id = ?',
-                    (first_name, last_name, email, birthdate, gender, height, weight, user.get('profile_picture', ''), user_id))
+        # Store the parsed measurements alongside the text the user typed
+        cur.execute('UPDATE users SET first = ?, last = ?, email = ?, birthdate = ?, gender = ?, height = ?, weight = ?, height_m = ?, weight_kg = ?, profile_picture = ? WHERE id = ?',
+                    (first_name, last_name, email, birthdate, gender, height, weight, parse_height(height) or None, parse_weight(weight) or None, user.get('profile_picture', ''), user_id))
         conn.commit()
         conn.close()
+        invalidate_mood_cache(user_email)
+        invalidate_mood_cache(email)
 
         # Update session if email or first name changed
         if email != user_email:
@@ -2415,6 +2439,7 @@ def api_groceries_add():
     estimated_cost = float(data.get('estimated_cost') or 0)
     category = (data.get('category') or '').strip()
     is_checked = 1 if data.get('is_checked') else 0
+    purchased_on = datetime.now().strftime('%Y-%m-%d') if is_checked else None
     now = datetime.utcnow().isoformat()
 
     if not item_name:
@@ -2424,9 +2449,9 @@ def api_groceries_add():
     cur = conn.cursor()
     try:
         cur.execute("""
-            INSERT INTO grocery_items (user_email, item_name, quantity, estimated_cost, category, is_checked, month_iso, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (user_email, item_name, quantity, estimated_cost, category, is_checked, month_iso, now))
+            INSERT INTO grocery_items (user_email, item_name, quantity, estimated_cost, category, is_checked, purchased_on, month_iso, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (user_email, item_name, quantity, estimated_cost, category, is_checked, purchased_on, month_iso, now))
         conn.commit()
         new_id = cur.lastrowid
         conn.close()
@@ -2468,6 +2493,13 @@ def api_groceries_update(item_id):
     if 'is_checked' in data:
         updates.append('is_checked = ?')
         params.append(1 if data['is_checked'] else 0)
+        # Purchase date: set when the item is checked off (kept if it already
+        # was), cleared when unchecked
+        if data['is_checked']:
+            updates.append('purchased_on = CASE WHEN is_checked = 1 AND purchased_on IS NOT NULL THEN purchased_on ELSE ? END')
+            params.append(datetime.now().strftime('%Y-%m-%d'))
+        else:
+            updates.append('purchased_on = NULL')
     
     if not updates:
         return jsonify({'error': 'No fields to update'}), 400
@@ -2510,205 +2542,437 @@ def api_groceries_delete(item_id):
     return jsonify({'deleted': True})
 
 
-def send_login_email(logged_in_email, first_name):
-    # Notice: To stop simulating and actually send emails, you MUST provide real Gmail credentials here.
-    # We will use smtp.gmail.com as the server.
-    smtp_server = "smtp.gmail.com"
-    smtp_port = 587
-    
-    # TODO: Fill in your actual Gmail email and App Password here!
-    smtp_user = os.environ.get('SMTP_USERNAME', 'kimmy.guiriba46@gmail.com') 
-    smtp_pass = os.environ.get('SMTP_PASSWORD', 'jvuabrvpvkxwknlh')
-
-    msg = EmailMessage()
-    msg['Subject'] = "Security Alert: New Login to MomCare"
-    msg['From'] = smtp_user
-    msg['To'] = logged_in_email
+# Delta sync: every synced row carries the sync_clock value of its last
+# change, deletes leave a row in sync_tombstones (see migrations.py).
+SYNC_COLUMNS = {
+    'tasks': TASK_FIELDS,
+    'reminders': ('id', 'title', 'message', 'remind_at', 'is_recurring', 'recurrence_rule', 'created_at'),
+    'expenses': ('id', 'month_iso', 'category', 'description', 'color', 'amount', 'expense_date', 'is_eco'),
+    'groceries': ('id', 'month_iso', 'item_name', 'quantity', 'estimated_cost', 'category', 'is_checked'),
+}
+SYNC_PAGE_MAX = 500
+
+
+@app.route('/api/sync', methods=['GET'])
+def api_sync():
+    """
+    Rows changed and deleted since a sync token.
+
+    ?since=<version> from the previous response (0 or missing for a full
+    snapshot). Clients apply 'deleted' before 'changes'. When has_more is
+    true, call again with the returned version. reset=true means the token
+    is too old (or unknown): drop local data and use 'changes' as the
+    snapshot.
+    """
+    user_email = session.get('user_email')
+    if not user_email:
+        return jsonify({'error': 'login required'}), 401
+
+    try:
+        since = max(0, int(request.args.get('since') or 0))
+    except ValueError:
+        return jsonify({'error': 'since must be an integer'}), 400
+
+    conn = get_db()
+    cur = conn.cursor()
+    # One read transaction so the clock and every table come from the same snapshot
+    if not conn.in_transaction:
+        cur.execute('BEGIN')
+    cur.execute('SELECT version, tombstones_pruned_through FROM sync_clock WHERE id = 1')
+    clock = cur.fetchone()
+    reset = since > clock['version'] or (since and since < clock['tombstones_pruned_through'])
+    if reset:
+        since = 0
+
+    changes = {}
+    tombstones = []
+    truncated_at = []
+    for entity, table in SYNC_TABLES.items():
+        columns = SYNC_COLUMNS[entity]
+        cur.execute(
+            f"SELECT {', '.join(columns)}, version, updated_at FROM {table} "
+            f"WHERE user_email = ? AND version > ? ORDER BY version LIMIT ?",
+            (user_email, since, SYNC_PAGE_MAX + 1),
+        )
+        rows = cur.fetchall()
+        if len(rows) > SYNC_PAGE_MAX:
+            rows = rows[:SYNC_PAGE_MAX]
+            truncated_at.append(rows[-1]['version'])
+        changes[entity] = [dict(r) for r in rows]
+    if since:
+        cur.execute(
+            'SELECT entity, row_id, version FROM sync_tombstones WHERE user_email = ? AND version > ? ORDER BY version LIMIT ?',
+            (user_email, since, SYNC_PAGE_MAX + 1),
+        )
+        rows = cur.fetchall()
+        if len(rows) > SYNC_PAGE_MAX:
+            rows = rows[:SYNC_PAGE_MAX]
+            truncated_at.append(rows[-1]['version'])
+        tombstones = rows
+    conn.rollback()
+    conn.close()
+
+    # A page boundary in any stream caps the token; rows past it in the other
+    # streams are sent again on the next call, which is harmless for upserts.
+    version = min(truncated_at) if truncated_at else clock['version']
+    if truncated_at:
+        changes = {e: [r for r in rows if r['version'] <= version] for e, rows in changes.items()}
+    deleted = {entity: [] for entity in SYNC_TABLES}
+    for r in tombstones:
+        if r['version'] <= version:
+            deleted[r['entity']].append(r['row_id'])
+    for r in changes['tasks']:
+        for f in TASK_BOOL_FIELDS:
+            r[f] = bool(r[f])
+
+    return jsonify({
+        'version': version,
+        'has_more': bool(truncated_at),
+        'reset': bool(reset),
+        'changes': changes,
+        'deleted': deleted,
+    })
+
+
+# Shared SMTP session pool for every outgoing email (login alerts, task
+# notifications, scheduled reminders).
+# Configured from the environment only (see mailer.py): SMTP_USERNAME /
+# SMTP_PASSWORD (Gmail App Password) or MAIL_SERVER for another server.
+mailer = Mailer.from_env()
+
+
+# Durable outbox: handlers queue mail with one INSERT, the dispatcher thread
+# sends it in batches with retry/backoff (see outbox.py).
+email_outbox = OutboxDispatcher(get_db, mailer)
+
+# One login alert per user per window; new alerts are dropped while the
+# outbox already holds MOMCARE_LOGIN_ALERT_MAX_PENDING unsent ones.
+login_alerts = CoalescingGate(
+    window=int(os.environ.get('MOMCARE_LOGIN_ALERT_WINDOW', 300)),
+    max_pending=int(os.environ.get('MOMCARE_LOGIN_ALERT_MAX_PENDING', 1000)),
+)
+
+
+def login_alert_stats():
+    """Queued / coalesced / dropped at login time, sent by the outbox."""
+    stats = login_alerts.stats()
+    stats['sent'] = email_outbox.stats()['sent_by_kind'].get('login', 0)
+    return stats
+
+
+def queue_login_email(cur, logged_in_email, first_name):
     login_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    msg.set_content(f"Hello {first_name},\n\nA new login to your MomCare account was detected.\n\nTime: {login_time}\n\nIf this wasn't you, please secure your account immediately.\n\nBest regards,\nMomCare Security")
+    return enqueue_email(
+        cur,
+        logged_in_email,
+        "Security Alert: New Login to MomCare",
+        f"Hello {first_name},\n\nA new login to your MomCare account was detected.\n\nTime: {login_time}\n\nIf this wasn't you, please secure your account immediately.\n\nBest regards,\nMomCare Security",
+        kind='login',
+    )
+
 
+def queue_task_notification_email(cur, to_email, task_title, start_time_str):
+    return enqueue_email(
+        cur,
+        to_email,
+        f"Reminder: Upcoming Task '{task_title}'",
+        f"Hello,\n\nThis is a friendly reminder that your task '{task_title}' is scheduled to start at {start_time_str} today.\n\nBest regards,\nMomCare Team",
+        kind='task',
+    )
+
+
+# Task emails go out from TASK_NOTIFY_LEAD_HOURS before start_time until
+# TASK_NOTIFY_GRACE_HOURS after it (start_time is hours since midnight).
+TASK_NOTIFY_LEAD_HOURS = 0.5
+TASK_NOTIFY_GRACE_HOURS = 0.25
+
+
+def hours_since_midnight(now):
+    return now.hour + now.minute / 60.0 + now.second / 3600.0
+
+
+def format_task_time(start_time_val):
+    h = int(start_time_val)
+    m = int(round((start_time_val - h) * 60))
+    am_pm = 'AM' if h < 12 else 'PM'
+    fmt_h = h if h <= 12 else h - 12
+    if fmt_h == 0: fmt_h = 12
+    return f"{fmt_h}:{m:02d} {am_pm}"
+
+
+def load_upcoming_tasks(limit):
+    """Today's un-notified tasks whose window hasn't passed, as (window opens epoch, id)."""
+    now = datetime.now()
+    midnight = datetime.combine(now.date(), datetime.min.time())
+    conn = get_db()
+    cur = conn.cursor()
     try:
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        # This will fail with an AuthenticationError if you haven't replaced the mock credentials!
-        server.login(smtp_user, smtp_pass)
-        server.send_message(msg)
-        server.quit()
-        print(f"[LOGIN EMAIL SENT] Successfully sent login alert to {logged_in_email}.", flush=True)
-    except Exception as e:
-        print(f"\n[LOGIN EMAIL FAILED] Could not send real email because SMTP credentials are not valid! Error: {e}\n⚠️ Please edit app.py to include your real Gmail App Password!\n", flush=True)
+        # Text sorts after every number, so a legacy row like '9am' would pass
+        # start_time >= ? and then break the timedelta below for everyone
+        cur.execute(
+            "SELECT id, start_time FROM tasks WHERE task_date = ? AND notified = 0 AND start_time >= ? AND completed = 0 "
+            "AND typeof(start_time) IN ('integer', 'real') ORDER BY start_time LIMIT ?",
+            (now.strftime('%Y-%m-%d'), hours_since_midnight(now) - TASK_NOTIFY_GRACE_HOURS, limit)
+        )
+        return [
+            ((midnight + timedelta(hours=r['start_time'] - TASK_NOTIFY_LEAD_HOURS)).timestamp(), r['id'])
+            for r in cur.fetchall()
+        ]
+    finally:
+        conn.close()
 
 
-def send_task_notification_email(to_email, task_title, start_time_str):
-    # We will use smtp.gmail.com as the server.
-    smtp_server = "smtp.gmail.com"
-    smtp_port = 587
-    
-    # Use the same exact app password and email that works for the login alert!
-    smtp_user = os.environ.get('SMTP_USERNAME', 'kimmy.guiriba46@gmail.com') 
-    smtp_pass = os.environ.get('SMTP_PASSWORD', 'jvuabrvpvkxwknlh')
+def queue_due_task_notifications(task_ids):
+    """Queue emails for the given tasks still inside their window and flag them notified."""
+    now = datetime.now()
+    current_time_val = hours_since_midnight(now)
+    conn = get_db()
+    cur = conn.cursor()
+    placeholders = ','.join('?' for _ in task_ids)
+    cur.execute(
+        f'SELECT id, user_email, title, start_time FROM tasks WHERE id IN ({placeholders}) AND task_date = ? AND notified = 0 AND completed = 0 AND start_time BETWEEN ? AND ?',
+        (*task_ids, now.strftime('%Y-%m-%d'), current_time_val - TASK_NOTIFY_GRACE_HOURS, current_time_val + TASK_NOTIFY_LEAD_HOURS)
+    )
+    rows = cur.fetchall()
 
-    msg = EmailMessage()
-    msg['Subject'] = f"Reminder: Upcoming Task '{task_title}'"
-    msg['From'] = smtp_user
-    msg['To'] = to_email
-    msg.set_content(f"Hello,\n\nThis is a friendly reminder that your task '{task_title}' is scheduled to start at {start_time_str} today.\n\nBest regards,\nMomCare Team")
+    for t in rows:
+        queue_task_notification_email(cur, t['user_email'], t['title'], format_task_time(t['start_time']))
 
+    # Emails and notified flags are written in one transaction
+    if rows:
+        notified_ids = [t['id'] for t in rows]
+        placeholders = ','.join('?' for _ in notified_ids)
+        cur.execute(f'UPDATE tasks SET notified = 1 WHERE id IN ({placeholders})', notified_ids)
+        conn.commit()
+        email_outbox.wake()
+    conn.close()
+    return []
+
+
+# Sleeps until the next task's notification window opens; task writes wake it.
+task_scheduler = DeadlineScheduler('TASK NOTIFICATION WORKER', load_upcoming_tasks, queue_due_task_notifications)
+
+
+def load_upcoming_reminders(limit):
+    """Earliest unsent reminders as (epoch, id), overdue ones first."""
+    conn = get_db()
+    cur = conn.cursor()
     try:
-        server = smtplib.SMTP(smtp_server, int(smtp_port))
-        server.starttls()
-        server.login(smtp_user, smtp_pass)
-        server.send_message(msg)
-        server.quit()
-        print(f"[TASK EMAIL SENT] Successfully sent notification to {to_email} for task '{task_title}'.", flush=True)
-    except Exception as e:
-        print(f"[TASK EMAIL ERROR] Failed to send to {to_email}: {e}", flush=True)
+        # Rows written without remind_at_epoch (older scripts, manual inserts).
+        # Unparseable remind_at values stay NULL and are skipped, not rewritten
+        # on every load: each commit would wake the workers again.
+        cur.execute(
+            'UPDATE reminder_items SET remind_at_epoch = ' + REMIND_AT_EPOCH_SQL.format('remind_at')
+            + ' WHERE email_sent = 0 AND remind_at_epoch IS NULL AND remind_at IS NOT NULL'
+            + ' AND ' + REMIND_AT_EPOCH_SQL.format('remind_at') + ' IS NOT NULL'
+        )
+        # Don't commit a no-op: every commit bumps data_version and re-wakes the workers
+        if cur.rowcount:
+            conn.commit()
+        else:
+            conn.rollback()
+        cur.execute(
+            'SELECT id, remind_at_epoch FROM reminder_items WHERE email_sent = 0 AND remind_at_epoch IS NOT NULL ORDER BY remind_at_epoch LIMIT ?',
+            (limit,)
+        )
+        return [(r['remind_at_epoch'], r['id']) for r in cur.fetchall()]
+    finally:
+        conn.close()
 
-def task_notification_worker():
-    while True:
-        try:
-            conn = sqlite3.connect(DB_PATH, timeout=30)
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
-            today_iso = datetime.now().strftime('%Y-%m-%d')
-            
-            # Get pending, unnotified tasks for today
-            try:
-                cur.execute('SELECT id, user_email, title, start_time FROM tasks WHERE task_date = ? AND completed = 0 AND notified = 0 AND start_time IS NOT NULL', (today_iso,))
-                tasks = cur.fetchall()
-            except Exception as e:
-                # Table might not exist yet if db init hasn't completed
-                tasks = []
-
-            now = datetime.now()
-            current_time_val = now.hour + (now.minute / 60.0)
-
-            for t in tasks:
-                start_time_val = t['start_time']
-                if start_time_val is None:
-                    continue
-                
-                # Check if task is starting within the next 30 minutes (0.5 hours)
-                if current_time_val >= (start_time_val - 0.5) and current_time_val <= (start_time_val + 0.25):
-                    # Format time roughly
-                    h = int(start_time_val)
-                    m = int(round((start_time_val - h) * 60))
-                    am_pm = 'AM' if h < 12 else 'PM'
-                    fmt_h = h if h <= 12 else h - 12
-                    if fmt_h == 0: fmt_h = 12
-                    start_time_str = f"{fmt_h}:{m:02d} {am_pm}"
-
-                    send_task_notification_email(t['user_email'], t['title'], start_time_str)
-
-                    # Mark as notified
-                    cur.execute('UPDATE tasks SET notified = 1 WHERE id = ?', (t['id'],))
-                    conn.commit()
-            
-            conn.close()
-        except Exception as e:
-            print(f"Error in task_notification_worker: {e}", flush=True)
-        
-        time.sleep(60)
 
+def queue_due_reminders(reminder_ids):
+    """Move the given reminders into the email outbox if still unsent and due."""
+    conn = get_db()
+    cur = conn.cursor()
+    placeholders = ','.join('?' for _ in reminder_ids)
+    cur.execute(
+        f'SELECT id, user_email, title, message, remind_at FROM reminder_items WHERE id IN ({placeholders}) AND email_sent = 0 AND remind_at_epoch <= ?',
+        (*reminder_ids, int(time.time()))
+    )
+    rows = cur.fetchall()
 
-def scheduled_reminder_worker():
-    """Background worker to send scheduled reminder emails."""
-    print("[SCHEDULED WORKER] Started - checking for reminders every 60 seconds", flush=True)
-    while True:
-        try:
-            conn = sqlite3.connect(DB_PATH, timeout=30)
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
+    for row in rows:
+        user_email = row['user_email']
+        title = row['title'] or 'Scheduled Reminder'
+        message = row['message'] or 'This is your scheduled reminder.'
+        print(f"[SCHEDULED REMINDER] Queueing '{title}' for {user_email} (scheduled for {row['remind_at']})", flush=True)
+        enqueue_email(cur, user_email, f"Reminder: {title}", f"Hello,\n\n{message}\n\nBest regards,\nMomCare Team", kind='reminder')
 
-            # Get candidates (not yet sent) and evaluate with datetime parsing.
-            cur.execute(
-                'SELECT id, user_email, title, message, remind_at FROM reminder_items WHERE remind_at IS NOT NULL AND email_sent = 0'
-            )
-            rows = cur.fetchall()
-
-            for row in rows:
-                remind_at_val = row['remind_at']
-                if not remind_at_val:
-                    continue
-
-                # Normalize reminder datetime that may use ISO `T` or space and optional seconds
-                try:
-                    remind_dt = datetime.fromisoformat(remind_at_val)
-                except Exception:
-                    try:
-                        remind_dt = datetime.strptime(remind_at_val, '%Y-%m-%d %H:%M:%S')
-                    except Exception:
-                        try:
-                            remind_dt = datetime.strptime(remind_at_val, '%Y-%m-%d %H:%M')
-                        except Exception:
-                            print(f"[SCHEDULED REMINDER PARSE ERROR] cannot parse remind_at={remind_at_val}", flush=True)
-                            continue
-
-                if remind_dt > datetime.now():
-                    continue
-
-                user_email = row['user_email']
-                title = row['title'] or 'Scheduled Reminder'
-                message = row['message'] or 'This is your scheduled reminder.'
-
-                print(f"[SCHEDULED REMINDER] Sending '{title}' to {user_email} (scheduled for {remind_at_val})", flush=True)
-
-                smtp_server = 'smtp.gmail.com'
-                smtp_port = 587
-                smtp_user = os.environ.get('SMTP_USERNAME') or os.environ.get('MAIL_USERNAME') or 'kimmy.guiriba46@gmail.com'
-                smtp_pass = os.environ.get('SMTP_PASSWORD') or os.environ.get('MAIL_PASSWORD') or 'jvuabrvpvkxwknlh'
-
-                print(f"[SCHEDULED REMINDER EMAIL] Using SMTP user: {smtp_user} (credentials set: {'yes' if smtp_pass else 'no'})", flush=True)
-                if smtp_user and smtp_pass:
-                    subject = f"Reminder: {title}"
-                    body = f"Hello,\n\n{message}\n\nBest regards,\nMomCare Team"
-
-                    msg = EmailMessage()
-                    msg['Subject'] = subject
-                    msg['From'] = smtp_user
-                    msg['To'] = user_email
-                    msg.set_content(body)
-
-                    try:
-                        server = smtplib.SMTP(smtp_server, smtp_port)
-                        server.starttls()
-                        server.login(smtp_user, smtp_pass)
-                        server.send_message(msg)
-                        server.quit()
-                        print(f"[SCHEDULED REMINDER EMAIL] Successfully sent '{title}' to {user_email}", flush=True)
-                    except Exception as e:
-                        print(f"[SCHEDULED REMINDER EMAIL ERROR] Failed to send to {user_email}: {e}", flush=True)
-                        cur.close()
-                        conn.close()
-                        time.sleep(60)
-                        continue
+    # Queued and marked sent atomically; delivery retries are the outbox's job.
+    if rows:
+        cur.executemany('UPDATE reminder_items SET email_sent = 1 WHERE id = ?', [(r['id'],) for r in rows])
+        conn.commit()
+        email_outbox.wake()
+    conn.close()
+    return []
+
+
+# Sleeps until the earliest unsent reminder is due; /api/reminders writes wake it.
+reminder_scheduler = DeadlineScheduler('SCHEDULED REMINDER WORKER', load_upcoming_reminders, queue_due_reminders)
+
+
+# Completed tasks from previous days are purged once a day (and old sync
+# tombstones pruned) instead of on every page view; see janitor.py.
+janitor = Janitor(get_db, tombstone_days=int(os.environ.get('MOMCARE_TOMBSTONE_RETENTION_DAYS', 30)))
+
+
+LOOPBACK_ADDRS = ('127.0.0.1', '::1')
+
+
+def metrics_authorized():
+    """Bearer MOMCARE_METRICS_TOKEN if it is set, otherwise local scrapes only."""
+    token = os.environ.get('MOMCARE_METRICS_TOKEN')
+    if not token:
+        return request.remote_addr in LOOPBACK_ADDRS
+    return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text format: per-endpoint request metrics plus worker, cache and pool stats."""
+    if not metrics_authorized():
+        return jsonify({'error': 'unauthorized'}), 401
+    outbox_stats = email_outbox.stats()
+    body = ''.join([
+        request_metrics.render(),
+        render_stats('momcare_db_pool', 'SQLite connection pool', [((), db_pool.stats())]),
+        render_stats('momcare_mood_cache', 'Mood/wellness cache', [((), mood_cache.stats())]),
+        render_stats('momcare_email_outbox', 'Email outbox dispatcher', [((), outbox_stats)]),
+        render_stats('momcare_login_alerts', 'Login alert coalescing', [((), login_alert_stats())]),
+        render_stats('momcare_janitor', 'Daily maintenance job', [((), janitor.stats())]),
+        render_stats('momcare_sql_tracer', 'SQL statements traced', [((), sql_tracer.stats())]),
+        render_stats('momcare_scheduler', 'Background schedulers',
+                     [((('scheduler', sch.name),), dict(sch.stats(), running=int(sch.running))) for sch in BACKGROUND_SCHEDULERS]),
+    ])
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/metrics/sql')
+def metrics_sql():
+    """Top statements by total time, slowest single statements and N+1 suspects."""
+    if not metrics_authorized():
+        return jsonify({'error': 'unauthorized'}), 401
+    return jsonify(sql_tracer.report(limit=request.args.get('limit', 20, type=int)))
+
+
+# Background workers run in exactly one process: whichever holds the
+# 'background-workers' lease. MOMCARE_BACKGROUND_WORKERS=off keeps web
+# processes out of the election entirely (run `python worker.py` instead).
+BACKGROUND_SCHEDULERS = [task_scheduler, reminder_scheduler, email_outbox.scheduler, janitor.scheduler]
+WORKER_LEASE_TTL = int(os.environ.get('MOMCARE_WORKER_LEASE_TTL', 30))
+WORKER_POLL_SECONDS = float(os.environ.get('MOMCARE_WORKER_POLL_SECONDS', 2))
+background_stop = threading.Event()
+
+
+# The table each scheduler loads from; its table_changes counter (kept by
+# triggers, see migrations.CHANGE_WATCHED) going up wakes that scheduler.
+SCHEDULER_TABLES = {task_scheduler: 'tasks', reminder_scheduler: 'reminder_items', email_outbox.scheduler: 'email_outbox'}
+
+
+def poll_table_changes(conn, last_counters):
+    """Read table_changes; return (counters, schedulers whose table changed since last_counters)."""
+    tables = list(SCHEDULER_TABLES.values())
+    placeholders = ','.join('?' * len(tables))
+    counters = dict(conn.execute(f'SELECT name, version FROM table_changes WHERE name IN ({placeholders})', tables).fetchall())
+    if last_counters is None:
+        return counters, []
+    return counters, [sch for sch, table in SCHEDULER_TABLES.items() if counters.get(table) != last_counters.get(table)]
+
+
+def run_background_workers():
+    """Heartbeat the lease; while leader, keep the schedulers running."""
+    # Dedicated connection: lease writes on it don't change its data_version,
+    # so a data_version bump means another connection (or process) wrote.
+    conn = sqlite3.connect(db_pool.db_path, timeout=30)
+    lease = LeaderLease(conn, 'background-workers', ttl=WORKER_LEASE_TTL)
+    next_heartbeat = 0.0
+    last_version = None
+    last_counters = None
+    try:
+        while not background_stop.is_set():
+            if time.monotonic() >= next_heartbeat:
+                if lease.renew():
+                    for scheduler in BACKGROUND_SCHEDULERS:
+                        if scheduler.start():
+                            print(f"[WORKERS] Started {scheduler.name}", flush=True)
                 else:
-                    print(f"[SCHEDULED REMINDER EMAIL] No SMTP credentials (SMTP_USERNAME/SMTP_PASSWORD or MAIL_USERNAME/MAIL_PASSWORD).", flush=True)
+                    for scheduler in BACKGROUND_SCHEDULERS:
+                        scheduler.stop()
+                next_heartbeat = time.monotonic() + WORKER_LEASE_TTL / 3
+
+            # Writes from other processes can't call wake(); poll for them.
+            # data_version is a cheap "anything changed?" check; the counters
+            # then say which tables, so unrelated writes wake nobody.
+            if lease.is_leader:
+                version = conn.execute('PRAGMA data_version').fetchone()[0]
+                if version != last_version:
+                    last_counters, changed = poll_table_changes(conn, last_counters)
+                    for scheduler in changed:
+                        scheduler.wake()
+                last_version = version
+            background_stop.wait(WORKER_POLL_SECONDS)
+    finally:
+        for scheduler in BACKGROUND_SCHEDULERS:
+            scheduler.stop()
+        if lease.is_leader:
+            lease.release()
+        conn.close()
 
-                # Mark as sent whether email send succeeded or not (to avoid retry loops)
-                cur.execute('UPDATE reminder_items SET email_sent = 1 WHERE id = ?', (row['id'],))
-                conn.commit()
 
-            conn.close()
-        except Exception as e:
-            print(f"[SCHEDULED REMINDER WORKER ERROR] {e}", flush=True)
+def start_background_workers():
+    thread = threading.Thread(target=run_background_workers, name='background-workers', daemon=True)
+    thread.start()
+    return thread
+
 
-        # Check every 60 seconds
-        time.sleep(60)
+background_workers_thread = None
 
 
-# Start background threads
-print("[STARTUP] Starting background worker threads...", flush=True)
-task_worker_thread = threading.Thread(target=task_notification_worker, daemon=True)
-task_worker_thread.start()
-print("[STARTUP] Task worker thread started", flush=True)
+def create_app(config=None):
+    """
+    Configure the app and run its startup steps; call once per process.
+    Importing this module only defines things: no database access, no
+    threads. WSGI servers use the factory, e.g. gunicorn 'app:create_app()'.
+
+    config keys (defaults come from the environment):
+        DB_PATH             database file (MOMCARE_DB_PATH, else users.db here)
+        CHECK_SCHEMA        apply pending migrations (True)
+        BACKGROUND_WORKERS  join the worker leader election
+                            (True unless MOMCARE_BACKGROUND_WORKERS=off)
+        SLOW_QUERY_LOG      rotating slow-query log path, None to disable
+                            (MOMCARE_SLOW_QUERY_LOG, 'off' to disable)
+    """
+    global background_workers_thread
+    slow_query_log = os.environ.get('MOMCARE_SLOW_QUERY_LOG', str(DB_PATH.parent / 'logs' / 'slow_queries.log'))
+    settings = {
+        'DB_PATH': DB_PATH,
+        'CHECK_SCHEMA': True,
+        'BACKGROUND_WORKERS': os.environ.get('MOMCARE_BACKGROUND_WORKERS', 'auto').lower() != 'off',
+        'SLOW_QUERY_LOG': None if slow_query_log.lower() == 'off' else slow_query_log,
+    }
+    settings.update(config or {})
+    app.config.update(settings)
+
+    if Path(settings['DB_PATH']) != Path(db_pool.db_path):
+        db_pool.close_all()
+        db_pool.db_path = Path(settings['DB_PATH'])
+    sql_tracer.set_log_path(settings['SLOW_QUERY_LOG'])
+
+    if settings['CHECK_SCHEMA']:
+        try:
+            init_db()
+        except Exception as e:
+            # don't prevent app from starting if init has issues; log to console
+            print(f'Warning: init_db() failed to run during startup: {e}')
 
-scheduled_worker_thread = threading.Thread(target=scheduled_reminder_worker, daemon=True)
-scheduled_worker_thread.start()
-print("[STARTUP] Scheduled reminder worker thread started", flush=True)
+    if settings['BACKGROUND_WORKERS'] and background_workers_thread is None:
+        print("[STARTUP] Starting background workers (leader-elected)...", flush=True)
+        background_workers_thread = start_background_workers()
+    return app
 
 
 if __name__ == '__main__':
+    create_app()
     # Use a stable single-process run configuration for local development
     # and avoid double worker threads from Flask autoreload.
     app.run(host='0.0.0.0', port=5000, debug=False, threaded=True, use_reloader=False)
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+Small in-process LRU cache with a per-entry TTL.
+
+Entries are evicted least-recently-used once maxsize is reached and expire
+ttl seconds after they were stored. Writers call pop() for keys they
+invalidate; the TTL bounds staleness for writes made in other processes.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.stats_hits = 0
+        self.stats_misses = 0
+        self.stats_evictions = 0
+        self.stats_invalidations = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.stats_misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.stats_hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats_evictions += 1
+
+    def pop(self, key):
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.stats_invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.stats_hits + self.stats_misses
+            return {
+                'size': len(self._data),
+                'hits': self.stats_hits,
+                'misses': self.stats_misses,
+                'hit_ratio': round(self.stats_hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.stats_evictions,
+                'invalidations': self.stats_invalidations,
+            }
@@ -0,0 +1,251 @@
+"""
+SQLite connection pool shared by the web app and its background workers.
+
+Connections are opened once, configured once (WAL, synchronous, foreign keys)
+and handed back to the pool instead of being closed. A thread that already
+holds a connection gets the same one back, so nested helpers such as
+get_mood_wellness_data() don't open extra connections.
+"""
+import sqlite3
+import threading
+import time
+
+
+class TimedCursor(sqlite3.Cursor):
+    """
+    Cursor that reports every statement to its pool's on_query(sql, seconds,
+    rows) hook. SQLite does most of a SELECT's work while rows are fetched,
+    so fetch time and row counts are added until the result is exhausted,
+    the cursor runs another statement or it is closed.
+    """
+    _trace = None  # [sql, seconds, rows] of the statement still being read
+
+    def _finish(self):
+        trace, self._trace = self._trace, None
+        if trace is None:
+            return
+        pool = getattr(self.connection, '_pool', None)
+        if pool is not None and pool.on_query is not None:
+            pool.on_query(*trace)
+
+    def _timed(self, run, sql, *args):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            return run(sql, *args)
+        finally:
+            self._trace = [sql, time.perf_counter() - started, 0]
+            if self.description is None:
+                # No result set (DML, DDL): done, rowcount is the row count
+                self._trace[2] = max(self.rowcount, 0)
+                self._finish()
+
+    def _fetched(self, started, rows, exhausted):
+        if self._trace is not None:
+            self._trace[1] += time.perf_counter() - started
+            self._trace[2] += rows
+            if exhausted:
+                self._finish()
+
+    def execute(self, sql, parameters=()):
+        return self._timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(super().executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self._timed(super().executescript, sql_script)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(started, len(rows), not rows)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows), True)
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0, True)
+            raise
+        self._fetched(started, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() returns it to its pool."""
+
+    # conn.execute() doesn't go through cursor(); route both through TimedCursor
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def close(self):
+        # Connections pinned to a Flask app context are released (and rolled
+        # back) on teardown; the request may still be using this one.
+        if getattr(self, '_pinned', False):
+            return
+        # Behave like a real close for callers: drop any uncommitted work.
+        if self.in_transaction:
+            self.rollback()
+        pool = getattr(self, '_pool', None)
+        if pool is None:
+            super().close()
+            return
+        pool.release(self)
+
+    def really_close(self):
+        sqlite3.Connection.close(self)
+
+
+class PoolExhausted(sqlite3.OperationalError):
+    """Raised when no connection frees up within the acquire timeout."""
+
+
+class ConnectionPool:
+    def __init__(self, db_path, max_connections=8, timeout=30, acquire_timeout=30, on_query=None):
+        """on_query(sql, seconds, rows), if given, is called for every statement on a pooled connection."""
+        self.db_path = db_path
+        self.on_query = on_query
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.acquire_timeout = acquire_timeout
+        self._idle = []
+        self._open_count = 0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self.stats_opened = 0
+        self.stats_reused = 0
+        self.stats_waits = 0
+        self.stats_double_releases = 0
+
+    def _connect(self) -> PooledConnection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout,
+                               check_same_thread=False, factory=PooledConnection)
+        conn.row_factory = sqlite3.Row
+        try:
+            # Enable WAL mode for better concurrency (writers don't block readers)
+            conn.execute('PRAGMA journal_mode=WAL;')
+            # Moderate synchronous to improve performance while WAL is active
+            conn.execute('PRAGMA synchronous=NORMAL;')
+            conn.execute('PRAGMA foreign_keys=ON;')
+        except Exception:
+            # best-effort; don't fail if PRAGMA isn't supported
+            pass
+        conn._pool = self
+        conn._pinned = False
+        conn._checked_out = False
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        """Return this thread's connection, an idle one, or a new one (up to the cap)."""
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            self._local.depth += 1
+            with self._cond:
+                self.stats_reused += 1
+            return held
+
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    self.stats_reused += 1
+                    break
+                if self._open_count < self.max_connections:
+                    self._open_count += 1
+                    try:
+                        conn = self._connect()
+                    except Exception:
+                        self._open_count -= 1
+                        raise
+                    self.stats_opened += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhausted('database connection pool exhausted')
+                self.stats_waits += 1
+                self._cond.wait(remaining)
+
+            conn._checked_out = True
+
+        self._local.conn = conn
+        self._local.depth = 1
+        return conn
+
+    def note_reuse(self):
+        """Count a reuse that was served without touching the pool (flask.g hit)."""
+        with self._cond:
+            self.stats_reused += 1
+
+    def release(self, conn):
+        """Hand conn back; releasing a connection that is already idle is a no-op."""
+        if getattr(self._local, 'conn', None) is conn:
+            self._local.depth -= 1
+            if self._local.depth > 0:
+                return
+            self._local.conn = None
+        with self._cond:
+            if not conn._checked_out:
+                # A second release must not put it in _idle twice (two threads
+                # would then share it), nor roll back its next user's work.
+                self.stats_double_releases += 1
+                return
+            conn._checked_out = False
+        if conn.in_transaction:
+            conn.rollback()
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def close_all(self):
+        """Close idle connections (e.g. at shutdown or between tests)."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open_count -= len(idle)
+        for conn in idle:
+            conn.really_close()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'opened': self.stats_opened,
+                'reused': self.stats_reused,
+                'waits': self.stats_waits,
+                'double_releases': self.stats_double_releases,
+                'open': self._open_count,
+                'idle': len(self._idle),
+                'max_connections': self.max_connections,
+            }
@@ -0,0 +1,88 @@
+"""
+Per-user/day interval index for task overlap checks.
+
+Tasks are half-open intervals [start, start + duration) in hours. A
+DaySchedule keeps them sorted by start with a running maximum of end times,
+so conflicts with a proposed slot are found by bisect plus a walk over the
+actual overlaps, and the merged busy blocks give the next free slot.
+
+A schedule is built fresh for each write check from one read on
+idx_tasks_user_date_start, which returns the day's tasks already in start
+order, so building it is linear in the tasks that day. It is deliberately
+not cached across requests: several web processes write tasks, and a stale
+schedule would let overlapping tasks through.
+"""
+from bisect import bisect_left, bisect_right
+
+DAY_HOURS = 24.0
+
+
+class DaySchedule:
+    def __init__(self, intervals):
+        """intervals: iterable of (task_id, start, duration), any order (start order is cheapest)."""
+        items = sorted((float(s), float(s) + float(d), task_id) for task_id, s, d in intervals if d and d > 0)
+        self.starts = [s for s, _, _ in items]
+        self.ends = [e for _, e, _ in items]
+        self.ids = [i for _, _, i in items]
+        # max_end[i]: latest end among the first i + 1 intervals
+        self.max_end = []
+        latest = float('-inf')
+        for end in self.ends:
+            latest = max(latest, end)
+            self.max_end.append(latest)
+        # Busy time merged into disjoint blocks, sorted
+        self.block_starts, self.block_ends = [], []
+        for start, end, _ in items:
+            if self.block_ends and start < self.block_ends[-1]:
+                self.block_ends[-1] = max(self.block_ends[-1], end)
+            else:
+                self.block_starts.append(start)
+                self.block_ends.append(end)
+
+    @classmethod
+    def load(cls, cur, user_email, task_date, exclude_id=None):
+        cur.execute(
+            'SELECT id, start_time, duration FROM tasks WHERE user_email = ? AND task_date = ? AND start_time IS NOT NULL AND duration IS NOT NULL AND id IS NOT ? '
+            # Legacy rows with text times can't be placed on the day; skip them rather than fail the check
+            "AND typeof(start_time) IN ('integer', 'real') AND typeof(duration) IN ('integer', 'real') "
+            'ORDER BY start_time',
+            (user_email, task_date, exclude_id),
+        )
+        return cls((r['id'], r['start_time'], r['duration']) for r in cur.fetchall())
+
+    def conflicts(self, start, duration):
+        """Ids of tasks overlapping [start, start + duration), in start order."""
+        end = start + duration
+        found = []
+        # Only intervals starting before `end` can overlap; walk back from
+        # there while some earlier interval still reaches past `start`.
+        i = bisect_left(self.starts, end) - 1
+        while i >= 0 and self.max_end[i] > start:
+            if self.ends[i] > start:
+                found.append(self.ids[i])
+            i -= 1
+        found.reverse()
+        return found
+
+    def next_free_slot(self, start, duration, day_end=DAY_HOURS):
+        """Earliest start >= start where duration fits, or None if the day is full."""
+        candidate = start
+        # First busy block that ends after the candidate start
+        i = bisect_right(self.block_ends, candidate)
+        while i < len(self.block_starts):
+            if candidate + duration <= self.block_starts[i]:
+                break
+            candidate = max(candidate, self.block_ends[i])
+            i += 1
+        return candidate if candidate + duration <= day_end else None
+
+
+def overlap_error(schedule, start, duration):
+    """None if the slot is free, else a dict with the conflicting ids and next free slot."""
+    conflicts = schedule.conflicts(start, duration)
+    if not conflicts:
+        return None
+    return {
+        'conflicts': conflicts,
+        'next_free_slot': schedule.next_free_slot(start, duration),
+    }
@@ -0,0 +1,121 @@
+"""
+Daily maintenance job.
+
+Purges completed tasks from previous days (carried-over pending tasks are
+kept) and sync tombstones older than the retention window. Runs once after
+startup and then just after each local midnight on the background worker
+leader, deleting in small batches with a commit per batch so request
+handlers never wait long for the SQLite writer lock.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+from scheduler import DeadlineScheduler
+
+
+class Janitor:
+    def __init__(self, get_db, batch_size=500, tombstone_days=30):
+        self.get_db = get_db
+        self.batch_size = batch_size
+        self.tombstone_days = tombstone_days
+        self.scheduler = DeadlineScheduler('MAINTENANCE JANITOR', self._load, self._run, retry_delay=600)
+        self._lock = threading.Lock()
+        self._last_run_date = None
+        self.stats_runs = 0
+        self.stats_last_run_at = None
+        self.stats_last_duration_ms = None
+        self.stats_purged_last_run = {}
+        self.stats_purged_total = {'tasks': 0, 'tombstones': 0}
+
+    def wake(self):
+        self.scheduler.wake()
+
+    def _load(self, limit):
+        # Due now if today's run hasn't happened yet, otherwise at next midnight
+        now = datetime.now()
+        if self._last_run_date == now.date():
+            tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+            return [(tomorrow.timestamp(), 'daily')]
+        return [(time.time(), 'daily')]
+
+    def _delete_batches(self, conn, select_sql, delete_sql, params, on_batch=None):
+        """Delete rows picked by select_sql (first column is the key) batch by batch."""
+        cur = conn.cursor()
+        purged = 0
+        while True:
+            cur.execute(select_sql, params + (self.batch_size,))
+            rows = cur.fetchall()
+            if not rows:
+                return purged
+            keys = [r[0] for r in rows]
+            placeholders = ','.join('?' * len(keys))
+            cur.execute(delete_sql.format(placeholders=placeholders), keys)
+            if on_batch:
+                on_batch(cur, rows)
+            conn.commit()
+            purged += len(keys)
+            if len(rows) < self.batch_size:
+                return purged
+
+    def purge_completed_tasks(self, conn, today_iso):
+        return self._delete_batches(
+            conn,
+            'SELECT id FROM tasks WHERE task_date < ? AND completed = 1 LIMIT ?',
+            'DELETE FROM tasks WHERE id IN ({placeholders})',
+            (today_iso,),
+        )
+
+    def prune_tombstones(self, conn, cutoff_iso):
+        def advance_prune_point(cur, rows):
+            # Sync tokens at or below the newest pruned tombstone must reset
+            cur.execute(
+                'UPDATE sync_clock SET tombstones_pruned_through = MAX(tombstones_pruned_through, ?) WHERE id = 1',
+                (max(r['version'] for r in rows),),
+            )
+
+        return self._delete_batches(
+            conn,
+            'SELECT rowid, version FROM sync_tombstones WHERE deleted_at < ? LIMIT ?',
+            'DELETE FROM sync_tombstones WHERE rowid IN ({placeholders})',
+            (cutoff_iso,),
+            on_batch=advance_prune_point,
+        )
+
+    def run_once(self):
+        started = time.monotonic()
+        now = datetime.now()
+        cutoff = (datetime.utcnow() - timedelta(days=self.tombstone_days)).strftime('%Y-%m-%dT%H:%M:%S')
+        conn = self.get_db()
+        try:
+            purged = {
+                'tasks': self.purge_completed_tasks(conn, now.strftime('%Y-%m-%d')),
+                'tombstones': self.prune_tombstones(conn, cutoff),
+            }
+        finally:
+            conn.close()
+        duration_ms = round((time.monotonic() - started) * 1000, 1)
+        with self._lock:
+            self._last_run_date = now.date()
+            self.stats_runs += 1
+            self.stats_last_run_at = now.isoformat(timespec='seconds')
+            self.stats_last_duration_ms = duration_ms
+            self.stats_purged_last_run = purged
+            for key, count in purged.items():
+                self.stats_purged_total[key] += count
+        print(f"[JANITOR] Purged {purged['tasks']} completed task(s), {purged['tombstones']} tombstone(s) in {duration_ms} ms", flush=True)
+        return purged
+
+    def _run(self, keys):
+        self.run_once()
+        return []
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'runs': self.stats_runs,
+                'last_run_at': self.stats_last_run_at,
+                'last_duration_ms': self.stats_last_duration_ms,
+                'purged_last_run': dict(self.stats_purged_last_run),
+                'purged_total': dict(self.stats_purged_total),
+            }
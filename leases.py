@@ -0,0 +1,58 @@
+"""
+Leader election for background workers.
+
+Every process that wants to run the schedulers calls LeaderLease.renew()
+periodically. The row in worker_leases names the current holder; another
+process can only take it over once expires_at has passed, so exactly one
+process runs the workers as long as the holder keeps heart-beating.
+"""
+import os
+import socket
+import time
+import uuid
+from datetime import datetime
+
+
+class LeaderLease:
+    def __init__(self, conn, name, ttl=30):
+        """conn should be dedicated to the lease (it is used from one thread)."""
+        self.conn = conn
+        self.name = name
+        self.ttl = ttl
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+
+    def renew(self) -> bool:
+        """Take or extend the lease; returns whether this process holds it."""
+        now = int(time.time())
+        try:
+            cur = self.conn.execute(
+                "INSERT INTO worker_leases (name, holder, expires_at, acquired_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET "
+                "acquired_at = CASE WHEN holder = excluded.holder THEN acquired_at ELSE excluded.acquired_at END, "
+                "holder = excluded.holder, expires_at = excluded.expires_at "
+                "WHERE holder = excluded.holder OR expires_at < ?",
+                (self.name, self.holder, now + self.ttl, datetime.utcnow().isoformat(), now),
+            )
+            held = cur.rowcount == 1
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            print(f"[LEASE] could not renew '{self.name}': {e}", flush=True)
+            held = False
+        if held != self.is_leader:
+            print(f"[LEASE] {self.holder} {'acquired' if held else 'lost'} '{self.name}'", flush=True)
+        self.is_leader = held
+        return held
+
+    def release(self):
+        try:
+            self.conn.execute('DELETE FROM worker_leases WHERE name = ? AND holder = ?', (self.name, self.holder))
+            self.conn.commit()
+        except Exception as e:
+            print(f"[LEASE] could not release '{self.name}': {e}", flush=True)
+        self.is_leader = False
+
+    def current_holder(self):
+        row = self.conn.execute('SELECT holder, expires_at FROM worker_leases WHERE name = ?', (self.name,)).fetchone()
+        return tuple(row) if row else None
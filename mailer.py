@@ -0,0 +1,166 @@
+"""
+Outgoing mail for MomCare.
+
+Keeps a small pool of SMTP sessions open between messages, so a burst of
+reminders costs one connect/STARTTLS/LOGIN instead of one per email.
+Broken or stale sessions are dropped and the send is retried on a fresh one.
+
+Configuration (environment):
+    MAIL_SERVER (smtp.gmail.com when credentials are set), MAIL_PORT, MAIL_USE_TLS
+    SMTP_USERNAME / MAIL_USERNAME, SMTP_PASSWORD / MAIL_PASSWORD
+    MAIL_DEFAULT_SENDER (defaults to default_sender, then the username)
+
+Mail is sent whenever a server is configured; LOGIN is only attempted with a
+username and a server that offers AUTH. For local testing point
+MAIL_SERVER/MAIL_PORT at an aiosmtpd or smtpd debugging server and set
+MAIL_USE_TLS=false.
+"""
+import os
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+
+
+class Mailer:
+    def __init__(self, host, port, username='', password='', use_tls=True, sender=None,
+                 pool_size=2, idle_timeout=60, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.sender = sender or username
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._idle = []  # [(smtp, last_used)]
+        self._lock = threading.Lock()
+        self.stats_handshakes = 0
+        self.stats_sent = 0
+        self.stats_reconnects = 0
+
+    @classmethod
+    def from_env(cls, default_sender=None, **kwargs):
+        username = os.environ.get('SMTP_USERNAME') or os.environ.get('MAIL_USERNAME') or ''
+        password = os.environ.get('SMTP_PASSWORD') or os.environ.get('MAIL_PASSWORD') or ''
+        return cls(
+            host=os.environ.get('MAIL_SERVER') or ('smtp.gmail.com' if username else ''),
+            port=int(os.environ.get('MAIL_PORT', 587)),
+            username=username,
+            password=password,
+            use_tls=os.environ.get('MAIL_USE_TLS', 'True').lower() == 'true',
+            sender=os.environ.get('MAIL_DEFAULT_SENDER') or default_sender or username,
+            **kwargs,
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.host)
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            server.ehlo_or_helo_if_needed()
+            if self.username and server.has_extn('auth'):
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        with self._lock:
+            self.stats_handshakes += 1
+        return server
+
+    def _checkout(self):
+        """Return (session, reused) – an idle session if one is fresh enough."""
+        now = time.monotonic()
+        stale = []
+        server = None
+        with self._lock:
+            while self._idle:
+                candidate, last_used = self._idle.pop()
+                if now - last_used < self.idle_timeout:
+                    server = candidate
+                    break
+                stale.append(candidate)
+        for s in stale:
+            self._discard(s)
+        if server is not None:
+            return server, True
+        return self._connect(), False
+
+    def _checkin(self, server):
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append((server, time.monotonic()))
+                return
+        self._discard(server)
+
+    @staticmethod
+    def _discard(server):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def build_message(self, to_email, subject, body, html_body=None):
+        msg = EmailMessage()
+        msg['Subject'] = subject
+        msg['From'] = self.sender
+        msg['To'] = to_email
+        msg.set_content(body)
+        if html_body:
+            msg.add_alternative(html_body, subtype='html')
+        return msg
+
+    def send(self, to_email, subject, body, html_body=None):
+        """Send one message; raises if it can't be delivered on a fresh session."""
+        self.send_message(self.build_message(to_email, subject, body, html_body))
+
+    @staticmethod
+    def _is_connection_error(exc):
+        if isinstance(exc, smtplib.SMTPServerDisconnected):
+            return True
+        # 421: server is closing the channel (idle timeout, too many messages)
+        if isinstance(exc, smtplib.SMTPResponseException):
+            return exc.smtp_code == 421
+        # SMTPException subclasses OSError; only socket-level errors count here
+        return isinstance(exc, OSError) and not isinstance(exc, smtplib.SMTPException)
+
+    def send_message(self, msg):
+        server, reused = self._checkout()
+        try:
+            server.send_message(msg)
+        except Exception as e:
+            self._discard(server)
+            if not (reused and self._is_connection_error(e)):
+                raise
+            # The pooled session went stale; reconnect once and retry.
+            with self._lock:
+                self.stats_reconnects += 1
+            server = self._connect()
+            try:
+                server.send_message(msg)
+            except Exception:
+                self._discard(server)
+                raise
+        self._checkin(server)
+        with self._lock:
+            self.stats_sent += 1
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._discard(server)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'handshakes': self.stats_handshakes,
+                'sent': self.stats_sent,
+                'reconnects': self.stats_reconnects,
+                'idle_sessions': len(self._idle),
+            }
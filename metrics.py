@@ -0,0 +1,117 @@
+"""
+In-process request metrics rendered in the Prometheus text format.
+
+RequestMetrics keeps per-endpoint histograms of latency, SQL statements
+per request, SQL time per request and response size, plus a request
+counter by status. Values are cumulative since process start; with
+several web processes, each one exposes its own /metrics.
+"""
+import threading
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, label_pairs):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{_labels(label_pairs + (("le", _number(bound)),))} {cumulative}'
+        yield f'{name}_sum{_labels(label_pairs)} {_number(round(self.sum, 6))}'
+        yield f'{name}_count{_labels(label_pairs)} {self.count}'
+
+
+class RequestMetrics:
+    HISTOGRAMS = (
+        ('latency', 'momcare_request_duration_seconds', 'Request latency by endpoint', LATENCY_BUCKETS),
+        ('sql_count', 'momcare_request_sql_queries', 'SQL statements per request', SQL_COUNT_BUCKETS),
+        ('sql_time', 'momcare_request_sql_seconds', 'SQL execution time per request', LATENCY_BUCKETS),
+        ('size', 'momcare_response_size_bytes', 'Response body size (streamed bodies excluded)', SIZE_BUCKETS),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {key: {} for key, _, _, _ in self.HISTOGRAMS}
+        self._requests = {}  # (endpoint, method, status) -> count
+
+    def _histogram(self, key, labels):
+        table = self._histograms[key]
+        hist = table.get(labels)
+        if hist is None:
+            buckets = next(b for k, _, _, b in self.HISTOGRAMS if k == key)
+            hist = table[labels] = Histogram(buckets)
+        return hist
+
+    def observe(self, endpoint, method, status, seconds, sql_count, sql_seconds, size=None):
+        labels = (('endpoint', endpoint), ('method', method))
+        with self._lock:
+            self._histogram('latency', labels).observe(seconds)
+            self._histogram('sql_count', labels).observe(sql_count)
+            self._histogram('sql_time', labels).observe(sql_seconds)
+            if size is not None:
+                self._histogram('size', labels).observe(size)
+            key = (endpoint, method, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+    def render(self):
+        lines = [
+            '# HELP momcare_requests_total Requests by endpoint, method and status',
+            '# TYPE momcare_requests_total counter',
+        ]
+        with self._lock:
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                lines.append(f'momcare_requests_total{_labels((("endpoint", endpoint), ("method", method), ("status", status)))} {count}')
+            for key, name, help_text, _ in self.HISTOGRAMS:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for labels, hist in sorted(self._histograms[key].items()):
+                    lines.extend(hist.lines(name, labels))
+        return '\n'.join(lines) + '\n'
+
+
+def render_stats(name, help_text, sources):
+    """
+    Gauge lines for the numeric values in stats() dicts. sources is a list
+    of (label pairs, stats dict); nested dicts add a 'key' label.
+    """
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+    for labels, stats in sources:
+        labels = tuple(labels)
+        for key, value in sorted(stats.items()):
+            if isinstance(value, dict):
+                for sub, sub_value in sorted(value.items()):
+                    if isinstance(sub_value, (int, float)) and not isinstance(sub_value, bool):
+                        lines.append(f'{name}{_labels(labels + (("stat", key), ("key", sub)))} {_number(sub_value)}')
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f'{name}{_labels(labels + (("stat", key),))} {_number(value)}')
+    return '\n'.join(lines) + '\n'
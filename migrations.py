@@ -0,0 +1,614 @@
+"""
+Versioned schema migrations for users.db.
+
+Each step runs once, in order, and is recorded in the schema_version table.
+Add new steps to the end of MIGRATIONS; never edit or reorder applied ones.
+A database that is already current costs a single SELECT MAX(version).
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+
+from units import parse_height, parse_weight
+
+
+USERS_JSON = Path(__file__).parent / 'users.json'
+
+
+def _add_missing_columns(cur, table, columns):
+    """ALTER TABLE ... ADD COLUMN for each (name, decl) missing from table."""
+    cur.execute(f"PRAGMA table_info({table})")
+    existing = {r[1] for r in cur.fetchall()}
+    for name, decl in columns:
+        if name not in existing:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+
+def _baseline_schema(cur):
+    """
+    Create the original tables and upgrade databases that predate
+    schema_version (missing columns, legacy grocery_items layout, users.json).
+    Only runs while the database is at version 0. Returns True if
+    users.json was imported.
+    """
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first TEXT NOT NULL,
+            last TEXT NOT NULL,
+            email TEXT NOT NULL UNIQUE,
+            birthdate TEXT,
+            password_hash TEXT NOT NULL,
+            security_question TEXT,
+            security_answer TEXT,
+            gender TEXT,
+            height TEXT,
+            weight TEXT,
+            profile_picture TEXT
+        )
+        """
+    )
+    # Ensure older DBs have the expected profile/security columns
+    _add_missing_columns(cur, 'users', [
+        ('security_question', 'TEXT'),
+        ('security_answer', 'TEXT'),
+        ('gender', 'TEXT'),
+        ('height', 'TEXT'),
+        ('weight', 'TEXT'),
+        ('profile_picture', 'TEXT'),
+    ])
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS monthly_budgets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT NOT NULL,
+            month_iso TEXT NOT NULL,
+            income REAL DEFAULT 0,
+            budget_limit REAL DEFAULT 0,
+            month INTEGER,
+            year INTEGER,
+            created_at TEXT,
+            UNIQUE(user_email, month_iso)
+        )
+        """
+    )
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT NOT NULL,
+            title TEXT NOT NULL,
+            start_time REAL,
+            duration REAL,
+            color TEXT,
+            is_priority INTEGER DEFAULT 0,
+            task_date TEXT,
+            completed INTEGER DEFAULT 0,
+            notified INTEGER DEFAULT 0,
+            created_at TEXT
+        )
+        """
+    )
+    _add_missing_columns(cur, 'tasks', [('notified', 'INTEGER DEFAULT 0')])
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS expenses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT NOT NULL,
+            month_iso TEXT NOT NULL,
+            category TEXT,
+            description TEXT,
+            color TEXT,
+            amount REAL NOT NULL DEFAULT 0,
+            expense_date TEXT,
+            is_eco INTEGER DEFAULT 0,
+            created_at TEXT
+        )
+        """
+    )
+    _add_missing_columns(cur, 'expenses', [('is_eco', 'INTEGER DEFAULT 0')])
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS grocery_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT NOT NULL,
+            item_name TEXT NOT NULL,
+            quantity INTEGER DEFAULT 1,
+            estimated_cost REAL,
+            category TEXT,
+            is_checked INTEGER DEFAULT 0,
+            month_iso TEXT,
+            month INTEGER,
+            year INTEGER,
+            created_at TEXT
+        )
+        """
+    )
+    _migrate_legacy_grocery_items(cur)
+
+    # One reminder note per user
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS reminders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT NOT NULL UNIQUE,
+            message TEXT,
+            created_at TEXT,
+            updated_at TEXT
+        )
+        """
+    )
+
+    # Default categories are seeded when a user first opens the budget page
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS spending_categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT NOT NULL,
+            name TEXT NOT NULL,
+            color TEXT NOT NULL,
+            is_default INTEGER DEFAULT 0,
+            created_at TEXT,
+            UNIQUE(user_email, name)
+        )
+        """
+    )
+
+    # Multiple scheduled reminders per user
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS reminder_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT NOT NULL,
+            title TEXT,
+            message TEXT,
+            remind_at TEXT,
+            is_recurring INTEGER DEFAULT 0,
+            recurrence_rule TEXT,
+            email_sent INTEGER DEFAULT 0,
+            created_at TEXT,
+            updated_at TEXT
+        )
+        """
+    )
+    _add_missing_columns(cur, 'reminder_items', [('email_sent', 'INTEGER DEFAULT 0')])
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_moods (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT NOT NULL,
+            date TEXT NOT NULL,
+            mood TEXT,
+            mood_score INTEGER,
+            created_at TEXT,
+            UNIQUE(user_email, date)
+        )
+        """
+    )
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_wellness (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT NOT NULL,
+            date TEXT NOT NULL,
+            sleep TEXT,
+            water TEXT,
+            activity TEXT,
+            stress INTEGER,
+            created_at TEXT,
+            UNIQUE(user_email, date)
+        )
+        """
+    )
+
+    return _import_users_json(cur)
+
+
+def _migrate_legacy_grocery_items(cur):
+    cur.execute("PRAGMA table_info(grocery_items)")
+    cols = {r[1] for r in cur.fetchall()}
+    # Old schema (item, qty, cost, month_str, purchased): rebuild the table
+    if {"item", "qty", "cost", "month_str", "purchased"}.issubset(cols):
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS grocery_items_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_email TEXT NOT NULL,
+                item_name TEXT NOT NULL,
+                quantity INTEGER DEFAULT 1,
+                estimated_cost REAL,
+                category TEXT,
+                is_checked INTEGER DEFAULT 0,
+                month_iso TEXT,
+                month INTEGER,
+                year INTEGER,
+                created_at TEXT
+            )
+            """
+        )
+        cur.execute(
+            "INSERT INTO grocery_items_new (id, user_email, item_name, quantity, estimated_cost, category, is_checked, month_iso, created_at) "
+            "SELECT id, user_email, item AS item_name, qty AS quantity, cost AS estimated_cost, category, purchased AS is_checked, month_str AS month_iso, NULL FROM grocery_items"
+        )
+        cur.execute("DROP TABLE grocery_items")
+        cur.execute("ALTER TABLE grocery_items_new RENAME TO grocery_items")
+    # Only month_iso missing: add it and copy month_str
+    elif "month_iso" not in cols and "month_str" in cols:
+        cur.execute("ALTER TABLE grocery_items ADD COLUMN month_iso TEXT")
+        cur.execute("UPDATE grocery_items SET month_iso = month_str WHERE month_str IS NOT NULL")
+
+
+def _import_users_json(cur):
+    """
+    Migrate users from the pre-SQLite users.json. Returns True if the file
+    was read; run_migrations() renames it to .bak once the import commits.
+    """
+    if not USERS_JSON.exists():
+        return False
+    try:
+        with open(USERS_JSON, 'r', encoding='utf-8') as f:
+            users = json.load(f)
+    except Exception:
+        users = []
+    for u in users:
+        cur.execute(
+            "INSERT OR IGNORE INTO users (first, last, email, birthdate, password_hash) VALUES (?, ?, ?, ?, ?)",
+            (u.get('first'), u.get('last'), u.get('email'), u.get('birthdate'), u.get('password_hash')),
+        )
+    return True
+
+
+def _add_query_indexes(cur):
+    # Matched to the WHERE / ORDER BY clauses used in app.py.
+    # Daily planner, dashboard and overlap checks: user + day, ordered by start.
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_tasks_user_date_start ON tasks(user_email, task_date, start_time)')
+    # task_notification_worker: today's un-notified tasks across all users.
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_tasks_date_notified_start ON tasks(task_date, notified, start_time)')
+    # Budget page lists a month ordered by expense_date.
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_expenses_user_month_date ON expenses(user_email, month_iso, expense_date)')
+    # "Spent today" sums; covering so the sum never touches the table.
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_expenses_user_date_amount ON expenses(user_email, expense_date, amount)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_grocery_items_user_month_checked ON grocery_items(user_email, month_iso, is_checked)')
+    # scheduled_reminder_worker: unsent reminders ordered by due time.
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_reminder_items_sent_remind_at ON reminder_items(email_sent, remind_at)')
+    # Reminder list and dashboard "upcoming reminders".
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_reminder_items_user_remind_at ON reminder_items(user_email, remind_at)')
+    # Forgot-password lookup by first name.
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_users_first ON users(first)')
+
+
+# SQLite parses all remind_at shapes the UI and scripts write
+# (YYYY-MM-DDTHH:MM, YYYY-MM-DD HH:MM[:SS]); 'utc' treats them as local time.
+REMIND_AT_EPOCH_SQL = "CAST(strftime('%s', {}, 'utc') AS INTEGER)"
+
+
+def _add_reminder_epoch(cur):
+    # Normalized due time so the reminder scheduler can order and range-scan
+    # reminders in SQL instead of parsing remind_at in Python.
+    _add_missing_columns(cur, 'reminder_items', [('remind_at_epoch', 'INTEGER')])
+    cur.execute(
+        "UPDATE reminder_items SET remind_at_epoch = " + REMIND_AT_EPOCH_SQL.format('remind_at')
+        + " WHERE remind_at IS NOT NULL"
+    )
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_reminder_items_sent_epoch ON reminder_items(email_sent, remind_at_epoch)')
+    cur.execute('DROP INDEX IF EXISTS idx_reminder_items_sent_remind_at')
+
+
+def _add_email_outbox(cur):
+    # Durable queue drained by outbox.OutboxDispatcher.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            to_email TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            body TEXT NOT NULL,
+            html_body TEXT,
+            kind TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at INTEGER NOT NULL,
+            last_error TEXT,
+            created_at TEXT,
+            sent_at TEXT
+        )
+        """
+    )
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_email_outbox_status_next ON email_outbox(status, next_attempt_at)')
+
+
+def _add_worker_leases(cur):
+    # One row per background role; see leases.LeaderLease.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS worker_leases (
+            name TEXT PRIMARY KEY,
+            holder TEXT NOT NULL,
+            expires_at INTEGER NOT NULL,
+            acquired_at TEXT
+        )
+        """
+    )
+
+
+def _add_profile_measurements(cur):
+    # Numeric height/weight parsed once at profile-edit time (see units.py),
+    # so BMI is arithmetic on stored floats.
+    _add_missing_columns(cur, 'users', [('height_m', 'REAL'), ('weight_kg', 'REAL')])
+    cur.execute('SELECT id, height, weight FROM users WHERE height IS NOT NULL OR weight IS NOT NULL')
+    cur.executemany(
+        'UPDATE users SET height_m = ?, weight_kg = ? WHERE id = ?',
+        [(parse_height(r[1]) or None, parse_weight(r[2]) or None, r[0]) for r in cur.fetchall()],
+    )
+
+
+def _rollup_upsert(user, month, category, amount, count):
+    return (
+        "INSERT INTO monthly_spend_rollup (user_email, month_iso, category, total, item_count) "
+        f"VALUES ({user}, {month}, {category}, {amount}, {count}) "
+        "ON CONFLICT(user_email, month_iso, category) DO UPDATE SET "
+        "total = total + excluded.total, item_count = item_count + excluded.item_count;"
+    )
+
+
+def _rollup_prune(user, month, category):
+    return (
+        f"DELETE FROM monthly_spend_rollup WHERE user_email = {user} AND month_iso = {month} "
+        f"AND category = {category} AND item_count <= 0;"
+    )
+
+
+# Rollup keys for each source table. Expense categories are stored as-is
+# (NULL as ''), unnamed groceries count as 'Groceries'; readers map
+# categories the user doesn't have to 'Others'.
+_EXPENSE_CATEGORY = "COALESCE({row}.category, '')"
+_GROCERY_CATEGORY = "COALESCE(NULLIF({row}.category, ''), 'Groceries')"
+
+
+def _rollup_triggers(table, category, amount, when_counted, watched):
+    def add(row, sign):
+        return _rollup_upsert(f'{row}.user_email', f'{row}.month_iso', category.format(row=row),
+                              f"{sign}{amount.format(row=row)}", f'{sign}1')
+
+    def remove(row):
+        return add(row, '-') + _rollup_prune(f'{row}.user_email', f'{row}.month_iso', category.format(row=row))
+
+    new_counted = when_counted.format(row='NEW')
+    old_counted = when_counted.format(row='OLD')
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_rollup_insert AFTER INSERT ON {table} "
+        f"WHEN {new_counted} BEGIN {add('NEW', '')} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_rollup_delete AFTER DELETE ON {table} "
+        f"WHEN {old_counted} BEGIN {remove('OLD')} END",
+        # Updates are split so each side only runs when that row counted
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_rollup_update_old AFTER UPDATE OF {watched} ON {table} "
+        f"WHEN {old_counted} BEGIN {remove('OLD')} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_rollup_update_new AFTER UPDATE OF {watched} ON {table} "
+        f"WHEN {new_counted} BEGIN {add('NEW', '')} END",
+    ]
+
+
+def _add_monthly_spend_rollup(cur):
+    # Per (user, month, category) spend, maintained by triggers on expenses
+    # and grocery_items so every write path (API, scripts) keeps it in sync.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS monthly_spend_rollup (
+            user_email TEXT NOT NULL,
+            month_iso TEXT NOT NULL,
+            category TEXT NOT NULL,
+            total REAL NOT NULL DEFAULT 0,
+            item_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_email, month_iso, category)
+        ) WITHOUT ROWID
+        """
+    )
+    cur.execute('DELETE FROM monthly_spend_rollup')
+    cur.execute(
+        """
+        INSERT INTO monthly_spend_rollup (user_email, month_iso, category, total, item_count)
+        SELECT user_email, month_iso, category, SUM(amount), COUNT(*) FROM (
+            SELECT user_email, month_iso, COALESCE(category, '') AS category, amount
+            FROM expenses WHERE month_iso IS NOT NULL
+            UNION ALL
+            SELECT user_email, month_iso, COALESCE(NULLIF(category, ''), 'Groceries'), COALESCE(estimated_cost, 0)
+            FROM grocery_items WHERE is_checked = 1 AND month_iso IS NOT NULL
+        )
+        GROUP BY user_email, month_iso, category
+        """
+    )
+    for sql in _rollup_triggers('expenses', _EXPENSE_CATEGORY, '{row}.amount',
+                                '{row}.month_iso IS NOT NULL', 'user_email, month_iso, category, amount'):
+        cur.execute(sql)
+    for sql in _rollup_triggers('grocery_items', _GROCERY_CATEGORY, 'COALESCE({row}.estimated_cost, 0)',
+                                '{row}.is_checked = 1 AND {row}.month_iso IS NOT NULL',
+                                'user_email, month_iso, category, estimated_cost, is_checked'):
+        cur.execute(sql)
+
+
+def _add_grocery_purchased_on(cur):
+    # Local date an item was checked off (NULL while unchecked), so "spent
+    # today" is an index range instead of substr(created_at, 1, 10) per row.
+    _add_missing_columns(cur, 'grocery_items', [('purchased_on', 'TEXT')])
+    # Best guess for existing rows: the day they were added
+    cur.execute('UPDATE grocery_items SET purchased_on = substr(created_at, 1, 10) WHERE is_checked = 1 AND created_at IS NOT NULL')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_grocery_items_user_purchased ON grocery_items(user_email, purchased_on, estimated_cost)')
+
+
+# Tables exposed through /api/sync: entity name -> table
+SYNC_TABLES = {
+    'tasks': 'tasks',
+    'reminders': 'reminder_items',
+    'expenses': 'expenses',
+    'groceries': 'grocery_items',
+}
+
+_SYNC_NOW = "strftime('%Y-%m-%dT%H:%M:%S', 'now')"
+
+
+def _add_sync_versions(cur):
+    # A global change clock: every insert/update on a synced table takes the
+    # next clock value as the row's version, deletes leave a tombstone.
+    # Clients pass the last clock value they saw to /api/sync.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sync_clock (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL,
+            tombstones_pruned_through INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    cur.execute('INSERT OR IGNORE INTO sync_clock (id, version) VALUES (1, 1)')
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sync_tombstones (
+            entity TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            user_email TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            deleted_at TEXT
+        )
+        """
+    )
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_sync_tombstones_user_version ON sync_tombstones(user_email, version)')
+
+    for entity, table in SYNC_TABLES.items():
+        _add_missing_columns(cur, table, [('updated_at', 'TEXT'), ('version', 'INTEGER')])
+        # Existing rows count as changed at clock 1
+        cur.execute(f'UPDATE {table} SET version = 1, updated_at = COALESCE(updated_at, created_at)')
+        cur.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_user_version ON {table}(user_email, version)')
+        tick = 'UPDATE sync_clock SET version = version + 1 WHERE id = 1;'
+        stamp = (
+            f"UPDATE {table} SET version = (SELECT version FROM sync_clock WHERE id = 1), "
+            f"updated_at = {{updated_at}} WHERE id = NEW.id;"
+        )
+        cur.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_sync_insert AFTER INSERT ON {table} BEGIN "
+            f"{tick} {stamp.format(updated_at=f'COALESCE(NEW.updated_at, {_SYNC_NOW})')} END"
+        )
+        # The WHEN clause skips the trigger's own stamping UPDATE; an
+        # updated_at written by the app is kept, otherwise it is set to now.
+        cur.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_sync_update AFTER UPDATE ON {table} "
+            f"WHEN NEW.version IS OLD.version BEGIN "
+            f"{tick} {stamp.format(updated_at=f'COALESCE(NULLIF(NEW.updated_at, OLD.updated_at), {_SYNC_NOW})')} END"
+        )
+        cur.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_sync_delete AFTER DELETE ON {table} BEGIN "
+            f"{tick} INSERT INTO sync_tombstones (entity, row_id, user_email, version, deleted_at) "
+            f"VALUES ('{entity}', OLD.id, OLD.user_email, (SELECT version FROM sync_clock WHERE id = 1), {_SYNC_NOW}); END"
+        )
+
+
+def _add_tombstone_age_index(cur):
+    # The janitor prunes tombstones by age
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_sync_tombstones_deleted_at ON sync_tombstones(deleted_at)')
+
+
+# Tables whose writes wake a background scheduler, with the columns an
+# UPDATE must touch to count (None: only inserts count).
+CHANGE_WATCHED = {
+    'tasks': 'task_date, start_time, completed',
+    'reminder_items': 'remind_at, email_sent',
+    'email_outbox': None,
+}
+
+
+def _add_change_counters(cur):
+    # Per-table write counters; the worker leader polls them so a write wakes
+    # only the schedulers reading that table (see app.run_background_workers).
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS table_changes (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    for table, watched in CHANGE_WATCHED.items():
+        cur.execute('INSERT OR IGNORE INTO table_changes (name) VALUES (?)', (table,))
+        bump = f"UPDATE table_changes SET version = version + 1 WHERE name = '{table}';"
+        cur.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_changes_insert AFTER INSERT ON {table} BEGIN {bump} END")
+        if watched:
+            cur.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_changes_update AFTER UPDATE OF {watched} ON {table} BEGIN {bump} END")
+
+
+# (version, description, step). Steps receive a cursor inside a transaction.
+MIGRATIONS = [
+    (1, 'indexes for hot query shapes', _add_query_indexes),
+    (2, 'reminder_items.remind_at_epoch', _add_reminder_epoch),
+    (3, 'email_outbox', _add_email_outbox),
+    (4, 'worker_leases', _add_worker_leases),
+    (5, 'users.height_m / users.weight_kg', _add_profile_measurements),
+    (6, 'monthly_spend_rollup', _add_monthly_spend_rollup),
+    (7, 'grocery_items.purchased_on', _add_grocery_purchased_on),
+    (8, 'sync versions and tombstones', _add_sync_versions),
+    (9, 'sync_tombstones deleted_at index', _add_tombstone_age_index),
+    (10, 'table_changes counters', _add_change_counters),
+]
+
+
+def current_version(conn) -> int:
+    try:
+        row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    except Exception:
+        # schema_version doesn't exist yet
+        return 0
+    return row[0] or 0
+
+
+def run_migrations(conn) -> int:
+    """Apply pending migrations and return the resulting schema version."""
+    latest = MIGRATIONS[-1][0]
+    if current_version(conn) >= latest:
+        return latest
+
+    cur = conn.cursor()
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TEXT
+        )
+        """
+    )
+    conn.commit()
+
+    # Take the write lock before re-reading the version so concurrent
+    # processes starting together don't apply the same step twice.
+    cur.execute('BEGIN IMMEDIATE')
+    imported_users_json = False
+    try:
+        version = current_version(conn)
+        if version == 0:
+            imported_users_json = _baseline_schema(cur)
+        for step_version, description, step in MIGRATIONS:
+            if step_version <= version:
+                continue
+            step(cur)
+            cur.execute(
+                'INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)',
+                (step_version, description, datetime.utcnow().isoformat()),
+            )
+            version = step_version
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    # Only retire users.json once its users are committed; a failed run
+    # leaves it in place to be imported again next start.
+    if imported_users_json:
+        try:
+            USERS_JSON.rename(USERS_JSON.with_suffix('.json.bak'))
+        except Exception:
+            pass
+    return version
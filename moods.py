@@ -0,0 +1,10 @@
+"""
+Mood vocabulary shared by the app and the data generator.
+
+update_mood stores the label together with its score; the mood widget and
+the week chart read the score back, so anything else that writes
+daily_moods must use the same labels and scores.
+"""
+
+MOOD_SCORES = {'Stressed': 0, 'Tired': 1, 'Neutral': 2, 'Happy': 3}
+DEFAULT_MOOD = 'Neutral'
@@ -0,0 +1,209 @@
+"""
+Durable email outbox.
+
+Request handlers and workers queue mail with a single INSERT into
+email_outbox (in the same transaction as the change that triggered it).
+OutboxDispatcher drains the table in batches on a background thread:
+failed sends are retried with exponential backoff and, after max_attempts,
+parked in the 'dead' state with the last error for inspection.
+
+Row states: pending -> sending -> sent | pending (retry) | dead.
+A row stuck in 'sending' (process died mid-send) becomes eligible again once
+its lease (next_attempt_at) expires.
+"""
+import collections
+import threading
+import time
+from datetime import datetime
+
+from scheduler import DeadlineScheduler
+
+
+def enqueue_email(cur, to_email, subject, body, html_body=None, kind=None):
+    """Queue one email; commit is left to the caller. Returns the outbox id."""
+    cur.execute(
+        "INSERT INTO email_outbox (to_email, subject, body, html_body, kind, status, attempts, next_attempt_at, created_at) "
+        "VALUES (?, ?, ?, ?, ?, 'pending', 0, ?, ?)",
+        (to_email, subject, body, html_body, kind, int(time.time()), datetime.utcnow().isoformat()),
+    )
+    return cur.lastrowid
+
+
+class OutboxDispatcher:
+    def __init__(self, get_db, mailer, batch_size=50, max_attempts=5,
+                 base_delay=60, max_delay=3600, lease=300):
+        self.get_db = get_db
+        self.mailer = mailer
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease = lease
+        self.scheduler = DeadlineScheduler('EMAIL OUTBOX', self._load, self._dispatch, batch_size=batch_size)
+        self._lock = threading.Lock()
+        self._recent_sends = collections.deque()
+        self.stats_sent = 0
+        self.stats_failed = 0
+        self.stats_dead = 0
+        self.stats_batches = 0
+        self.stats_sent_by_kind = collections.Counter()
+
+    def wake(self):
+        """Call after committing an enqueue so the dispatcher picks it up now."""
+        self.scheduler.wake()
+
+    def run_forever(self):
+        self.scheduler.run_forever()
+
+    @staticmethod
+    def pending_count(cur, kind):
+        cur.execute("SELECT COUNT(*) FROM email_outbox WHERE status = 'pending' AND kind = ?", (kind,))
+        return cur.fetchone()[0]
+
+    def _load(self, limit):
+        conn = self.get_db()
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT id, next_attempt_at FROM email_outbox WHERE status IN ('pending', 'sending') "
+                "ORDER BY next_attempt_at LIMIT ?",
+                (limit,),
+            )
+            return [(r['next_attempt_at'], r['id']) for r in cur.fetchall()]
+        finally:
+            conn.close()
+
+    def _backoff(self, attempts):
+        return min(self.base_delay * (2 ** (attempts - 1)), self.max_delay)
+
+    def _dispatch(self, outbox_ids):
+        conn = self.get_db()
+        cur = conn.cursor()
+        now = int(time.time())
+        placeholders = ','.join('?' for _ in outbox_ids)
+
+        # Claim the batch under the write lock so another process can't send it too.
+        cur.execute('BEGIN IMMEDIATE')
+        try:
+            cur.execute(
+                f"SELECT id, to_email, subject, body, html_body, kind, attempts FROM email_outbox "
+                f"WHERE id IN ({placeholders}) AND status IN ('pending', 'sending') AND next_attempt_at <= ?",
+                (*outbox_ids, now),
+            )
+            rows = cur.fetchall()
+            cur.executemany(
+                "UPDATE email_outbox SET status = 'sending', attempts = attempts + 1, next_attempt_at = ? WHERE id = ?",
+                [(now + self.lease, r['id']) for r in rows],
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            conn.close()
+            raise
+
+        sent, retry, dead = [], [], []
+        sent_kinds = collections.Counter()
+        for r in rows:
+            attempts = r['attempts'] + 1
+            try:
+                if not self.mailer.configured:
+                    raise RuntimeError('SMTP server not configured (MAIL_SERVER)')
+                self.mailer.send(r['to_email'], r['subject'], r['body'], r['html_body'])
+                sent.append((datetime.utcnow().isoformat(), r['id']))
+                sent_kinds[r['kind']] += 1
+            except Exception as e:
+                print(f"[EMAIL OUTBOX] attempt {attempts} failed for {r['to_email']}: {e}", flush=True)
+                if attempts >= self.max_attempts:
+                    dead.append((str(e), r['id']))
+                else:
+                    retry.append((int(time.time()) + self._backoff(attempts), str(e), r['id']))
+
+        cur.executemany("UPDATE email_outbox SET status = 'sent', sent_at = ?, last_error = NULL WHERE id = ?", sent)
+        cur.executemany("UPDATE email_outbox SET status = 'pending', next_attempt_at = ?, last_error = ? WHERE id = ?", retry)
+        cur.executemany("UPDATE email_outbox SET status = 'dead', last_error = ? WHERE id = ?", dead)
+        conn.commit()
+        conn.close()
+
+        with self._lock:
+            self.stats_batches += 1
+            self.stats_sent += len(sent)
+            self.stats_failed += len(retry) + len(dead)
+            self.stats_dead += len(dead)
+            self.stats_sent_by_kind.update(sent_kinds)
+            stamp = time.monotonic()
+            self._recent_sends.extend([stamp] * len(sent))
+        if retry:
+            # Backoff times changed in the DB; reload the schedule.
+            self.scheduler.wake()
+        return []
+
+    def stats(self) -> dict:
+        """Counters, sends in the last minute and queue depth per status."""
+        conn = self.get_db()
+        try:
+            cur = conn.cursor()
+            cur.execute('SELECT status, COUNT(*) AS n FROM email_outbox GROUP BY status')
+            depth = {r['status']: r['n'] for r in cur.fetchall()}
+        finally:
+            conn.close()
+        with self._lock:
+            cutoff = time.monotonic() - 60
+            while self._recent_sends and self._recent_sends[0] < cutoff:
+                self._recent_sends.popleft()
+            return {
+                'sent': self.stats_sent,
+                'failed_attempts': self.stats_failed,
+                'dead': self.stats_dead,
+                'batches': self.stats_batches,
+                'sent_by_kind': dict(self.stats_sent_by_kind),
+                'sent_last_minute': len(self._recent_sends),
+                'queue_depth': depth,
+            }
+
+
+class CoalescingGate:
+    """
+    Admission control for one kind of notification: at most one per key
+    within window seconds, and none while max_pending are already queued.
+    """
+
+    def __init__(self, window=300, max_pending=1000):
+        self.window = window
+        self.max_pending = max_pending
+        self._last = {}
+        self._prune_at = 1024
+        self._lock = threading.Lock()
+        self.stats_queued = 0
+        self.stats_coalesced = 0
+        self.stats_dropped = 0
+
+    def admit(self, key, pending_count):
+        """pending_count() is only called once the key is outside its window."""
+        now = time.monotonic()
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and now - last < self.window:
+                self.stats_coalesced += 1
+                return False
+            # Reserve the key so a concurrent login by the same user coalesces.
+            self._last[key] = now
+            if len(self._last) >= self._prune_at:
+                self._last = {k: t for k, t in self._last.items() if now - t < self.window}
+                self._prune_at = max(1024, 2 * len(self._last))
+        if pending_count() >= self.max_pending:
+            with self._lock:
+                if self._last.get(key) == now:
+                    del self._last[key]
+                self.stats_dropped += 1
+            return False
+        with self._lock:
+            self.stats_queued += 1
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'queued': self.stats_queued,
+                'coalesced': self.stats_coalesced,
+                'dropped': self.stats_dropped,
+                'tracked_keys': len(self._last),
+            }
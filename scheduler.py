@@ -0,0 +1,150 @@
+"""
+Deadline scheduler used by the background workers.
+
+Upcoming work is kept in a min-heap of (epoch_seconds, key). The worker thread
+sleeps until the earliest deadline instead of polling, and wake() lets request
+handlers tell it the schedule changed so it reloads immediately.
+"""
+import heapq
+import threading
+import time
+
+
+class DeadlineScheduler:
+    def __init__(self, name, load, fire, batch_size=100, reload_interval=300, retry_delay=60):
+        """
+        load(limit) -> [(epoch_seconds, key), ...] for the earliest pending
+        items, overdue ones included. fire(keys) sends the due items and
+        returns the keys that failed and should be retried after retry_delay.
+        reload_interval is a safety net for rows written by other processes.
+        """
+        self.name = name
+        self.load = load
+        self.fire = fire
+        self.batch_size = batch_size
+        self.reload_interval = reload_interval
+        self.retry_delay = retry_delay
+        self._heap = []
+        self._retry_after = {}
+        self._truncated = False
+        self._dirty = True
+        self._next_reload = 0.0
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+        self.stats_loads = 0
+        self.stats_fired = 0
+        self.stats_retries = 0
+
+    def wake(self):
+        """Mark the schedule as changed and interrupt the current sleep."""
+        with self._cond:
+            self._dirty = True
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """
+        Run run_forever() on a daemon thread. Returns False if a thread is
+        still running (e.g. finishing a fire() after stop()); call again later.
+        """
+        if self.running:
+            return False
+        with self._cond:
+            self._stopped = False
+            self._dirty = True
+        self._thread = threading.Thread(target=self.run_forever, name=self.name, daemon=True)
+        self._thread.start()
+        return True
+
+    def _reload(self):
+        rows = self.load(self.batch_size)
+        now = time.time()
+        heap = []
+        for due, key in rows:
+            retry_at = self._retry_after.get(key)
+            if retry_at is not None:
+                if retry_at <= now:
+                    del self._retry_after[key]
+                else:
+                    due = max(due, retry_at)
+            heap.append((due, key))
+        heapq.heapify(heap)
+        with self._cond:
+            self._heap = heap
+            self._truncated = len(rows) >= self.batch_size
+            self._next_reload = now + self.reload_interval
+            self.stats_loads += 1
+
+    def _next_due(self):
+        """Block until something is due (or stop() is called) and return its keys."""
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return []
+                now = time.time()
+                need_reload = self._dirty or now >= self._next_reload
+                self._dirty = False
+            if need_reload:
+                try:
+                    self._reload()
+                except Exception as e:
+                    print(f"[{self.name}] error loading schedule: {e}", flush=True)
+                    with self._cond:
+                        self._next_reload = time.time() + self.retry_delay
+                continue
+
+            with self._cond:
+                if self._dirty or self._stopped:
+                    continue
+                now = time.time()
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap)[1])
+                if due:
+                    # Only part of the backlog was loaded; fetch the next batch.
+                    if not self._heap and self._truncated:
+                        self._dirty = True
+                    return due
+                timeout = self._next_reload - now
+                if self._heap:
+                    timeout = min(timeout, self._heap[0][0] - now)
+                self._cond.wait(max(timeout, 0))
+
+    def run_forever(self):
+        while True:
+            due = self._next_due()
+            if self._stopped:
+                return
+            try:
+                failed = self.fire(due) or []
+            except Exception as e:
+                print(f"[{self.name}] error firing {due}: {e}", flush=True)
+                failed = due
+            retry_at = time.time() + self.retry_delay
+            with self._cond:
+                for key in due:
+                    self._retry_after.pop(key, None)
+                self.stats_fired += len(due) - len(failed)
+                self.stats_retries += len(failed)
+                for key in failed:
+                    self._retry_after[key] = retry_at
+                    heapq.heappush(self._heap, (retry_at, key))
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'scheduled': len(self._heap),
+                'next_due': self._heap[0][0] if self._heap else None,
+                'loads': self.stats_loads,
+                'fired': self.stats_fired,
+                'retries': self.stats_retries,
+            }
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Benchmark the core routes and background scan loops in-process.
+
+Seeds a throwaway database (or reuses --db) with N users and M months of
+data from generate_data.py, then times /dashboard, /budget, /mood,
+/api/tasks, /api/sync and each background scheduler's load() through the
+Flask test client. Prints a table and writes JSON so
+two runs can be compared:
+
+Run: python3 scripts/bench_routes.py [--users 20] [--months 3] [--requests 200] [--out run.json]
+     python3 scripts/bench_routes.py --compare baseline.json   (exit 1 on regressions)
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+import generate_data  # noqa: E402  (sibling script)
+
+ROUTES = ('/dashboard', '/budget', '/mood', '/api/tasks', '/api/sync')
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def measure(fn, requests, warmup):
+    for _ in range(warmup):
+        fn()
+    timings = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        if fn() is False:
+            errors += 1
+        timings.append(time.perf_counter() - t0)
+    total = time.perf_counter() - started
+    timings.sort()
+    ms = lambda v: round(v * 1000, 3)  # noqa: E731
+    return {
+        'requests': requests,
+        'errors': errors,
+        'total_s': round(total, 4),
+        'throughput_rps': round(requests / total, 1) if total else 0.0,
+        'mean_ms': ms(sum(timings) / len(timings)),
+        'p50_ms': ms(percentile(timings, 50)),
+        'p95_ms': ms(percentile(timings, 95)),
+        'p99_ms': ms(percentile(timings, 99)),
+        'max_ms': ms(timings[-1]),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print p50/p95 ratios against a previous run; returns the regressed targets."""
+    regressed = []
+    print(f"\nvs baseline (regression when p50 or p95 > {threshold:.2f}x):")
+    for name, now in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            continue
+        ratios = {k: now[k] / before[k] if before[k] else 1.0 for k in ('p50_ms', 'p95_ms')}
+        flag = ''
+        if max(ratios.values()) > threshold:
+            regressed.append(name)
+            flag = '  REGRESSION'
+        print(f"  {name:32} p50 {ratios['p50_ms']:5.2f}x  p95 {ratios['p95_ms']:5.2f}x{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--months', type=int, default=3)
+    parser.add_argument('--requests', type=int, default=200, help='timed calls per target')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--db', help='benchmark an existing database instead of seeding a temporary one')
+    parser.add_argument('--mood-cache-ttl', type=int, default=60, help='0 measures uncached mood/wellness reads')
+    parser.add_argument('--out', help='write JSON results here')
+    parser.add_argument('--compare', help='JSON results of a previous run')
+    parser.add_argument('--threshold', type=float, default=1.2)
+    args = parser.parse_args()
+
+    tmpdir = None
+    db_path = args.db
+    if not db_path:
+        tmpdir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmpdir.name, 'bench.db')
+
+    # The mood cache is sized at import time; everything else goes through create_app()
+    os.environ['MOMCARE_MOOD_CACHE_TTL'] = str(args.mood_cache_ttl)
+    import app as momcare  # noqa: E402
+    momcare.create_app({'DB_PATH': db_path, 'BACKGROUND_WORKERS': False, 'SLOW_QUERY_LOG': None})
+
+    rng = random.Random(args.seed)
+    conn = sqlite3.connect(db_path)
+    if not args.db:
+        started = time.perf_counter()
+        opts = generate_data.build_parser().parse_args([
+            db_path, '--users', str(args.users), '--days', str(args.months * 30), '--seed', str(args.seed),
+        ])
+        generate_data.generate(conn, opts, log=lambda msg: None)
+        print(f"Seeded {args.users} users x {args.months} months in {time.perf_counter() - started:.1f}s")
+    users = conn.execute('SELECT id, email FROM users ORDER BY id LIMIT ?', (args.users,)).fetchall()
+    conn.close()
+    if not users:
+        sys.exit('no users to benchmark')
+
+    # Same session keys as a real login
+    clients = []
+    for user_id, email in users:
+        client = momcare.app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = user_id
+            sess['user_email'] = email
+            sess['user_first'] = 'Bench'
+        clients.append(client)
+
+    def route_call(path):
+        def call():
+            resp = rng.choice(clients).get(path)
+            resp.get_data()  # drain streamed bodies
+            resp.close()  # as a WSGI server would; releases the streamed connection
+            return resp.status_code == 200
+        return call
+
+    def scan_call(scheduler):
+        return lambda: scheduler.load(scheduler.batch_size) is not None
+
+    targets = [(path, route_call(path)) for path in ROUTES]
+    targets += [(f'scan:{s.name}', scan_call(s)) for s in momcare.BACKGROUND_SCHEDULERS]
+
+    results = {}
+    print(f"{'target':32} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name, fn in targets:
+        stats = results[name] = measure(fn, args.requests, args.warmup)
+        print(f"{name:32} {stats['throughput_rps']:9.1f} {stats['p50_ms']:9.3f} {stats['p95_ms']:9.3f} "
+              f"{stats['p99_ms']:9.3f} {stats['errors']:7}")
+
+    report = {
+        'meta': {
+            'users': len(users),
+            'months': args.months,
+            'requests': args.requests,
+            'warmup': args.warmup,
+            'seed': args.seed,
+            'db': args.db or 'seeded',
+            'mood_cache_ttl': args.mood_cache_ttl,
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    if args.out:
+        with open(args.out, 'w') as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\nWrote {args.out}")
+
+    regressed = []
+    if args.compare:
+        with open(args.compare) as fh:
+            regressed = compare(results, json.load(fh), args.threshold)
+
+    momcare.db_pool.close_all()
+    if tmpdir:
+        tmpdir.cleanup()
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark wellness tip selection under threaded load.
+
+Compares the old approach (reseeding the global random module per call) with
+tips.pick_wellness_tip(), and checks that every thread gets the same tip for
+the same key.
+
+Run: python3 scripts/bench_tips.py [--threads 8] [--calls 20000]
+"""
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tips import EVAL_PREFIXES, FACTOR_TIPS, GOOD_TIPS, pick_wellness_tip  # noqa: E402
+
+FACTORS = ('sleep', 'water', 'activity', 'stress')
+
+
+def seeded_tip(user_email, date_iso, overall_score, weakest_factor):
+    """The previous implementation: seed the shared RNG, choose, reseed."""
+    random.seed(f"{user_email}_{date_iso}_{overall_score}_{weakest_factor}")
+    prefixes = next(p for floor, p in EVAL_PREFIXES if overall_score >= floor)
+    tips = GOOD_TIPS if overall_score >= 90 else FACTOR_TIPS[weakest_factor]
+    tip = f"{random.choice(prefixes)} {random.choice(tips)}"
+    random.seed()
+    return tip
+
+
+def make_keys(n, distinct=1000):
+    """n lookups over `distinct` keys, so each key is resolved by several threads."""
+    return [(f'user{i % distinct}@example.com', '2025-01-15', (i * 7) % 101, FACTORS[i % 4])
+            for i in (j % distinct for j in range(n))]
+
+
+def run(fn, keys, threads):
+    chunks = [keys[i::threads] for i in range(threads)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda chunk: [(k, fn(*k)) for k in chunk], chunks))
+    elapsed = time.perf_counter() - start
+    by_key = {}
+    mismatches = 0
+    for chunk in results:
+        for key, tip in chunk:
+            if by_key.setdefault(key, tip) != tip:
+                mismatches += 1
+    return elapsed, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--calls', type=int, default=20000)
+    args = parser.parse_args()
+
+    keys = make_keys(args.calls)
+    print(f"{args.calls} calls, {len(set(keys))} distinct keys")
+    for name, fn in (('random.seed', seeded_tip), ('stable hash', pick_wellness_tip)):
+        for threads in (1, args.threads):
+            elapsed, mismatches = run(fn, keys, threads)
+            print(f"  {name:12} threads={threads:<3} {elapsed * 1000:8.1f} ms  "
+                  f"{args.calls / elapsed:10.0f} calls/s  inconsistent={mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Run EXPLAIN QUERY PLAN over every SQL statement in the app's modules
+(SOURCES) and fail if any of them does a full table scan, walks a whole index
+(SCAN t USING INDEX i, usually a missing seek) or cannot be planned at all
+(e.g. a renamed column). Intentional full index walks are listed in
+ALLOWED_INDEX_SCANS; an entry that no longer matches any statement fails the
+check too, so the list cannot go stale.
+
+Statements are collected from cur.execute()/executemany() calls whose SQL is a
+string literal, a module-level SQL constant (optionally concatenated or
+.format()-ed with literals), or an f-string that only interpolates IN (...)
+placeholder lists, and from SQL string literals handed to helpers (e.g. the
+janitor's batch deletes, with {placeholders} read as one ?). Statements built
+at request time, like the /api/tasks keyset query, are checked by
+tests/test_query_plans.py through explain_problems(). The schema is built in memory by
+migrations.run_migrations(), so the check sees the same tables and indexes
+the app runs with. Pass --db to check against a copy of a real database
+instead (its statistics can change the planner's choices).
+
+Run: python3 scripts/check_query_plans.py [--db path/to/users.db] [--source module.py ...]
+"""
+import argparse
+import ast
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from migrations import run_migrations  # noqa: E402
+
+SOURCES = ('app.py', 'outbox.py', 'intervals.py', 'janitor.py')
+CHECKED_VERBS = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+HELPER_SQL_RE = re.compile(r'^\s*(?:SELECT|WITH|INSERT|UPDATE|DELETE)\s')
+PLACEHOLDER_NAMES = ('placeholder', 'placeholders')
+SCAN_RE = re.compile(r'^SCAN (\w+)(?: AS \w+)?(?: USING (?:COVERING )?INDEX (\w+))?$')
+
+# Whitespace-normalized statements allowed to walk a whole index
+ALLOWED_INDEX_SCANS = {
+    # outbox.py stats(): queue depth per status for /metrics, off the small status index
+    'SELECT status, COUNT(*) AS n FROM email_outbox GROUP BY status',
+}
+
+
+def sql_constants(tree):
+    """Module-level string constants, including ones imported from sibling modules."""
+    consts = {}
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module and (ROOT / f'{node.module}.py').exists():
+            imported = sql_constants(ast.parse((ROOT / f'{node.module}.py').read_text(encoding='utf-8')))
+            for alias in node.names:
+                if alias.name in imported:
+                    consts[alias.asname or alias.name] = imported[alias.name]
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)
+                and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)):
+            consts[node.targets[0].id] = node.value.value
+    return consts
+
+
+def render_sql(node, consts):
+    """Return the SQL text for an execute() argument, or None if it is dynamic."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.Name):
+        return consts.get(node.id)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left, right = render_sql(node.left, consts), render_sql(node.right, consts)
+        return left + right if left is not None and right is not None else None
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'format'
+            and all(isinstance(a, ast.Constant) for a in node.args)):
+        template = render_sql(node.func.value, consts)
+        return template.format(*(a.value for a in node.args)) if template is not None else None
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.Constant):
+                parts.append(value.value)
+            elif (isinstance(value, ast.FormattedValue) and isinstance(value.value, ast.Name)
+                    and value.value.id in PLACEHOLDER_NAMES):
+                parts.append('?')
+            else:
+                return None
+        return ''.join(parts)
+    return None
+
+
+def collect_statements(source_path):
+    tree = ast.parse(source_path.read_text(encoding='utf-8'))
+    consts = sql_constants(tree)
+    statements, dynamic = [], []
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr in ('execute', 'executemany') and node.args):
+            continue
+        sql = render_sql(node.args[0], consts)
+        if sql is None:
+            dynamic.append(node.lineno)
+            continue
+        if sql.strip().upper().startswith(CHECKED_VERBS):
+            statements.append((node.lineno, sql))
+    for node in ast.walk(tree):
+        # SQL literals passed to helpers that run them later
+        if (not isinstance(node, ast.Call) or (isinstance(node.func, ast.Attribute)
+                and node.func.attr in ('execute', 'executemany', 'format'))):
+            continue
+        for arg in node.args:
+            if isinstance(arg, ast.Constant) and isinstance(arg.value, str) and HELPER_SQL_RE.match(arg.value):
+                sql = arg.value
+                for name in PLACEHOLDER_NAMES:
+                    sql = sql.replace('{%s}' % name, '?')
+                statements.append((arg.lineno, sql))
+    return statements, dynamic
+
+
+def bind_params(sql):
+    named = re.findall(r':(\w+)', sql)
+    if named:
+        return {name: None for name in named}
+    return [None] * sql.count('?')
+
+
+def explain_problems(conn, sql):
+    """
+    EXPLAIN sql on conn and return the plan steps that scan a whole table, or
+    walk a whole index unless sql is in ALLOWED_INDEX_SCANS. Raises
+    sqlite3.Error if the statement cannot be planned.
+    """
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    plan = conn.execute('EXPLAIN QUERY PLAN ' + sql, bind_params(sql)).fetchall()
+    problems = []
+    for row in plan:
+        detail = row[3]
+        m = SCAN_RE.match(detail)
+        if not m or m.group(1) not in tables:
+            continue
+        if m.group(2) and ' '.join(sql.split()) in ALLOWED_INDEX_SCANS:
+            continue
+        problems.append(detail)
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help='copy this database instead of starting from an empty one')
+    parser.add_argument('--source', action='append', help=f"module to scan for SQL (repeatable; default: {', '.join(SOURCES)})")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(':memory:')
+    if args.db:
+        src = sqlite3.connect(args.db)
+        src.backup(conn)
+        src.close()
+    run_migrations(conn)
+
+    failures, errors, seen = [], [], set()
+    for source in args.source or [str(ROOT / name) for name in SOURCES]:
+        statements, dynamic = collect_statements(Path(source))
+        for lineno, sql in statements:
+            normalized = ' '.join(sql.split())
+            seen.add(normalized)
+            try:
+                problems = explain_problems(conn, sql)
+            except sqlite3.Error as e:
+                errors.append((source, lineno, str(e)))
+                continue
+            failures += [(source, lineno, detail, normalized) for detail in problems]
+        print(f"Checked {len(statements)} statements from {source}")
+        if dynamic:
+            print(f"  skipped {len(dynamic)} dynamically built statements (lines {', '.join(map(str, dynamic))})")
+    # Only meaningful when the modules that own the entries were scanned
+    stale = sorted(ALLOWED_INDEX_SCANS - seen) if not args.source else []
+
+    for source, lineno, err in errors:
+        print(f"{source}:{lineno}: could not plan ({err})")
+    for source, lineno, detail, sql in failures:
+        print(f"FULL SCAN {source}:{lineno}: {detail}\n    {sql}")
+    for sql in stale:
+        print(f"ALLOWED_INDEX_SCANS entry matches no statement: {sql}")
+    conn.close()
+    return 1 if failures or errors or stale else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic MomCare database for scale testing.
+
+Writes users, daily_moods, daily_wellness, monthly_budgets, expenses,
+grocery_items, tasks (including overdue ones) and reminder_items with bulk
+executemany in large transactions. The same --seed and options always
+produce the same rows (relative to --today).
+
+By default the database is created with the current schema (migrations.py),
+so triggers keep monthly_spend_rollup and the sync versions exact. With
+--legacy-groceries the database is left at schema version 0 with
+grocery_items in an old layout, for timing the startup migration:
+    old        item, qty, cost, month_str, purchased (table is rebuilt)
+    month_str  current columns but month_str instead of month_iso
+
+Run: python3 scripts/generate_data.py out.db [--users 2000] [--days 730] [--seed 1]
+"""
+import argparse
+import math
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import migrations  # noqa: E402
+from moods import MOOD_SCORES  # noqa: E402
+from units import parse_height, parse_weight  # noqa: E402
+
+FIRST_NAMES = ('Ana', 'Bea', 'Carla', 'Dana', 'Ella', 'Faye', 'Gina', 'Hana', 'Iris', 'Joy', 'Kim', 'Lia', 'Mae', 'Nina')
+EXPENSE_CATEGORIES = (('Food', 0.35), ('Bills', 0.2), ('Transport', 0.15), ('Baby', 0.15), ('Health', 0.1), ('Other', 0.05))
+GROCERY_ITEMS = ('Milk', 'Eggs', 'Rice', 'Bread', 'Diapers', 'Apples', 'Chicken', 'Spinach', 'Yogurt', 'Formula')
+TASK_TITLES = ('Prenatal vitamins', 'Doctor visit', 'Grocery run', 'Pay bills', 'Laundry', 'Walk', 'Meal prep', 'Call mom')
+TASK_COLORS = ('#F6A5C0', '#A5D8F6', '#B8F6A5', '#F6E3A5')
+MOODS = tuple(MOOD_SCORES)
+MOOD_WEIGHTS = {'Stressed': 0.15, 'Tired': 0.25, 'Neutral': 0.35, 'Happy': 0.25}
+HEIGHTS = ('165 cm', "5'4\"", '158', '1.70', '5 ft 6 in', '')
+WEIGHTS = ('60 kg', '130 lbs', '72', '145 lbs', '')
+
+# Baseline columns only, so the same rows fit both the current and the
+# version-0 (--legacy-groceries) schema.
+INSERTS = {
+    'users': "INSERT INTO users (first, last, email, birthdate, password_hash, security_question, security_answer, gender, height, weight) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    'monthly_budgets': "INSERT INTO monthly_budgets (user_email, month_iso, income, budget_limit, month, year, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+    'daily_moods': "INSERT INTO daily_moods (user_email, date, mood, mood_score, created_at) VALUES (?, ?, ?, ?, ?)",
+    'daily_wellness': "INSERT INTO daily_wellness (user_email, date, sleep, water, activity, stress, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+    'expenses': "INSERT INTO expenses (user_email, month_iso, category, description, color, amount, expense_date, is_eco, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    'tasks': "INSERT INTO tasks (user_email, title, start_time, duration, color, is_priority, task_date, completed, notified, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    'reminder_items': "INSERT INTO reminder_items (user_email, title, message, remind_at, is_recurring, recurrence_rule, email_sent, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+}
+GROCERY_INSERTS = {
+    None: "INSERT INTO grocery_items (user_email, item_name, quantity, estimated_cost, category, is_checked, month_iso, month, year, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    'month_str': "INSERT INTO grocery_items (user_email, item_name, quantity, estimated_cost, category, is_checked, month_str, month, year, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    'old': "INSERT INTO grocery_items (user_email, item, qty, cost, category, month_str, purchased) VALUES (?, ?, ?, ?, ?, ?, ?)",
+}
+LEGACY_GROCERY_TABLES = {
+    'old': """
+        CREATE TABLE grocery_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT NOT NULL,
+            item TEXT NOT NULL,
+            qty INTEGER DEFAULT 1,
+            cost REAL,
+            category TEXT,
+            month_str TEXT,
+            purchased INTEGER DEFAULT 0
+        )
+    """,
+    'month_str': """
+        CREATE TABLE grocery_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT NOT NULL,
+            item_name TEXT NOT NULL,
+            quantity INTEGER DEFAULT 1,
+            estimated_cost REAL,
+            category TEXT,
+            is_checked INTEGER DEFAULT 0,
+            month_str TEXT,
+            month INTEGER,
+            year INTEGER,
+            created_at TEXT
+        )
+    """,
+}
+
+
+def poisson(rng, lam):
+    """Poisson sample (Knuth for small means, normal approximation above 30)."""
+    if lam <= 0:
+        return 0
+    if lam > 30:
+        return max(0, int(round(rng.gauss(lam, math.sqrt(lam)))))
+    limit, k, p = math.exp(-lam), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+def weighted(rng, pairs):
+    return rng.choices([v for v, _ in pairs], weights=[w for _, w in pairs])[0]
+
+
+def months_between(first_day, last_day):
+    month = first_day.replace(day=1)
+    while month <= last_day:
+        yield month
+        month = (month + timedelta(days=32)).replace(day=1)
+
+
+def user_rows(rng, opts, today):
+    """Yields (table, row) for every user; one user at a time so memory stays flat."""
+    first_day = today - timedelta(days=opts.days - 1)
+    for u in range(opts.users):
+        email = f'user{u}@example.com'
+        yield 'users', (rng.choice(FIRST_NAMES), f'Test{u}', email, f'{rng.randint(1980, 2004)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+                        'x', 'What is your favorite color?', 'pink', 'Female', rng.choice(HEIGHTS), rng.choice(WEIGHTS))
+        # Users join at different times; active users log most days
+        joined = first_day + timedelta(days=int(rng.random() ** 2 * opts.days * 0.5))
+        activity = min(1.0, rng.betavariate(4, 2))
+
+        for month in months_between(joined, today):
+            month_iso = month.strftime('%Y-%m')
+            income = round(rng.lognormvariate(math.log(opts.income_median), 0.4), 0)
+            yield 'monthly_budgets', (email, month_iso, income, round(income * rng.uniform(0.5, 0.9), 0), month.month, month.year, f'{month_iso}-01T08:00:00')
+            month_end = min(today, (month + timedelta(days=32)).replace(day=1) - timedelta(days=1))
+            span = (month_end - max(month, joined)).days + 1
+            for _ in range(poisson(rng, opts.expenses_per_month * activity * span / 30)):
+                day = max(month, joined) + timedelta(days=rng.randrange(span))
+                category = weighted(rng, EXPENSE_CATEGORIES)
+                amount = round(rng.lognormvariate(math.log(opts.amount_median), opts.amount_sigma), 2)
+                yield 'expenses', (email, month_iso, category, f'{category} purchase', None, amount, day.isoformat(), int(rng.random() < 0.1), f'{day.isoformat()}T12:00:00')
+            for _ in range(poisson(rng, opts.groceries_per_month * activity * span / 30)):
+                day = max(month, joined) + timedelta(days=rng.randrange(span))
+                yield 'grocery_items', (email, rng.choice(GROCERY_ITEMS), rng.randint(1, 4),
+                                        round(rng.lognormvariate(math.log(6), 0.6), 2), 'Groceries',
+                                        int(rng.random() < opts.checked_rate), month_iso, month.month, month.year, f'{day.isoformat()}T10:00:00')
+
+        day = joined
+        while day <= today:
+            stamp = f'{day.isoformat()}T21:00:00'
+            if rng.random() < opts.mood_rate * activity:
+                mood = rng.choices(MOODS, weights=[MOOD_WEIGHTS[m] for m in MOODS])[0]
+                yield 'daily_moods', (email, day.isoformat(), mood, MOOD_SCORES[mood], stamp)
+            if rng.random() < opts.wellness_rate * activity:
+                yield 'daily_wellness', (email, day.isoformat(), f'{rng.gauss(7, 1.2):.1f} hrs', str(max(0, int(rng.gauss(6, 2)))),
+                                         f'{max(0, int(rng.gauss(25, 15)))} min', rng.randint(1, 10), stamp)
+            day += timedelta(days=1)
+
+        # Tasks: the last task_days days plus the next week. Past tasks are
+        # mostly completed; the rest stay pending (overdue).
+        for offset in range(-opts.task_days, 8):
+            task_day = today + timedelta(days=offset)
+            if task_day < joined:
+                continue
+            for _ in range(poisson(rng, opts.tasks_per_day * activity)):
+                if offset < 0:
+                    completed = int(rng.random() >= opts.overdue_rate)
+                else:
+                    completed = int(offset == 0 and rng.random() < 0.3)
+                start = rng.choice((7, 8, 9, 10, 11, 13, 14, 15, 16, 18, 19)) + rng.choice((0, 0.5))
+                yield 'tasks', (email, rng.choice(TASK_TITLES), start, rng.choice((0.5, 1, 1, 1.5, 2)), rng.choice(TASK_COLORS),
+                                int(rng.random() < 0.2), task_day.isoformat(), completed, int(offset < 0), f'{task_day.isoformat()}T07:00:00')
+
+        for _ in range(poisson(rng, opts.reminders_per_user)):
+            offset = rng.randint(-30, 30)
+            remind_at = datetime.combine(today + timedelta(days=offset), datetime.min.time()) + timedelta(hours=rng.randint(7, 20), minutes=rng.choice((0, 15, 30, 45)))
+            created = (remind_at - timedelta(days=rng.randint(1, 10))).isoformat(timespec='seconds')
+            recurring = int(rng.random() < 0.2)
+            yield 'reminder_items', (email, 'Reminder', 'Take a moment for yourself', remind_at.isoformat(timespec='minutes'), recurring,
+                                     'daily' if recurring else None, int(offset < 0), created, created)
+
+
+def legacy_grocery_row(row, layout):
+    email, item, qty, cost, category, checked, month_iso, month, year, created = row
+    if layout == 'old':
+        return (email, item, qty, cost, category, month_iso, checked)
+    return row
+
+
+def create_legacy_schema(conn, layout):
+    """Version-0 database: baseline tables, with grocery_items in an old layout."""
+    if migrations.USERS_JSON.exists():
+        sys.exit(f'{migrations.USERS_JSON} exists; building the baseline schema would import and rename it')
+    scratch = sqlite3.connect(':memory:')
+    migrations._baseline_schema(scratch.cursor())
+    tables = scratch.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT IN ('sqlite_sequence', 'grocery_items')"
+    ).fetchall()
+    scratch.close()
+    with conn:
+        for _, sql in tables:
+            conn.execute(sql)
+        conn.execute(LEGACY_GROCERY_TABLES[layout])
+
+
+def generate(conn, opts, today=None, log=print):
+    """Fill conn (already at the target schema) and return row counts per table."""
+    rng = random.Random(opts.seed)
+    today = today or date.today()
+    grocery_sql = GROCERY_INSERTS[opts.legacy_groceries]
+    pending = {}
+    counts = {}
+
+    def flush(table):
+        rows = pending.pop(table, [])
+        if rows:
+            conn.executemany(grocery_sql if table == 'grocery_items' else INSERTS[table], rows)
+            counts[table] = counts.get(table, 0) + len(rows)
+
+    started = time.perf_counter()
+    buffered = 0
+    for table, row in user_rows(rng, opts, today):
+        if table == 'grocery_items':
+            row = legacy_grocery_row(row, opts.legacy_groceries)
+        pending.setdefault(table, []).append(row)
+        buffered += 1
+        if buffered >= opts.batch_size:
+            # One transaction per batch: every table's buffered rows at once
+            for name in list(pending):
+                flush(name)
+            conn.commit()
+            buffered = 0
+            log(f'  {sum(counts.values()):>10,} rows  {time.perf_counter() - started:6.1f}s')
+    for name in list(pending):
+        flush(name)
+    conn.commit()
+
+    if opts.legacy_groceries is None:
+        # Derived columns the app fills on write
+        with conn:
+            conn.executemany(
+                'UPDATE users SET height_m = ?, weight_kg = ? WHERE id = ?',
+                [(parse_height(h) or None, parse_weight(w) or None, uid) for uid, h, w in conn.execute('SELECT id, height, weight FROM users')],
+            )
+            conn.execute("UPDATE grocery_items SET purchased_on = substr(created_at, 1, 10) WHERE is_checked = 1 AND purchased_on IS NULL")
+            conn.execute(f"UPDATE reminder_items SET remind_at_epoch = {migrations.REMIND_AT_EPOCH_SQL.format('remind_at')}")
+    return counts
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('db', help='output database (must not exist)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--today', type=date.fromisoformat, help='anchor date, YYYY-MM-DD (default: today)')
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=730, help='days of mood/wellness/spending history')
+    parser.add_argument('--mood-rate', type=float, default=0.8, help='chance an active user logs a mood on a day')
+    parser.add_argument('--wellness-rate', type=float, default=0.7)
+    parser.add_argument('--expenses-per-month', type=float, default=20, help='Poisson mean per active user')
+    parser.add_argument('--groceries-per-month', type=float, default=12)
+    parser.add_argument('--checked-rate', type=float, default=0.8, help='share of grocery items checked off')
+    parser.add_argument('--amount-median', type=float, default=15.0, help='expense amounts are lognormal')
+    parser.add_argument('--amount-sigma', type=float, default=0.9)
+    parser.add_argument('--income-median', type=float, default=3000.0)
+    parser.add_argument('--tasks-per-day', type=float, default=2.0)
+    parser.add_argument('--task-days', type=int, default=30, help='days of past tasks')
+    parser.add_argument('--overdue-rate', type=float, default=0.15, help='share of past tasks left pending')
+    parser.add_argument('--reminders-per-user', type=float, default=6)
+    parser.add_argument('--legacy-groceries', choices=('old', 'month_str'), help='write a version-0 database with this grocery_items layout')
+    parser.add_argument('--batch-size', type=int, default=50000, help='rows per transaction')
+    return parser
+
+
+def main():
+    opts = build_parser().parse_args()
+    if os.path.exists(opts.db):
+        sys.exit(f'{opts.db} already exists')
+
+    conn = sqlite3.connect(opts.db)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=OFF')
+    if opts.legacy_groceries:
+        create_legacy_schema(conn, opts.legacy_groceries)
+    else:
+        migrations.run_migrations(conn)
+
+    started = time.perf_counter()
+    counts = generate(conn, opts, today=opts.today)
+    elapsed = time.perf_counter() - started
+    conn.execute('PRAGMA optimize')
+    conn.close()
+
+    total = sum(counts.values())
+    for table, count in sorted(counts.items()):
+        print(f'{table:18} {count:>12,}')
+    print(f"{'total':18} {total:>12,}  in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
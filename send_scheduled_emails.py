@@ -10,22 +10,18 @@ import sys
 import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 
 # Add parent directory to path to import from app
 sys.path.insert(0, str(Path(__file__).parent))
 
 DB_PATH = Path(__file__).parent / 'users.db'
 
-# Email configuration from environment
-MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
-MAIL_PORT = int(os.environ.get('MAIL_PORT', 587))
-MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS', 'True').lower() == 'true'
-MAIL_USERNAME = os.environ.get('MAIL_USERNAME', '')
-MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD', '')
-MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER', 'noreply@momcare.com')
+from mailer import Mailer
+
+# Email configuration from environment (MAIL_SERVER, MAIL_PORT, MAIL_USE_TLS,
+# MAIL_USERNAME, MAIL_PASSWORD, MAIL_DEFAULT_SENDER); one SMTP session is
+# reused for every reminder in a run.
+mailer = Mailer.from_env(default_sender='noreply@momcare.com')
 
 
 def get_db():
@@ -36,27 +32,13 @@ def get_db():
 
 
 def send_email(to_email, subject, body, html_body=None):
-    """Send email using SMTP."""
-    if not MAIL_USERNAME or not MAIL_PASSWORD:
+    """Send email using the shared SMTP session pool."""
+    if not mailer.configured:
         print(f"Email not configured. Would send to {to_email}: {subject}")
         return False
     
     try:
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = subject
-        msg['From'] = MAIL_DEFAULT_SENDER
-        msg['To'] = to_email
-        
-        msg.attach(MIMEText(body, 'plain'))
-        if html_body:
-            msg.attach(MIMEText(html_body, 'html'))
-        
-        with smtplib.SMTP(MAIL_SERVER, MAIL_PORT) as server:
-            if MAIL_USE_TLS:
-                server.starttls()
-            server.login(MAIL_USERNAME, MAIL_PASSWORD)
-            server.send_message(msg)
-        
+        mailer.send(to_email, subject, body, html_body)
         print(f"✓ Email sent to {to_email}: {subject}")
         return True
     except Exception as e:
@@ -209,6 +191,7 @@ def process_reminders():
             failed_count += 1
             print(f"  Failed to send email")
     
+    mailer.close()
     print(f"\n[{datetime.utcnow().isoformat()}] Finished!")
     print(f"Summary: {sent_count} sent, {failed_count} failed")
 
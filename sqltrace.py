@@ -0,0 +1,142 @@
+"""
+SQL statement tracer fed by the connection pool's on_query hook.
+
+Statements are normalized (literals and IN lists folded, whitespace
+collapsed) and aggregated per normalized text. Statements slower than
+slow_ms go to an in-memory top-N table and a rotating slow-query log.
+Per-request counts let the app flag N+1 patterns: the same statement run
+repeat_threshold or more times while serving one request.
+"""
+import heapq
+import itertools
+import logging
+import logging.handlers
+import os
+import re
+import threading
+from datetime import datetime
+from functools import lru_cache
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def normalize_sql(sql):
+    sql = ' '.join(sql.split())
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    return _IN_LIST_RE.sub('IN (...)', sql)
+
+
+class SQLTracer:
+    def __init__(self, slow_ms=100, top_n=20, repeat_threshold=10,
+                 log_path=None, log_max_bytes=1_000_000, log_backups=3):
+        self.slow_seconds = slow_ms / 1000.0
+        self.top_n = top_n
+        self.repeat_threshold = repeat_threshold
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._statements = {}  # normalized -> [count, seconds, max_seconds, rows]
+        self._slowest = []  # min-heap of (seconds, seq, entry)
+        self._repeats = {}  # (route, normalized) -> [requests, max_per_request]
+        self.stats_slow = 0
+        self.log_max_bytes = log_max_bytes
+        self.log_backups = log_backups
+        self._log = None
+        self.set_log_path(log_path)
+
+    def set_log_path(self, log_path):
+        """Start (or stop, with None) writing slow statements to a rotating log file."""
+        if self._log is not None:
+            for handler in list(self._log.handlers):
+                self._log.removeHandler(handler)
+                handler.close()
+            self._log = None
+        if not log_path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(log_path, maxBytes=self.log_max_bytes, backupCount=self.log_backups)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        self._log = logging.getLogger(f'momcare.slow_sql.{id(self)}')
+        self._log.setLevel(logging.INFO)
+        self._log.propagate = False
+        self._log.addHandler(handler)
+
+    def record(self, sql, seconds, rows, route=None):
+        """Add one finished statement; returns its normalized text."""
+        normalized = normalize_sql(sql)
+        slow = seconds >= self.slow_seconds
+        with self._lock:
+            entry = self._statements.get(normalized)
+            if entry is None:
+                entry = self._statements[normalized] = [0, 0.0, 0.0, 0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+            entry[3] += rows
+            if slow:
+                self.stats_slow += 1
+                item = (seconds, next(self._seq), {
+                    'sql': normalized,
+                    'ms': round(seconds * 1000, 2),
+                    'rows': rows,
+                    'route': route,
+                    'at': datetime.now().isoformat(timespec='seconds'),
+                })
+                if len(self._slowest) < self.top_n:
+                    heapq.heappush(self._slowest, item)
+                elif item[0] > self._slowest[0][0]:
+                    heapq.heapreplace(self._slowest, item)
+        if slow and self._log is not None:
+            self._log.info(f"{datetime.now().isoformat(timespec='seconds')} {seconds * 1000:.1f}ms rows={rows} route={route} {normalized}")
+        return normalized
+
+    def check_repeats(self, route, counts):
+        """counts: normalized statement -> times run in one request. Returns the statements flagged as N+1."""
+        flagged = [(sql, n) for sql, n in counts.items() if n >= self.repeat_threshold]
+        for sql, n in flagged:
+            with self._lock:
+                entry = self._repeats.get((route, sql))
+                first = entry is None
+                if first:
+                    entry = self._repeats[(route, sql)] = [0, 0]
+                entry[0] += 1
+                entry[1] = max(entry[1], n)
+            if first:
+                print(f"[SQL] Possible N+1 in {route}: {n}x {sql}", flush=True)
+        return [sql for sql, _ in flagged]
+
+    def report(self, limit=20):
+        """Top statements by total time, the slowest single runs and N+1 findings."""
+        with self._lock:
+            statements = sorted(self._statements.items(), key=lambda kv: kv[1][1], reverse=True)[:limit]
+            slowest = [entry for _, _, entry in sorted(self._slowest, reverse=True)]
+            repeats = sorted(self._repeats.items(), key=lambda kv: kv[1][0], reverse=True)[:limit]
+        return {
+            'statements': [{
+                'sql': sql,
+                'count': count,
+                'total_ms': round(seconds * 1000, 2),
+                'avg_ms': round(seconds * 1000 / count, 3),
+                'max_ms': round(max_seconds * 1000, 2),
+                'rows': rows,
+            } for sql, (count, seconds, max_seconds, rows) in statements],
+            'slowest': slowest,
+            'repeated': [{
+                'route': route,
+                'sql': sql,
+                'requests': requests,
+                'max_per_request': max_per_request,
+            } for (route, sql), (requests, max_per_request) in repeats],
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'statements': len(self._statements),
+                'executions': sum(e[0] for e in self._statements.values()),
+                'slow': self.stats_slow,
+                'repeat_patterns': len(self._repeats),
+            }
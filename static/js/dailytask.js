@@ -338,9 +338,23 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // --- API CALLS ---
+    function toYMD(d) {
+        return `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
+    }
+
     function loadTasks() {
-        fetch('/api/tasks')
-            .then(res => res.json())
+        // Only the selected day (timeline) and overdue pending tasks, not the whole history
+        const day = toYMD(selectedDate || new Date());
+        const yesterday = new Date();
+        yesterday.setDate(yesterday.getDate() - 1);
+        Promise.all([
+            fetch(`/api/tasks?from=${day}&to=${day}`).then(res => res.json()),
+            fetch(`/api/tasks?to=${toYMD(yesterday)}&completed=0`).then(res => res.json())
+        ])
+            .then(([dayTasks, overdueTasks]) => {
+                const seen = new Set(dayTasks.map(t => t.id));
+                return dayTasks.concat(overdueTasks.filter(t => !seen.has(t.id)));
+            })
             .then(data => {
                 fetchedTasks = data;
                 renderTimeline();
@@ -702,10 +716,13 @@ document.addEventListener('DOMContentLoaded', () => {
                 method: 'PUT',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify(data)
-            }).then(res => res.json()).then(() => {
-                closeModal();
-                loadTasks();
-            });
+            }).then(res => res.json()).then(res => {
+                if (res.error) showToast(res.error, 'error');
+                else {
+                    closeModal();
+                    loadTasks();
+                }
+            }).catch(err => { console.error(err); showToast('Error saving task', 'error'); });
         } else {
             // Add
             fetch('/api/tasks', {
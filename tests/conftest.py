@@ -0,0 +1,116 @@
+"""
+Shared fixtures. Every test gets its own database under tmp_path; users.db,
+background workers and real email are never touched.
+"""
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+# app.py reads these at import time; keep it away from users.db and SMTP
+for _var in ('MAIL_SERVER', 'SMTP_USERNAME', 'MAIL_USERNAME', 'SMTP_PASSWORD', 'MAIL_PASSWORD'):
+    os.environ.pop(_var, None)
+os.environ['MOMCARE_DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'unused.db')
+os.environ['MOMCARE_BACKGROUND_WORKERS'] = 'off'
+os.environ['MOMCARE_SLOW_QUERY_LOG'] = 'off'
+
+USER_EMAIL = 'mom@example.com'
+
+
+@pytest.fixture(autouse=True)
+def no_users_json(monkeypatch, tmp_path):
+    # The baseline migration imports (and renames) users.json next to migrations.py
+    import migrations
+    monkeypatch.setattr(migrations, 'USERS_JSON', tmp_path / 'users.json')
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / 'test.db'
+
+
+@pytest.fixture
+def momcare(db_path):
+    """The app module, pointed at a fresh, migrated database."""
+    import app as momcare
+    momcare.create_app({'DB_PATH': db_path, 'BACKGROUND_WORKERS': False, 'SLOW_QUERY_LOG': None})
+    yield momcare
+    momcare.mood_cache.clear()
+    momcare.db_pool.close_all()
+
+
+@pytest.fixture
+def client(momcare):
+    """Test client with the same session keys as a real login."""
+    client = momcare.app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+        sess['user_email'] = USER_EMAIL
+        sess['user_first'] = 'Test'
+    return client
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: no AUTH, no STARTTLS."""
+
+    def reply(self, line):
+        self.wfile.write((line + '\r\n').encode('ascii'))
+
+    def handle(self):
+        self.server.sessions += 1
+        self.reply('220 localhost test SMTP')
+        envelope, data = None, None
+        for raw in self.rfile:
+            line = raw.decode('utf-8').rstrip('\r\n')
+            if data is not None:
+                if line == '.':
+                    self.server.messages.append({**envelope, 'data': '\n'.join(data)})
+                    data = None
+                    self.reply('250 OK')
+                else:
+                    data.append(line[1:] if line.startswith('..') else line)
+                continue
+            verb = line[:4].upper()
+            if verb == 'EHLO':
+                self.reply('250-localhost')
+                self.reply('250 8BITMIME')
+            elif verb == 'HELO':
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                envelope = {'from': line[10:].strip('<>'), 'to': []}
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                envelope['to'].append(line[8:].strip('<>'))
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                data = []
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+            elif verb in ('RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+@pytest.fixture
+def smtp_server():
+    """Unauthenticated local SMTP server; .messages collects what it received."""
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _SMTPHandler)
+    server.daemon_threads = True
+    server.messages = []
+    server.sessions = 0
+    server.host, server.port = server.server_address
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,102 @@
+import itertools
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from conftest import USER_EMAIL
+
+
+@pytest.fixture
+def tasks(db_path, momcare):
+    """Every (task_date, start_time) combination, NULLs included, several rows each."""
+    dates = (None, '2099-01-01', '2099-01-02')
+    times = (None, 8.0, 9.5)
+    conn = sqlite3.connect(db_path)
+    for i, (task_date, start_time, _) in enumerate(itertools.product(dates, times, range(3))):
+        conn.execute(
+            'INSERT INTO tasks (user_email, title, task_date, start_time, duration, completed) VALUES (?, ?, ?, ?, 1, ?)',
+            (USER_EMAIL, f'task {i}', task_date, start_time, i % 2),
+        )
+    conn.execute("INSERT INTO tasks (user_email, title, task_date) VALUES ('someone@else.com', 'not mine', '2099-01-01')")
+    conn.commit()
+    conn.close()
+
+
+def get_json(client, url):
+    resp = client.get(url)
+    body = resp.get_json()
+    resp.close()
+    return resp, body
+
+
+def pages(client, query, limit):
+    ids, cursor = [], None
+    for _ in range(100):  # a cursor that repeats rows never runs out of pages
+        url = f'/api/tasks?limit={limit}{query}' + (f'&cursor={cursor}' if cursor else '')
+        resp, body = get_json(client, url)
+        assert resp.status_code == 200
+        ids += [t['id'] for t in body]
+        cursor = resp.headers.get('X-Next-Cursor')
+        if not cursor:
+            return ids
+    pytest.fail(f'cursor paging did not finish; got {len(ids)} rows')
+
+
+@pytest.mark.parametrize('limit', [1, 2, 4, 7, 500])
+def test_cursor_pages_match_the_unpaged_listing(client, tasks, limit):
+    _, everything = get_json(client, '/api/tasks')
+    assert len(everything) == 27
+    assert pages(client, '', limit) == [t['id'] for t in everything]
+
+
+def test_cursor_paging_with_filters(client, tasks):
+    _, everything = get_json(client, '/api/tasks?from=2099-01-01&completed=1')
+    assert everything and all(t['completed'] and t['task_date'] >= '2099-01-01' for t in everything)
+    assert pages(client, '&from=2099-01-01&completed=1', 2) == [t['id'] for t in everything]
+
+
+def test_fields_projection_always_includes_id(client, tasks):
+    _, body = get_json(client, '/api/tasks?fields=title')
+    assert set(body[0]) == {'id', 'title'}
+    resp, _ = get_json(client, '/api/tasks?fields=title,secret')
+    assert resp.status_code == 400
+
+
+@pytest.mark.parametrize('query', ['cursor=nope', 'limit=ten', 'from=01/02/2026'])
+def test_bad_parameters_are_rejected(client, query):
+    resp, _ = get_json(client, f'/api/tasks?{query}')
+    assert resp.status_code == 400
+
+
+@pytest.mark.parametrize('query', ['', '?limit=5'])
+def test_streamed_listing_returns_its_connection_once(momcare, client, tasks, query):
+    get_json(client, '/api/tasks')  # warm the pool
+    before = momcare.db_pool.stats()
+    for _ in range(3):
+        get_json(client, f'/api/tasks{query}')
+    after = momcare.db_pool.stats()
+    assert after['double_releases'] == before['double_releases']
+    assert after['idle'] == before['idle'] == after['open']
+    assert len(set(map(id, momcare.db_pool._idle))) == len(momcare.db_pool._idle)
+
+
+def test_completed_tasks_from_past_days_are_hidden(client, db_path):
+    today = date.today()
+    rows = [
+        ('done yesterday', today - timedelta(days=1), 1),
+        ('pending yesterday', today - timedelta(days=1), 0),
+        ('done today', today, 1),
+        ('done undated', None, 1),
+    ]
+    conn = sqlite3.connect(db_path)
+    for title, task_date, completed in rows:
+        conn.execute('INSERT INTO tasks (user_email, title, task_date, completed) VALUES (?, ?, ?, ?)',
+                     (USER_EMAIL, title, task_date and task_date.isoformat(), completed))
+    conn.commit()
+    conn.close()
+
+    _, body = get_json(client, '/api/tasks')
+    assert sorted(t['title'] for t in body) == ['done today', 'done undated', 'pending yesterday']
+    _, body = get_json(client, f'/api/tasks?to={today - timedelta(days=1)}&completed=1')
+    assert body == []
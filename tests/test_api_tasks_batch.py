@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+
+DAY = '2026-01-05'
+
+
+def task_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('SELECT id, title, start_time FROM tasks ORDER BY id').fetchall()
+    finally:
+        conn.close()
+
+
+def batch(client, *ops):
+    resp = client.post('/api/tasks/batch', json={'ops': list(ops)})
+    return resp.status_code, resp.get_json()
+
+
+def create(title, start_time, duration=1):
+    return {'op': 'create', 'title': title, 'task_date': DAY, 'start_time': start_time, 'duration': duration}
+
+
+def test_creates_updates_and_deletes_apply_together(client, db_path):
+    status, body = batch(client, create('walk', 9), create('nap', 13))
+    assert status == 200
+    walk, nap = (r['id'] for r in body['results'])
+
+    # Swapping two slots only works because overlaps are checked on the final state
+    status, body = batch(
+        client,
+        {'op': 'update', 'id': walk, 'start_time': 13},
+        {'op': 'update', 'id': nap, 'start_time': 9},
+        create('lunch', 12),
+    )
+    assert status == 200
+    assert [(t, s) for _, t, s in task_rows(db_path)] == [('walk', 13), ('nap', 9), ('lunch', 12)]
+
+    status, _ = batch(client, {'op': 'delete', 'id': walk})
+    assert status == 200
+    assert [t for _, t, _ in task_rows(db_path)] == ['nap', 'lunch']
+
+
+@pytest.mark.parametrize('op, message', [
+    ({'op': 'create', 'title': 5}, 'title must be a string'),
+    ({'op': 'create', 'title': ['walk']}, 'title must be a string'),
+    ({'op': 'create', 'title': 'walk', 'start_time': {'h': 9}}, 'start_time must be a number of hours'),
+    ({'op': 'create', 'title': 'walk', 'start_time': '9am'}, 'start_time must be a number of hours'),
+    ({'op': 'create', 'title': 'walk', 'start_time': 'nan'}, 'start_time must be a number of hours'),
+    ({'op': 'create', 'title': 'walk', 'duration': '1h'}, 'duration must be a number of hours'),
+    ({'op': 'create', 'title': 'walk', 'duration': True}, 'duration must be a number of hours'),
+    ({'op': 'create', 'title': 'walk', 'color': 3}, 'color must be a string'),
+    ({'op': 'create', 'title': 'walk', 'task_date': 20260105}, 'task_date must be a string'),
+    ({'op': 'create', 'title': '  '}, 'title required'),
+    ({'op': 'update', 'id': '1'}, 'id required'),
+    ({'op': 'rename'}, 'op must be create, update or delete'),
+])
+def test_malformed_ops_are_400_and_nothing_is_written(client, db_path, op, message):
+    status, body = batch(client, create('walk', 9), op)
+    assert status == 400
+    assert body['results'][1]['error'] == message
+    assert body['results'][0]['id'] is None
+    assert task_rows(db_path) == []
+
+
+def test_failed_op_rolls_back_the_whole_batch(client, db_path):
+    status, body = batch(client, create('walk', 9))
+    walk = body['results'][0]['id']
+
+    status, body = batch(client, create('lunch', 12), {'op': 'delete', 'id': walk}, {'op': 'update', 'id': 999, 'title': 'x'})
+    assert status == 404
+    assert [r['ok'] for r in body['results']] == [True, True, False]
+
+    status, body = batch(client, create('lunch', 12), create('call', 12.5))
+    assert status == 409
+    assert body['results'][1]['conflicts']
+
+    assert [t for _, t, _ in task_rows(db_path)] == ['walk']
+
+
+def test_numeric_strings_are_stored_as_numbers(client, db_path):
+    status, body = batch(client, {'op': 'create', 'title': 'walk', 'task_date': DAY, 'start_time': '9.5', 'duration': '1'})
+    assert status == 200
+    conn = sqlite3.connect(db_path)
+    row = conn.execute('SELECT typeof(start_time), start_time, typeof(duration) FROM tasks').fetchone()
+    conn.close()
+    assert row == ('real', 9.5, 'real')
+    # And the day stays checkable afterwards
+    assert client.post('/api/tasks', json={'title': 'nap', 'task_date': DAY, 'start_time': 10, 'duration': 1}).status_code == 409
@@ -0,0 +1,46 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import bench_routes  # noqa: E402
+
+
+def run_bench(monkeypatch, *args):
+    monkeypatch.setattr(sys, 'argv', ['bench_routes.py', '--users', '2', '--months', '1', '--requests', '3', '--warmup', '1', *args])
+    with pytest.raises(SystemExit) as exit_info:
+        bench_routes.main()
+    return exit_info.value.code
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert [bench_routes.percentile(values, p) for p in (50, 95, 99, 100)] == [50, 95, 99, 100]
+    assert bench_routes.percentile([7], 99) == 7
+    assert bench_routes.percentile([], 50) == 0.0
+
+
+def test_compare_flags_slower_targets(capsys):
+    baseline = {'results': {'/a': {'p50_ms': 10, 'p95_ms': 20}, '/b': {'p50_ms': 10, 'p95_ms': 20}}}
+    now = {'/a': {'p50_ms': 11, 'p95_ms': 21}, '/b': {'p50_ms': 10, 'p95_ms': 30}, '/new': {'p50_ms': 1, 'p95_ms': 1}}
+    assert bench_routes.compare(now, baseline, 1.2) == ['/b']
+
+
+def test_seeded_run_writes_results_and_detects_regressions(momcare, monkeypatch, tmp_path):
+    monkeypatch.setenv('MOMCARE_MOOD_CACHE_TTL', '60')
+    out = tmp_path / 'run.json'
+    assert run_bench(monkeypatch, '--out', str(out)) == 0
+    report = json.loads(out.read_text())
+    targets = set(bench_routes.ROUTES) | {f'scan:{s.name}' for s in momcare.BACKGROUND_SCHEDULERS}
+    assert set(report['results']) == targets
+    assert all(r['errors'] == 0 and r['requests'] == 3 for r in report['results'].values())
+    # Every response was closed, so no pooled connection is left on this thread
+    assert getattr(momcare.db_pool._local, 'conn', None) is None
+
+    for result in report['results'].values():
+        result['p50_ms'] = result['p95_ms'] = 1e-6
+    out.write_text(json.dumps(report))
+    assert run_bench(monkeypatch, '--compare', str(out)) == 1
@@ -0,0 +1,63 @@
+import time
+
+from cache import TTLCache
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: clock[0])
+    cache = TTLCache(ttl=60)
+    cache.set('k', 'v')
+    clock[0] += 59
+    assert cache.get('k') == 'v'
+    clock[0] += 1
+    assert cache.get('k') is None
+    assert cache.stats()['size'] == 0
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1, None, 3)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_pop_counts_only_real_invalidations():
+    cache = TTLCache()
+    cache.set('a', 1)
+    cache.pop('a')
+    cache.pop('a')
+    assert cache.get('a') is None
+    assert cache.stats()['invalidations'] == 1
+
+
+def mood_widget(client):
+    return client.get('/api/dashboard/summary').get_json()['mood_data']
+
+
+def test_mood_widget_is_cached_until_a_write(momcare, client):
+    assert mood_widget(client)['mood'] == 'Neutral'
+    hits = momcare.mood_cache.stats()['hits']
+    assert mood_widget(client)['mood'] == 'Neutral'
+    assert momcare.mood_cache.stats()['hits'] == hits + 1
+
+    assert client.post('/update_mood', data={'mood': 'Happy'}).get_json()['success']
+    assert mood_widget(client)['mood'] == 'Happy'
+
+    resp = client.post('/update_wellness', json={'metric': 'sleep', 'value': '8 hrs'})
+    assert resp.get_json()['success']
+    assert mood_widget(client)['sleep'] == '8 hrs'
+
+
+def test_cache_is_per_user(momcare, client):
+    mood_widget(client)
+    other = momcare.app.test_client()
+    with other.session_transaction() as sess:
+        sess['user_email'] = 'someone@else.com'
+    assert mood_widget(other)['mood'] == 'Neutral'
+    client.post('/update_mood', data={'mood': 'Tired'})
+    assert mood_widget(other)['mood'] == 'Neutral'
+    assert mood_widget(client)['mood'] == 'Tired'
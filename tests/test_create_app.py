@@ -0,0 +1,62 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+from migrations import MIGRATIONS, current_version
+
+
+def test_import_has_no_side_effects(tmp_path):
+    db = tmp_path / 'never.db'
+    code = ('import threading, app; '
+            'assert threading.active_count() == 1, threading.enumerate(); '
+            'assert app.background_workers_thread is None')
+    env = dict(os.environ, MOMCARE_DB_PATH=str(db), MOMCARE_BACKGROUND_WORKERS='auto', MOMCARE_SLOW_QUERY_LOG=str(tmp_path / 'logs' / 'slow.log'))
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert not db.exists()
+    assert not (tmp_path / 'logs').exists()
+
+
+def test_factory_migrates_the_configured_database(momcare, tmp_path):
+    other = tmp_path / 'other.db'
+    log = tmp_path / 'logs' / 'slow.log'
+    assert momcare.create_app({'DB_PATH': other, 'BACKGROUND_WORKERS': False, 'SLOW_QUERY_LOG': str(log)}) is momcare.app
+    assert momcare.db_pool.db_path == other
+    assert momcare.app.config['SLOW_QUERY_LOG'] == str(log)
+    assert log.parent.is_dir()
+    conn = sqlite3.connect(other)
+    assert current_version(conn) == MIGRATIONS[-1][0]
+    conn.close()
+    momcare.sql_tracer.set_log_path(None)
+
+
+def test_check_schema_off_leaves_the_database_alone(momcare, tmp_path):
+    other = tmp_path / 'untouched.db'
+    momcare.create_app({'DB_PATH': other, 'CHECK_SCHEMA': False, 'BACKGROUND_WORKERS': False, 'SLOW_QUERY_LOG': None})
+    assert not other.exists()
+
+
+@pytest.fixture
+def workers(momcare, monkeypatch):
+    monkeypatch.setattr(momcare, 'WORKER_POLL_SECONDS', 0.05)
+    yield
+    thread = momcare.background_workers_thread
+    momcare.background_stop.set()
+    if thread is not None:
+        thread.join(timeout=10)
+    momcare.background_stop.clear()
+    momcare.background_workers_thread = None
+    assert thread is None or not thread.is_alive()
+
+
+def test_background_workers_start_once(momcare, db_path, workers):
+    config = {'DB_PATH': db_path, 'BACKGROUND_WORKERS': True, 'SLOW_QUERY_LOG': None}
+    momcare.create_app(config)
+    thread = momcare.background_workers_thread
+    assert thread is not None and thread.is_alive()
+    momcare.create_app(config)
+    assert momcare.background_workers_thread is thread
@@ -0,0 +1,73 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import USER_EMAIL
+
+
+@pytest.fixture
+def seeded(db_path, momcare):
+    now = datetime.now()
+    today, month = now.strftime('%Y-%m-%d'), now.strftime('%Y-%m')
+    yesterday = (now - timedelta(days=1)).strftime('%Y-%m-%d')
+    conn = sqlite3.connect(db_path)
+    rows = {
+        'monthly_budgets (user_email, month_iso, income, budget_limit)': [(USER_EMAIL, month, 3000, 200)],
+        'spending_categories (user_email, name, color)': [(USER_EMAIL, 'Food', '#fff')],
+        'expenses (user_email, month_iso, category, amount, expense_date)': [
+            (USER_EMAIL, month, 'Food', 100, today),
+            (USER_EMAIL, month, 'Food', 20, yesterday),
+            (USER_EMAIL, month, 'Mystery', 5, today),  # not a known category: counted as Others
+            ('someone@else.com', month, 'Food', 999, today),
+        ],
+        'grocery_items (user_email, item_name, estimated_cost, is_checked, month_iso, purchased_on)': [
+            (USER_EMAIL, 'Milk', 30, 1, month, today),
+            (USER_EMAIL, 'Eggs', 50, 0, month, None),
+        ],
+        'tasks (user_email, title, task_date, start_time, duration, completed)': [
+            (USER_EMAIL, 'walk', today, 9, 1, 1),
+            (USER_EMAIL, 'nap', today, 13, 1, 0),
+            (USER_EMAIL, 'late', yesterday, 10, 1, 0),
+        ],
+        'reminder_items (user_email, title, remind_at)': [
+            (USER_EMAIL, 'pills', f'{today}T23:59'),
+            (USER_EMAIL, 'far off', (now + timedelta(days=10)).strftime('%Y-%m-%dT09:00')),
+        ],
+        'daily_moods (user_email, date, mood, mood_score)': [(USER_EMAIL, today, 'Happy', 3)],
+    }
+    for table, values in rows.items():
+        marks = ', '.join('?' * len(values[0]))
+        conn.executemany(f'INSERT INTO {table} VALUES ({marks})', values)
+    conn.commit()
+    conn.close()
+    return month
+
+
+def test_summary_widgets(client, seeded):
+    resp = client.get(f'/api/dashboard/summary?month={seeded}')
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert [t['title'] for t in body['tasks']] == ['walk', 'nap']
+    assert (body['pending_count'], body['progress_percentage'], body['overdue_count']) == (1, 50, 1)
+    assert body['total_spent_today'] == 135
+    assert body['total_spent_month'] == 155
+    assert body['remaining_budget'] == 45
+    assert body['budget_color'] == 'orange'
+    assert body['top_expense_category'] == 'Food (₱120.00)'
+    assert [r['title'] for r in body['upcoming_reminders']] == ['pills']
+    assert body['mood_data']['mood'] == 'Happy'
+
+
+def test_summary_takes_two_queries(momcare, client, seeded, monkeypatch):
+    seen = []
+    monkeypatch.setattr(momcare.db_pool, 'on_query', lambda sql, seconds, rows: seen.append(sql))
+    assert client.get('/api/dashboard/summary').status_code == 200
+    assert seen == [momcare.DASHBOARD_SCALARS_SQL, momcare.DASHBOARD_LISTS_SQL]
+
+
+def test_empty_month_and_login_required(momcare, client):
+    body = client.get('/api/dashboard/summary?month=1999-01').get_json()
+    assert (body['month_iso'], body['total_spent_month'], body['tasks']) == ('1999-01', 0, [])
+    assert body['top_expense_category'] == 'None'
+    assert momcare.app.test_client().get('/api/dashboard/summary').status_code == 401
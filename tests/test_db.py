@@ -0,0 +1,95 @@
+import threading
+
+import pytest
+
+from db import ConnectionPool, PoolExhausted
+
+
+@pytest.fixture
+def pool(db_path):
+    pool = ConnectionPool(db_path, max_connections=2, acquire_timeout=0.2)
+    yield pool
+    pool.close_all()
+
+
+def acquire_in_thread(pool):
+    box = []
+    thread = threading.Thread(target=lambda: box.append(pool.acquire()))
+    thread.start()
+    thread.join()
+    return box[0]
+
+
+def test_nested_acquire_returns_the_threads_connection(pool):
+    outer = pool.acquire()
+    inner = pool.acquire()
+    assert inner is outer
+    inner.close()
+    assert pool.stats()['idle'] == 0  # still held by the outer caller
+    outer.close()
+    assert pool.stats()['idle'] == 1
+
+
+def test_released_connection_is_reused(pool):
+    first = pool.acquire()
+    first.close()
+    assert pool.acquire() is first
+    assert pool.stats()['opened'] == 1
+
+
+def test_double_release_is_a_noop(pool):
+    conn = pool.acquire()
+    pool.release(conn)
+    pool.release(conn)
+    stats = pool.stats()
+    assert stats['idle'] == 1
+    assert stats['double_releases'] == 1
+    # Two threads must never be handed the same connection
+    assert acquire_in_thread(pool) is not acquire_in_thread(pool)
+
+
+def test_release_rolls_back_uncommitted_work(pool):
+    conn = pool.acquire()
+    conn.execute('CREATE TABLE t (x)')
+    conn.commit()
+    conn.execute('INSERT INTO t VALUES (1)')
+    conn.close()
+    conn = pool.acquire()
+    assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+
+
+def test_close_of_pinned_connection_keeps_the_transaction(pool):
+    conn = pool.acquire()
+    conn.execute('CREATE TABLE t (x)')
+    conn.commit()
+    conn._pinned = True
+    conn.execute('INSERT INTO t VALUES (1)')
+    conn.close()
+    assert conn.in_transaction
+    conn.execute('INSERT INTO t VALUES (2)')
+    conn.commit()
+    # The owner's release (app teardown) is what returns it to the pool
+    assert pool.stats()['idle'] == 0
+    conn._pinned = False
+    pool.release(conn)
+    assert pool.stats()['idle'] == 1
+    assert pool.acquire().execute('SELECT COUNT(*) FROM t').fetchone()[0] == 2
+
+
+def test_acquire_times_out_when_exhausted(pool):
+    acquire_in_thread(pool)
+    acquire_in_thread(pool)
+    with pytest.raises(PoolExhausted):
+        pool.acquire()
+
+
+def test_on_query_reports_rows_after_fetch(db_path):
+    seen = []
+    pool = ConnectionPool(db_path, on_query=lambda sql, seconds, rows: seen.append((sql, rows)))
+    conn = pool.acquire()
+    conn.execute('CREATE TABLE t (x)')
+    conn.executemany('INSERT INTO t VALUES (?)', [(1,), (2,), (3,)])
+    assert [r['x'] for r in conn.execute('SELECT x FROM t').fetchall()] == [1, 2, 3]
+    conn.close()
+    pool.close_all()
+    assert seen == [('CREATE TABLE t (x)', 0), ('INSERT INTO t VALUES (?)', 3), ('SELECT x FROM t', 3)]
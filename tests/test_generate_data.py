@@ -0,0 +1,85 @@
+import sqlite3
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import generate_data  # noqa: E402
+from migrations import MIGRATIONS, current_version, run_migrations  # noqa: E402
+from moods import MOOD_SCORES  # noqa: E402
+
+TODAY = date(2026, 1, 15)
+TABLES = ('users', 'monthly_budgets', 'expenses', 'grocery_items', 'daily_moods', 'daily_wellness', 'tasks', 'reminder_items')
+
+
+def options(path, *extra):
+    return generate_data.build_parser().parse_args([str(path), '--users', '5', '--days', '30', '--seed', '3', '--batch-size', '50', *extra])
+
+
+def generate(path, *extra):
+    opts = options(path, *extra)
+    conn = sqlite3.connect(path)
+    if opts.legacy_groceries:
+        generate_data.create_legacy_schema(conn, opts.legacy_groceries)
+    else:
+        run_migrations(conn)
+    counts = generate_data.generate(conn, opts, today=TODAY, log=lambda *a: None)
+    return conn, counts
+
+
+def dump(conn):
+    return {table: conn.execute(f'SELECT * FROM {table} ORDER BY id').fetchall() for table in TABLES}
+
+
+@pytest.fixture
+def generated(db_path):
+    conn, counts = generate(db_path)
+    yield conn, counts
+    conn.close()
+
+
+def test_moods_use_the_app_vocabulary(generated):
+    conn, counts = generated
+    assert counts['daily_moods']
+    pairs = set(conn.execute('SELECT mood, mood_score FROM daily_moods'))
+    assert pairs <= set(MOOD_SCORES.items())
+
+
+def test_same_seed_same_rows(generated, tmp_path):
+    conn, counts = generated
+    other, other_counts = generate(tmp_path / 'again.db')
+    assert other_counts == counts
+    assert dump(other) == dump(conn)
+    other.close()
+    different, _ = generate(tmp_path / 'seed4.db', '--seed', '4')
+    assert dump(different) != dump(conn)
+    different.close()
+
+
+def test_counts_and_derived_columns(generated):
+    conn, counts = generated
+    assert counts['users'] == 5
+    for table, n in counts.items():
+        assert conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] == n
+    # Columns the app fills on write are filled here too
+    assert conn.execute("SELECT COUNT(*) FROM users WHERE height != '' AND height_m IS NULL").fetchone()[0] == 0
+    assert conn.execute('SELECT COUNT(*) FROM grocery_items WHERE is_checked = 1 AND purchased_on IS NULL').fetchone()[0] == 0
+    assert conn.execute('SELECT COUNT(*) FROM reminder_items WHERE remind_at_epoch IS NULL').fetchone()[0] == 0
+    # Some past tasks are left pending, and the spend rollup matches the rows
+    assert conn.execute('SELECT COUNT(*) FROM tasks WHERE completed = 0 AND task_date < ?', (TODAY.isoformat(),)).fetchone()[0] > 0
+    rollup = conn.execute('SELECT ROUND(SUM(total), 2) FROM monthly_spend_rollup').fetchone()[0]
+    spent = conn.execute('SELECT ROUND((SELECT SUM(amount) FROM expenses) + '
+                         '(SELECT SUM(estimated_cost) FROM grocery_items WHERE is_checked = 1), 2)').fetchone()[0]
+    assert rollup == spent
+
+
+@pytest.mark.parametrize('layout', ['old', 'month_str'])
+def test_legacy_groceries_migrate_to_the_current_schema(db_path, layout):
+    conn, counts = generate(db_path, '--legacy-groceries', layout)
+    assert current_version(conn) == 0
+    assert run_migrations(conn) == MIGRATIONS[-1][0]
+    assert conn.execute('SELECT COUNT(*) FROM grocery_items WHERE month_iso IS NOT NULL').fetchone()[0] == counts['grocery_items']
+    conn.close()
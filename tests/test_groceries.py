@@ -0,0 +1,79 @@
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+import migrations
+from migrations import MIGRATIONS, run_migrations
+
+TODAY = date.today().isoformat()
+YESTERDAY = (date.today() - timedelta(days=1)).isoformat()
+
+
+def purchased_on(db_path, item_id):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('SELECT purchased_on FROM grocery_items WHERE id = ?', (item_id,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def add(client, **fields):
+    resp = client.post('/api/groceries', json={'item_name': 'Milk', 'estimated_cost': 40, **fields})
+    assert resp.status_code == 201
+    return resp.get_json()['id']
+
+
+def test_purchase_date_follows_the_checkbox(client, db_path):
+    checked, unchecked = add(client, is_checked=True), add(client)
+    assert (purchased_on(db_path, checked), purchased_on(db_path, unchecked)) == (TODAY, None)
+
+    client.put(f'/api/groceries/{unchecked}', json={'is_checked': True})
+    assert purchased_on(db_path, unchecked) == TODAY
+    client.put(f'/api/groceries/{unchecked}', json={'is_checked': False})
+    assert purchased_on(db_path, unchecked) is None
+
+
+def test_rechecking_keeps_the_original_purchase_date(client, db_path):
+    item = add(client, is_checked=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute('UPDATE grocery_items SET purchased_on = ? WHERE id = ?', (YESTERDAY, item))
+    conn.commit()
+    conn.close()
+    client.put(f'/api/groceries/{item}', json={'is_checked': True, 'quantity': 2})
+    assert purchased_on(db_path, item) == YESTERDAY
+
+
+def test_spent_today_counts_todays_purchases_only(client, db_path):
+    add(client, is_checked=True, estimated_cost=12.5)
+    add(client, estimated_cost=99)
+    old = add(client, is_checked=True, estimated_cost=7)
+    conn = sqlite3.connect(db_path)
+    conn.execute('UPDATE grocery_items SET purchased_on = ? WHERE id = ?', (YESTERDAY, old))
+    conn.commit()
+    conn.close()
+    assert client.get('/api/dashboard/summary').get_json()['total_spent_today'] == 12.5
+
+
+def test_migration_backfills_checked_items_from_created_at(db_path, monkeypatch):
+    conn = sqlite3.connect(db_path)
+    monkeypatch.setattr(migrations, 'MIGRATIONS', [m for m in MIGRATIONS if m[0] < 7])
+    run_migrations(conn)
+    conn.executemany('INSERT INTO grocery_items (user_email, item_name, is_checked, created_at) VALUES (?, ?, ?, ?)',
+                     [('a@x', 'Milk', 1, '2026-01-05T10:00:00'), ('a@x', 'Eggs', 0, '2026-01-05T10:00:00'), ('a@x', 'Rice', 1, None)])
+    conn.commit()
+    monkeypatch.setattr(migrations, 'MIGRATIONS', MIGRATIONS)
+    run_migrations(conn)
+    rows = conn.execute('SELECT item_name, purchased_on FROM grocery_items ORDER BY id').fetchall()
+    conn.close()
+    assert rows == [('Milk', '2026-01-05'), ('Eggs', None), ('Rice', None)]
+
+
+@pytest.mark.parametrize('payload', [{'is_checked': True}, {'is_checked': False}])
+def test_other_users_items_are_untouched(client, db_path, payload):
+    conn = sqlite3.connect(db_path)
+    item = conn.execute("INSERT INTO grocery_items (user_email, item_name) VALUES ('someone@else.com', 'Milk')").lastrowid
+    conn.commit()
+    conn.close()
+    assert client.put(f'/api/groceries/{item}', json=payload).status_code == 404
+    assert purchased_on(db_path, item) is None
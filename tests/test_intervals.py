@@ -0,0 +1,105 @@
+import random
+import sqlite3
+
+import pytest
+
+from conftest import USER_EMAIL
+from intervals import DaySchedule, overlap_error
+
+
+def brute_conflicts(intervals, start, duration):
+    end = start + duration
+    hits = [(s, i) for i, s, d in intervals if d and d > 0 and s < end and s + d > start]
+    return [i for _, i in sorted(hits)]
+
+
+def brute_next_free(intervals, start, duration, step=0.25):
+    candidate = start
+    while candidate + duration <= 24:
+        if not brute_conflicts(intervals, candidate, duration):
+            return candidate
+        candidate += step
+    return None
+
+
+def test_touching_intervals_do_not_overlap():
+    schedule = DaySchedule([(1, 9, 1), (2, 11, 1)])
+    assert schedule.conflicts(10, 1) == []
+    assert schedule.conflicts(9.5, 2) == [1, 2]
+
+
+def test_zero_and_missing_durations_are_ignored():
+    schedule = DaySchedule([(1, 9, 0), (2, 9, None), (3, 12, 1)])
+    assert schedule.conflicts(8, 3) == []
+
+
+def test_long_task_found_behind_short_ones():
+    # The running max of end times must reach back past the short tasks
+    schedule = DaySchedule([(1, 6, 10), (2, 7, 0.5), (3, 8, 0.5), (4, 9, 0.5)])
+    assert schedule.conflicts(15, 0.5) == [1]
+
+
+def test_next_free_slot_skips_merged_blocks():
+    schedule = DaySchedule([(1, 9, 1), (2, 9.5, 1), (3, 11, 0.5), (4, 13, 1)])
+    assert schedule.next_free_slot(9, 0.5) == 10.5
+    assert schedule.next_free_slot(9, 1) == 11.5
+    assert schedule.next_free_slot(9, 2) == 14
+    assert schedule.next_free_slot(22, 3) is None
+
+
+def test_overlap_error():
+    schedule = DaySchedule([(1, 9, 1)])
+    assert overlap_error(schedule, 10, 1) is None
+    assert overlap_error(schedule, 9.5, 1) == {'conflicts': [1], 'next_free_slot': 10}
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_brute_force(seed):
+    rng = random.Random(seed)
+    quarter = lambda lo, hi: rng.randint(int(lo * 4), int(hi * 4)) / 4  # noqa: E731
+    for _ in range(200):
+        intervals = [(i, quarter(0, 23), quarter(0, 3)) for i in range(rng.randint(0, 12))]
+        schedule = DaySchedule(intervals)
+        start, duration = quarter(0, 23), quarter(0.25, 3)
+        # Ties on start time may come back in either order
+        assert sorted(schedule.conflicts(start, duration)) == sorted(brute_conflicts(intervals, start, duration))
+        assert schedule.next_free_slot(start, duration) == brute_next_free(intervals, start, duration)
+
+
+def test_task_endpoints_reject_overlaps(client):
+    slot = {'task_date': '2026-01-05', 'start_time': 9, 'duration': 1}
+    first = client.post('/api/tasks', json={'title': 'walk', **slot})
+    assert first.status_code == 201
+    clash = client.post('/api/tasks', json={'title': 'nap', **slot, 'start_time': 9.5})
+    assert clash.status_code == 409
+    assert clash.get_json()['conflicts'] == [first.get_json()['id']]
+    assert clash.get_json()['next_free_slot'] == 10
+
+    # Moving a task within its own slot doesn't conflict with itself
+    task_id = first.get_json()['id']
+    assert client.put(f'/api/tasks/{task_id}', json={'start_time': 9.5}).status_code == 200
+
+
+@pytest.mark.parametrize('field, value', [('start_time', '9am'), ('duration', '1h'), ('start_time', [9])])
+def test_task_endpoints_reject_unparseable_times(client, db_path, field, value):
+    slot = {'title': 'walk', 'task_date': '2026-01-05', 'start_time': 9, 'duration': 1}
+    assert client.post('/api/tasks', json={**slot, field: value}).status_code == 400
+    task_id = client.post('/api/tasks', json=slot).get_json()['id']
+    assert client.put(f'/api/tasks/{task_id}', json={field: value}).status_code == 400
+
+    resp = client.post('/tasks/add', data={**slot, field: value})
+    assert resp.status_code == 302
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT COUNT(*) FROM tasks').fetchone()[0] == 1
+    conn.close()
+
+
+def test_legacy_text_times_do_not_break_the_day(client, db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO tasks (user_email, title, task_date, start_time, duration) VALUES (?, 'old', '2026-01-05', '9am', '1h')",
+                 (USER_EMAIL,))
+    conn.commit()
+    conn.close()
+    slot = {'task_date': '2026-01-05', 'start_time': 9, 'duration': 1}
+    assert client.post('/api/tasks', json={'title': 'walk', **slot}).status_code == 201
+    assert client.post('/api/tasks', json={'title': 'nap', **slot}).status_code == 409
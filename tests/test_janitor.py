@@ -0,0 +1,91 @@
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from conftest import USER_EMAIL
+from db import ConnectionPool
+from janitor import Janitor
+from migrations import run_migrations
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def pool(db_path):
+    conn = sqlite3.connect(db_path)
+    run_migrations(conn)
+    conn.close()
+    pool = ConnectionPool(db_path)
+    yield pool
+    pool.close_all()
+
+
+def add_tasks(pool, rows):
+    conn = pool.acquire()
+    conn.executemany('INSERT INTO tasks (user_email, title, task_date, completed) VALUES (?, ?, ?, ?)',
+                     [(USER_EMAIL, title, day.isoformat(), done) for title, day, done in rows])
+    conn.commit()
+    conn.close()
+
+
+def titles(pool, sql='SELECT title FROM tasks ORDER BY title'):
+    conn = pool.acquire()
+    try:
+        return [r[0] for r in conn.execute(sql)]
+    finally:
+        conn.close()
+
+
+def test_purges_completed_past_tasks_in_batches(pool):
+    old = TODAY - timedelta(days=3)
+    add_tasks(pool, [(f'done {i}', old, 1) for i in range(7)] + [
+        ('pending old', old, 0),
+        ('done today', TODAY, 1),
+        ('done tomorrow', TODAY + timedelta(days=1), 1),
+    ])
+    janitor = Janitor(pool.acquire, batch_size=3)
+    assert janitor.run_once() == {'tasks': 7, 'tombstones': 0}
+    assert titles(pool) == ['done today', 'done tomorrow', 'pending old']
+
+    stats = janitor.stats()
+    assert stats['runs'] == 1
+    assert stats['purged_total'] == {'tasks': 7, 'tombstones': 0}
+    assert janitor.run_once() == {'tasks': 0, 'tombstones': 0}
+    assert janitor.stats()['purged_total']['tasks'] == 7
+
+
+def test_prunes_old_tombstones_and_advances_the_prune_point(pool):
+    add_tasks(pool, [('a', TODAY, 0), ('b', TODAY, 0)])
+    conn = pool.acquire()
+    conn.execute('DELETE FROM tasks')
+    versions = [r[0] for r in conn.execute('SELECT version FROM sync_tombstones ORDER BY version')]
+    long_ago = (datetime.utcnow() - timedelta(days=40)).strftime('%Y-%m-%dT%H:%M:%S')
+    conn.execute('UPDATE sync_tombstones SET deleted_at = ? WHERE version = ?', (long_ago, versions[0]))
+    conn.commit()
+    conn.close()
+
+    assert Janitor(pool.acquire, tombstone_days=30).run_once()['tombstones'] == 1
+    assert titles(pool, 'SELECT version FROM sync_tombstones') == versions[1:]
+    assert titles(pool, 'SELECT tombstones_pruned_through FROM sync_clock') == [versions[0]]
+
+
+def test_due_once_per_day(pool):
+    janitor = Janitor(pool.acquire)
+    [(due, _)] = janitor._load(1)
+    assert due <= datetime.now().timestamp()
+    janitor.run_once()
+    [(due, _)] = janitor._load(1)
+    assert datetime.fromtimestamp(due) == datetime.combine(TODAY + timedelta(days=1), datetime.min.time())
+
+
+def test_pages_do_not_write(client, db_path, momcare, monkeypatch):
+    # The purge moved off the request path: listing tasks is read-only
+    writes = []
+    monkeypatch.setattr(momcare.db_pool, 'on_query',
+                        lambda sql, seconds, rows: writes.append(sql) if sql.lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE')) else None)
+    for url in ('/api/tasks', '/dashboard', '/tasks'):
+        resp = client.get(url)
+        assert resp.status_code == 200
+        resp.close()
+    assert writes == []
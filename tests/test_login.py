@@ -0,0 +1,39 @@
+import sqlite3
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from conftest import USER_EMAIL
+from outbox import CoalescingGate
+
+
+@pytest.fixture
+def user(db_path, momcare, monkeypatch):
+    monkeypatch.setattr(momcare, 'login_alerts', CoalescingGate(window=300, max_pending=2))
+    conn = sqlite3.connect(db_path)
+    conn.execute('INSERT INTO users (first, last, email, password_hash) VALUES (?, ?, ?, ?)',
+                 ('Ana', 'Cruz', USER_EMAIL, generate_password_hash('pw')))
+    conn.commit()
+    conn.close()
+
+
+def login_emails(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT to_email FROM email_outbox WHERE kind = 'login'").fetchall()
+    finally:
+        conn.close()
+
+
+def test_repeated_logins_queue_one_alert(momcare, db_path, user):
+    client = momcare.app.test_client()
+    for _ in range(3):
+        resp = client.post('/login', data={'email': USER_EMAIL, 'password': 'pw'})
+        assert resp.headers['Location'].endswith('/dashboard')
+    assert login_emails(db_path) == [(USER_EMAIL,)]
+    assert momcare.login_alert_stats()['coalesced'] == 2
+
+
+def test_wrong_password_queues_nothing(momcare, db_path, user):
+    momcare.app.test_client().post('/login', data={'email': USER_EMAIL, 'password': 'nope'})
+    assert login_emails(db_path) == []
@@ -0,0 +1,69 @@
+import socket
+
+import pytest
+
+from mailer import Mailer
+
+MAIL_ENV = ('MAIL_SERVER', 'MAIL_PORT', 'MAIL_USE_TLS', 'MAIL_DEFAULT_SENDER',
+            'SMTP_USERNAME', 'MAIL_USERNAME', 'SMTP_PASSWORD', 'MAIL_PASSWORD')
+
+
+@pytest.fixture
+def clean_env(monkeypatch):
+    for var in MAIL_ENV:
+        monkeypatch.delenv(var, raising=False)
+    return monkeypatch
+
+
+def local_mailer(server, **kwargs):
+    return Mailer(server.host, server.port, use_tls=False, sender='noreply@momcare.test', **kwargs)
+
+
+def test_from_env_has_no_default_credentials(clean_env):
+    mailer = Mailer.from_env()
+    assert (mailer.host, mailer.username, mailer.password) == ('', '', '')
+    assert not mailer.configured
+
+
+def test_credentials_default_the_server_to_gmail(clean_env):
+    clean_env.setenv('SMTP_USERNAME', 'mom@gmail.com')
+    clean_env.setenv('SMTP_PASSWORD', 'app-password')
+    mailer = Mailer.from_env()
+    assert mailer.host == 'smtp.gmail.com'
+    assert mailer.configured
+
+
+def test_server_without_credentials_is_configured(clean_env):
+    clean_env.setenv('MAIL_SERVER', 'localhost')
+    mailer = Mailer.from_env()
+    assert mailer.configured
+    assert mailer.username == ''
+
+
+@pytest.mark.parametrize('username', ['', 'mom@example.com'])
+def test_sends_without_login_when_server_has_no_auth(smtp_server, username):
+    mailer = local_mailer(smtp_server, username=username, password='secret' if username else '')
+    mailer.send('a@example.com', 'Hello', 'body')
+    mailer.close()
+    assert [m['to'] for m in smtp_server.messages] == [['a@example.com']]
+    assert 'Subject: Hello' in smtp_server.messages[0]['data']
+
+
+def test_sessions_are_reused_between_messages(smtp_server):
+    mailer = local_mailer(smtp_server)
+    for i in range(3):
+        mailer.send(f'{i}@example.com', 'Hi', 'body')
+    mailer.close()
+    assert len(smtp_server.messages) == 3
+    assert mailer.stats()['handshakes'] == 1
+    assert smtp_server.sessions == 1
+
+
+def test_dropped_pooled_session_is_replaced(smtp_server):
+    mailer = local_mailer(smtp_server)
+    mailer.send('a@example.com', 'Hi', 'body')
+    mailer._idle[0][0].sock.shutdown(socket.SHUT_RDWR)  # connection dropped while the session sat idle
+    mailer.send('b@example.com', 'Hi', 'body')
+    mailer.close()
+    assert len(smtp_server.messages) == 2
+    assert mailer.stats()['reconnects'] == 1
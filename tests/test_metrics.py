@@ -0,0 +1,66 @@
+import pytest
+
+from metrics import RequestMetrics, render_stats
+
+
+@pytest.fixture
+def no_token(monkeypatch):
+    monkeypatch.delenv('MOMCARE_METRICS_TOKEN', raising=False)
+
+
+@pytest.mark.parametrize('path', ['/metrics', '/metrics/sql'])
+def test_without_token_only_loopback_may_scrape(momcare, no_token, path):
+    client = momcare.app.test_client()
+    assert client.get(path, environ_base={'REMOTE_ADDR': '127.0.0.1'}).status_code == 200
+    assert client.get(path, environ_base={'REMOTE_ADDR': '::1'}).status_code == 200
+    assert client.get(path, environ_base={'REMOTE_ADDR': '203.0.113.9'}).status_code == 401
+
+
+@pytest.mark.parametrize('path', ['/metrics', '/metrics/sql'])
+def test_token_is_required_when_set(momcare, monkeypatch, path):
+    monkeypatch.setenv('MOMCARE_METRICS_TOKEN', 's3cret')
+    client = momcare.app.test_client()
+    remote = {'REMOTE_ADDR': '203.0.113.9'}
+    assert client.get(path, environ_base=remote).status_code == 401
+    assert client.get(path, environ_base={'REMOTE_ADDR': '127.0.0.1'}).status_code == 401
+    assert client.get(path, environ_base=remote, headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get(path, environ_base=remote, headers={'Authorization': 'Bearer s3cret'}).status_code == 200
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = RequestMetrics()
+    for seconds in (0.004, 0.02, 0.02, 20):
+        metrics.observe('tasks', 'GET', 200, seconds, 3, 0.001, size=100)
+    metrics.observe('tasks', 'GET', 404, 0.001, 0, 0.0)
+    text = metrics.render()
+    assert 'momcare_requests_total{endpoint="tasks",method="GET",status="200"} 4' in text
+    assert 'momcare_requests_total{endpoint="tasks",method="GET",status="404"} 1' in text
+    assert 'momcare_request_duration_seconds_bucket{endpoint="tasks",method="GET",le="0.005"} 2' in text
+    assert 'momcare_request_duration_seconds_bucket{endpoint="tasks",method="GET",le="0.025"} 4' in text
+    assert 'momcare_request_duration_seconds_bucket{endpoint="tasks",method="GET",le="+Inf"} 5' in text
+    assert 'momcare_request_sql_queries_bucket{endpoint="tasks",method="GET",le="5"} 5' in text
+    # Only sized responses feed the size histogram
+    assert 'momcare_response_size_bytes_count{endpoint="tasks",method="GET"} 4' in text
+
+
+def test_render_stats_flattens_nested_dicts():
+    text = render_stats('momcare_x', 'X', [((('scheduler', 'a"b'),), {'runs': 2, 'ok': True, 'by_kind': {'login': 1}, 'name': 'n'})])
+    assert text.splitlines()[2:] == [
+        'momcare_x{scheduler="a\\"b",stat="by_kind",key="login"} 1',
+        'momcare_x{scheduler="a\\"b",stat="runs"} 2',
+    ]
+
+
+def test_requests_are_recorded_per_endpoint(momcare, client, no_token, monkeypatch):
+    monkeypatch.setattr(momcare, 'request_metrics', RequestMetrics())
+    client.get('/api/tasks').close()
+    client.get('/api/dashboard/summary')
+    client.get('/api/dashboard/summary')
+    text = momcare.app.test_client().get('/metrics').get_data(as_text=True)
+    assert 'momcare_requests_total{endpoint="api_get_tasks",method="GET",status="200"} 1' in text
+    assert 'momcare_requests_total{endpoint="api_dashboard_summary",method="GET",status="200"} 2' in text
+    # The summary takes two SQL statements
+    assert 'momcare_request_sql_queries_bucket{endpoint="api_dashboard_summary",method="GET",le="1"} 0' in text
+    assert 'momcare_request_sql_queries_bucket{endpoint="api_dashboard_summary",method="GET",le="2"} 2' in text
+    for family in ('momcare_db_pool', 'momcare_mood_cache', 'momcare_email_outbox', 'momcare_scheduler', 'momcare_janitor'):
+        assert f'# TYPE {family} gauge' in text
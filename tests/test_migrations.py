@@ -0,0 +1,190 @@
+import json
+import random
+import sqlite3
+
+import pytest
+
+import migrations
+from migrations import MIGRATIONS, current_version, run_migrations
+
+LATEST = MIGRATIONS[-1][0]
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path)
+    yield conn
+    conn.close()
+
+
+def columns(conn, table):
+    return {r[1] for r in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def test_fresh_database_reaches_latest_version(conn):
+    assert run_migrations(conn) == LATEST
+    assert current_version(conn) == LATEST
+    applied = [r[0] for r in conn.execute('SELECT version FROM schema_version ORDER BY version')]
+    assert applied == [v for v, _, _ in MIGRATIONS]
+
+
+def test_rerun_is_a_noop(conn):
+    run_migrations(conn)
+    changes = conn.total_changes
+    assert run_migrations(conn) == LATEST
+    assert conn.total_changes == changes
+
+
+def test_pre_versioning_database_is_upgraded(conn):
+    # Tables as an old install left them: no schema_version, missing columns,
+    # the legacy grocery layout
+    conn.executescript(
+        """
+        CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, user_email TEXT NOT NULL, title TEXT NOT NULL,
+                            start_time REAL, duration REAL, color TEXT, is_priority INTEGER DEFAULT 0,
+                            task_date TEXT, completed INTEGER DEFAULT 0, created_at TEXT);
+        INSERT INTO tasks (user_email, title, start_time, duration, task_date) VALUES ('a@x', 'walk', 9, 1, '2026-01-05');
+        CREATE TABLE grocery_items (id INTEGER PRIMARY KEY AUTOINCREMENT, user_email TEXT NOT NULL, item TEXT,
+                                    qty INTEGER, cost REAL, category TEXT, month_str TEXT, purchased INTEGER);
+        INSERT INTO grocery_items (user_email, item, qty, cost, category, month_str, purchased)
+            VALUES ('a@x', 'milk', 2, 3.5, 'Dairy', '2026-01', 1);
+        CREATE TABLE reminder_items (id INTEGER PRIMARY KEY AUTOINCREMENT, user_email TEXT NOT NULL, title TEXT,
+                                     message TEXT, remind_at TEXT, is_recurring INTEGER DEFAULT 0,
+                                     recurrence_rule TEXT, created_at TEXT, updated_at TEXT);
+        INSERT INTO reminder_items (user_email, title, remind_at) VALUES ('a@x', 'call', '2026-01-05T09:30');
+        """
+    )
+    assert run_migrations(conn) == LATEST
+
+    assert {'notified', 'version', 'updated_at'} <= columns(conn, 'tasks')
+    assert conn.execute('SELECT title, version FROM tasks').fetchone() == ('walk', 1)
+    grocery = conn.execute('SELECT item_name, quantity, estimated_cost, is_checked, month_iso FROM grocery_items').fetchone()
+    assert grocery == ('milk', 2, 3.5, 1, '2026-01')
+    epoch = conn.execute("SELECT CAST(strftime('%s', '2026-01-05T09:30', 'utc') AS INTEGER)").fetchone()[0]
+    assert conn.execute('SELECT email_sent, remind_at_epoch FROM reminder_items').fetchone() == (0, epoch)
+
+
+def test_sync_triggers_version_rows_and_record_deletes(conn):
+    run_migrations(conn)
+    clock = lambda: conn.execute('SELECT version FROM sync_clock').fetchone()[0]  # noqa: E731
+    start = clock()
+
+    conn.execute("INSERT INTO tasks (user_email, title) VALUES ('a@x', 'walk')")
+    task_id, created = conn.execute('SELECT id, version FROM tasks').fetchone()
+    assert created == clock() == start + 1
+
+    conn.execute('UPDATE tasks SET title = ? WHERE id = ?', ('run', task_id))
+    assert conn.execute('SELECT version FROM tasks').fetchone()[0] == clock() == start + 2
+
+    conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+    tombstone = conn.execute('SELECT entity, row_id, user_email, version FROM sync_tombstones').fetchone()
+    assert tombstone == ('tasks', task_id, 'a@x', start + 3)
+
+
+def test_spend_rollup_follows_expense_writes(conn):
+    run_migrations(conn)
+    rollup = lambda: conn.execute(  # noqa: E731
+        'SELECT SUM(total) FROM monthly_spend_rollup WHERE user_email = ? AND month_iso = ?', ('a@x', '2026-01')
+    ).fetchone()[0] or 0
+    conn.execute("INSERT INTO expenses (user_email, month_iso, category, amount) VALUES ('a@x', '2026-01', 'Food', 10)")
+    conn.execute("INSERT INTO expenses (user_email, month_iso, category, amount) VALUES ('a@x', '2026-01', 'Food', 5)")
+    assert rollup() == 15
+    conn.execute("UPDATE expenses SET amount = 7 WHERE amount = 5")
+    assert rollup() == 17
+    conn.execute("DELETE FROM expenses WHERE amount = 10")
+    assert rollup() == 7
+
+
+SPEND_BY_GROUP_SQL = """
+    SELECT user_email, month_iso, category, ROUND(SUM(amount), 2), COUNT(*) FROM (
+        SELECT user_email, month_iso, COALESCE(category, '') AS category, amount FROM expenses
+        WHERE month_iso IS NOT NULL
+        UNION ALL
+        SELECT user_email, month_iso, COALESCE(NULLIF(category, ''), 'Groceries'), COALESCE(estimated_cost, 0)
+        FROM grocery_items WHERE is_checked = 1 AND month_iso IS NOT NULL
+    ) GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+"""
+ROLLUP_SQL = 'SELECT user_email, month_iso, category, ROUND(total, 2), item_count FROM monthly_spend_rollup ORDER BY 1, 2, 3'
+
+
+def random_spend_write(conn, rng):
+    user, month = rng.choice(('a@x', 'b@x')), rng.choice(('2026-01', '2026-02', None))
+    category = rng.choice(('Food', 'Bills', None, ''))
+    amount = rng.randint(1, 5000) / 100
+    table = rng.choice(('expenses', 'grocery_items'))
+    if table == 'expenses':
+        month = month or '2026-03'  # NOT NULL there
+    ids = [r[0] for r in conn.execute(f'SELECT id FROM {table}')]
+    op = rng.choice(('insert', 'insert', 'update', 'delete')) if ids else 'insert'
+    if table == 'expenses':
+        if op == 'insert':
+            conn.execute('INSERT INTO expenses (user_email, month_iso, category, amount) VALUES (?, ?, ?, ?)', (user, month, category, amount))
+        elif op == 'update':
+            column, value = rng.choice((('amount', amount), ('category', category), ('month_iso', month), ('user_email', user)))
+            conn.execute(f'UPDATE expenses SET {column} = ? WHERE id = ?', (value, rng.choice(ids)))
+        else:
+            conn.execute('DELETE FROM expenses WHERE id = ?', (rng.choice(ids),))
+    else:
+        if op == 'insert':
+            conn.execute('INSERT INTO grocery_items (user_email, item_name, month_iso, category, estimated_cost, is_checked) VALUES (?, ?, ?, ?, ?, ?)',
+                         (user, 'Milk', month, category, rng.choice((amount, None)), rng.randint(0, 1)))
+        elif op == 'update':
+            column, value = rng.choice((('estimated_cost', amount), ('is_checked', rng.randint(0, 1)), ('category', category), ('month_iso', month)))
+            conn.execute(f'UPDATE grocery_items SET {column} = ? WHERE id = ?', (value, rng.choice(ids)))
+        else:
+            conn.execute('DELETE FROM grocery_items WHERE id = ?', (rng.choice(ids),))
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_spend_rollup_matches_a_full_recount(conn, seed):
+    run_migrations(conn)
+    rng = random.Random(seed)
+    for _ in range(300):
+        random_spend_write(conn, rng)
+        if rng.random() < 0.1:
+            assert conn.execute(ROLLUP_SQL).fetchall() == conn.execute(SPEND_BY_GROUP_SQL).fetchall()
+    assert conn.execute(ROLLUP_SQL).fetchall() == conn.execute(SPEND_BY_GROUP_SQL).fetchall()
+    # Groups that empty out are removed, not left at zero
+    assert conn.execute('SELECT COUNT(*) FROM monthly_spend_rollup WHERE item_count <= 0').fetchone()[0] == 0
+
+
+def test_spend_rollup_is_backfilled_from_existing_rows(conn, monkeypatch):
+    monkeypatch.setattr(migrations, 'MIGRATIONS', [m for m in MIGRATIONS if m[0] < 6])
+    run_migrations(conn)
+    rng = random.Random(7)
+    for _ in range(100):
+        random_spend_write(conn, rng)
+    conn.commit()
+    monkeypatch.setattr(migrations, 'MIGRATIONS', MIGRATIONS)
+    run_migrations(conn)
+    assert conn.execute(ROLLUP_SQL).fetchall() == conn.execute(SPEND_BY_GROUP_SQL).fetchall()
+
+
+def write_users_json(path):
+    path.write_text(json.dumps([{'first': 'Ana', 'last': 'Cruz', 'email': 'ana@example.com', 'password_hash': 'x'}]))
+
+
+def test_users_json_is_imported_then_retired(conn, tmp_path):
+    write_users_json(tmp_path / 'users.json')
+    run_migrations(conn)
+    assert conn.execute('SELECT email FROM users').fetchall() == [('ana@example.com',)]
+    assert not (tmp_path / 'users.json').exists()
+    assert (tmp_path / 'users.json.bak').exists()
+
+
+def test_failed_migration_keeps_users_json_for_the_next_start(conn, tmp_path, monkeypatch):
+    write_users_json(tmp_path / 'users.json')
+
+    def broken(cur):
+        raise sqlite3.OperationalError('boom')
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', MIGRATIONS + [(LATEST + 1, 'broken', broken)])
+    with pytest.raises(sqlite3.OperationalError):
+        run_migrations(conn)
+    assert (tmp_path / 'users.json').exists()
+    assert current_version(conn) == 0
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', MIGRATIONS)
+    run_migrations(conn)
+    assert conn.execute('SELECT email FROM users').fetchall() == [('ana@example.com',)]
+    assert not (tmp_path / 'users.json').exists()
@@ -0,0 +1,120 @@
+import socket
+import sqlite3
+import time
+
+import pytest
+
+from db import ConnectionPool
+from mailer import Mailer
+from migrations import run_migrations
+from outbox import CoalescingGate, OutboxDispatcher, enqueue_email
+
+
+@pytest.fixture
+def pool(db_path):
+    conn = sqlite3.connect(db_path)
+    run_migrations(conn)
+    conn.close()
+    pool = ConnectionPool(db_path)
+    yield pool
+    pool.close_all()
+
+
+def queue(pool, count=1):
+    conn = pool.acquire()
+    cur = conn.cursor()
+    ids = [enqueue_email(cur, f'{i}@example.com', 'Reminder', 'body', kind='reminder') for i in range(count)]
+    conn.commit()
+    conn.close()
+    return ids
+
+
+def rows(pool):
+    conn = pool.acquire()
+    try:
+        return [dict(r) for r in conn.execute('SELECT id, status, attempts, next_attempt_at, last_error FROM email_outbox ORDER BY id')]
+    finally:
+        conn.close()
+
+
+def closed_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def test_batch_is_delivered_through_unauthenticated_server(pool, smtp_server):
+    mailer = Mailer(smtp_server.host, smtp_server.port, username='mom@example.com', password='secret', use_tls=False)
+    dispatcher = OutboxDispatcher(pool.acquire, mailer)
+    ids = queue(pool, 3)
+    dispatcher._dispatch(ids)
+    mailer.close()
+
+    assert [r['status'] for r in rows(pool)] == ['sent'] * 3
+    assert sorted(m['to'][0] for m in smtp_server.messages) == ['0@example.com', '1@example.com', '2@example.com']
+    assert dispatcher.stats()['sent_by_kind'] == {'reminder': 3}
+
+
+def test_load_returns_due_rows_in_order(pool):
+    dispatcher = OutboxDispatcher(pool.acquire, Mailer('', 0))
+    ids = queue(pool, 2)
+    assert [row_id for _, row_id in dispatcher._load(10)] == ids
+
+
+def test_failed_send_is_retried_with_backoff_then_parked(pool):
+    mailer = Mailer('127.0.0.1', closed_port(), use_tls=False, timeout=2)
+    dispatcher = OutboxDispatcher(pool.acquire, mailer, max_attempts=2, base_delay=60)
+    [row_id] = queue(pool)
+
+    dispatcher._dispatch([row_id])
+    [row] = rows(pool)
+    assert (row['status'], row['attempts']) == ('pending', 1)
+    assert row['next_attempt_at'] >= int(time.time()) + 59
+    assert row['last_error']
+
+    # Not due yet: a dispatch now leaves it alone
+    dispatcher._dispatch([row_id])
+    assert rows(pool)[0]['attempts'] == 1
+
+    conn = pool.acquire()
+    conn.execute('UPDATE email_outbox SET next_attempt_at = 0')
+    conn.commit()
+    conn.close()
+    dispatcher._dispatch([row_id])
+    assert (rows(pool)[0]['status'], rows(pool)[0]['attempts']) == ('dead', 2)
+
+
+def test_unconfigured_mailer_keeps_mail_queued(pool):
+    dispatcher = OutboxDispatcher(pool.acquire, Mailer('', 0))
+    [row_id] = queue(pool)
+    dispatcher._dispatch([row_id])
+    [row] = rows(pool)
+    assert row['status'] == 'pending'
+    assert 'not configured' in row['last_error']
+
+
+def test_gate_coalesces_per_key_within_the_window(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: clock[0])
+    gate = CoalescingGate(window=300, max_pending=10)
+    assert gate.admit('a', lambda: 0)
+    assert not gate.admit('a', lambda: 0)
+    assert gate.admit('b', lambda: 0)
+    clock[0] += 300
+    assert gate.admit('a', lambda: 0)
+    assert gate.stats() == {'queued': 3, 'coalesced': 1, 'dropped': 0, 'tracked_keys': 2}
+
+
+def test_gate_drops_when_the_queue_is_full_without_holding_the_key():
+    gate = CoalescingGate(window=300, max_pending=2)
+    counted = []
+
+    def pending():
+        counted.append(1)
+        return 2
+
+    assert not gate.admit('a', pending)
+    assert gate.admit('a', lambda: 1)  # the dropped alert did not reserve the window
+    assert not gate.admit('a', pending)  # now coalesced: the queue is not even counted
+    assert len(counted) == 1
+    assert gate.stats()['dropped'] == 1
@@ -0,0 +1,70 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+from conftest import USER_EMAIL
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import check_query_plans  # noqa: E402
+
+
+def test_static_statements_use_indexes(capsys):
+    assert check_query_plans.main([]) == 0
+    out = capsys.readouterr().out
+    for source in check_query_plans.SOURCES:
+        assert f'from {check_query_plans.ROOT / source}' in out
+
+
+def test_unmatched_allowlist_entry_fails(monkeypatch, capsys):
+    monkeypatch.setattr(check_query_plans, 'ALLOWED_INDEX_SCANS', check_query_plans.ALLOWED_INDEX_SCANS | {'SELECT 1 FROM gone'})
+    assert check_query_plans.main([]) == 1
+    assert 'matches no statement: SELECT 1 FROM gone' in capsys.readouterr().out
+
+
+def test_full_scan_is_reported():
+    conn = sqlite3.connect(':memory:')
+    check_query_plans.run_migrations(conn)
+    assert check_query_plans.explain_problems(conn, 'SELECT id FROM tasks WHERE title = ?')
+    assert check_query_plans.explain_problems(conn, 'SELECT id FROM tasks WHERE user_email = ?') == []
+    with pytest.raises(sqlite3.Error):
+        check_query_plans.explain_problems(conn, 'SELECT nope FROM tasks')
+    conn.close()
+
+
+@pytest.fixture
+def traced_sql(momcare, monkeypatch):
+    """Every statement the app runs on a pooled connection during the test."""
+    seen = []
+    monkeypatch.setattr(momcare.db_pool, 'on_query', lambda sql, seconds, rows: seen.append(sql))
+    return seen
+
+
+def test_request_built_queries_use_indexes(client, db_path, traced_sql):
+    conn = sqlite3.connect(db_path)
+    for i, (task_date, start_time) in enumerate([(None, None), (None, 8), ('2026-01-01', None), ('2026-01-01', 9), ('2026-01-02', 9)]):
+        conn.execute('INSERT INTO tasks (user_email, title, task_date, start_time, duration) VALUES (?, ?, ?, ?, 1)',
+                     (USER_EMAIL, f'task {i}', task_date, start_time))
+    conn.commit()
+
+    # Page one row at a time so every NULL combination of the keyset cursor is used
+    for query in ('', '&from=2026-01-01&to=2026-01-31', '&completed=0', '&fields=title'):
+        cursor = None
+        while True:
+            resp = client.get(f'/api/tasks?limit=1{query}' + (f'&cursor={cursor}' if cursor else ''))
+            assert resp.status_code == 200
+            resp.close()
+            cursor = resp.headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+    client.get('/api/tasks?from=2026-01-01').close()
+    assert client.get('/api/dashboard/summary').status_code == 200
+
+    statements = {sql for sql in traced_sql if sql.lstrip().upper().startswith(('SELECT', 'WITH'))}
+    assert any('(task_date, start_time, id) >' in sql for sql in statements)
+    assert any('task_date IS NULL' in sql for sql in statements)
+    problems = {sql: check_query_plans.explain_problems(conn, sql) for sql in statements}
+    conn.close()
+    assert {sql: p for sql, p in problems.items() if p} == {}
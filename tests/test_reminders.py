@@ -0,0 +1,54 @@
+import sqlite3
+
+import pytest
+
+from conftest import USER_EMAIL
+
+
+def raw_insert(db_path, remind_at):
+    """Insert the way older scripts did: no remind_at_epoch."""
+    conn = sqlite3.connect(db_path)
+    conn.execute('INSERT INTO reminder_items (user_email, title, remind_at) VALUES (?, ?, ?)', (USER_EMAIL, 'r', remind_at))
+    conn.commit()
+    conn.close()
+
+
+def sync_clock(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('SELECT version FROM sync_clock').fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize('remind_at', ['garbage', '2026-13-01T09:00', 5, '2026-01-05T09:00+02:00'])
+def test_create_rejects_invalid_remind_at(client, remind_at):
+    resp = client.post('/api/reminders', json={'title': 'call', 'remind_at': remind_at})
+    assert resp.status_code == 400
+
+
+def test_create_and_update_accept_iso_times(client):
+    resp = client.post('/api/reminders', json={'title': 'call', 'remind_at': '2026-01-05T09:30'})
+    assert resp.status_code == 201
+    item_id = resp.get_json()['id']
+    assert client.put(f'/api/reminders/{item_id}', json={'title': 'call', 'remind_at': 'soon'}).status_code == 400
+    assert client.put(f'/api/reminders/{item_id}', json={'title': 'call', 'remind_at': ''}).status_code == 200
+
+
+def test_load_backfills_parseable_rows_once(momcare, db_path):
+    raw_insert(db_path, '2030-01-01T09:00')
+    rows = momcare.load_upcoming_reminders(10)
+    assert len(rows) == 1
+    clock = sync_clock(db_path)
+    assert momcare.load_upcoming_reminders(10) == rows
+    assert sync_clock(db_path) == clock
+
+
+def test_load_leaves_unparseable_rows_alone(momcare, db_path):
+    raw_insert(db_path, '')
+    raw_insert(db_path, 'not a date')
+    clock = sync_clock(db_path)
+    for _ in range(3):
+        assert momcare.load_upcoming_reminders(10) == []
+    # No commits: the sync clock (and data_version) would otherwise wake the workers again
+    assert sync_clock(db_path) == clock
@@ -0,0 +1,64 @@
+import pytest
+
+from sqltrace import SQLTracer, normalize_sql
+
+
+def test_normalize_folds_literals_and_in_lists():
+    assert normalize_sql("SELECT *  FROM t\n WHERE a = 'x''y' AND b = 3.5 AND c IN (?, ?,?)") == \
+        'SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...)'
+    assert normalize_sql('SELECT * FROM t WHERE c IN (?)') == normalize_sql('SELECT * FROM t WHERE c IN (?, ?)')
+
+
+def test_statements_are_aggregated_and_slowest_kept(tmp_path):
+    log = tmp_path / 'logs' / 'slow.log'
+    tracer = SQLTracer(slow_ms=10, top_n=2, log_path=str(log))
+    tracer.record('SELECT * FROM t WHERE id = 1', 0.001, 1, 'a')
+    tracer.record('SELECT * FROM t WHERE id = 2', 0.003, 1, 'a')
+    for ms in (20, 50, 30):
+        tracer.record('UPDATE t SET x = 1', ms / 1000, 5, 'b')
+
+    report = tracer.report()
+    assert [(s['sql'], s['count'], s['rows']) for s in report['statements']] == [
+        ('UPDATE t SET x = ?', 3, 15), ('SELECT * FROM t WHERE id = ?', 2, 2)]
+    assert [s['ms'] for s in report['slowest']] == [50, 30]
+    assert tracer.stats() == {'statements': 2, 'executions': 5, 'slow': 3, 'repeat_patterns': 0}
+    lines = log.read_text().splitlines()
+    assert len(lines) == 3 and all('route=b UPDATE t SET x = ?' in line for line in lines)
+
+    tracer.set_log_path(None)
+    tracer.record('UPDATE t SET x = 1', 1, 0)
+    assert len(log.read_text().splitlines()) == 3
+
+
+def test_repeats_at_the_threshold_are_flagged():
+    tracer = SQLTracer(repeat_threshold=3)
+    assert tracer.check_repeats('r', {'SELECT ?': 2}) == []
+    assert tracer.check_repeats('r', {'SELECT ?': 3, 'SELECT 1': 1}) == ['SELECT ?']
+    tracer.check_repeats('r', {'SELECT ?': 7})
+    assert tracer.report()['repeated'] == [{'route': 'r', 'sql': 'SELECT ?', 'requests': 2, 'max_per_request': 7}]
+
+
+@pytest.fixture
+def tracer(momcare, monkeypatch):
+    tracer = SQLTracer(repeat_threshold=5)
+    monkeypatch.setattr(momcare, 'sql_tracer', tracer)
+    return tracer
+
+
+def test_n_plus_one_in_a_request_is_detected(momcare, tracer):
+    with momcare.app.test_request_context('/api/tasks'):
+        momcare.start_request_timer()
+        conn = momcare.get_db()
+        for task_id in range(6):
+            conn.execute('SELECT title FROM tasks WHERE id = ?', (task_id,)).fetchall()
+        conn.execute('SELECT COUNT(*) FROM tasks').fetchall()
+        momcare.record_request_metrics(momcare.app.response_class())
+    assert tracer.report()['repeated'] == [
+        {'route': 'api_get_tasks', 'sql': 'SELECT title FROM tasks WHERE id = ?', 'requests': 1, 'max_per_request': 6}]
+
+
+def test_normal_requests_are_not_flagged(client, tracer):
+    client.get('/api/dashboard/summary')
+    client.get('/api/tasks').close()
+    assert tracer.report()['repeated'] == []
+    assert tracer.stats()['executions'] >= 3
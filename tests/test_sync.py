@@ -0,0 +1,74 @@
+import sqlite3
+
+
+def sync(client, since=None):
+    resp = client.get('/api/sync' + (f'?since={since}' if since is not None else ''))
+    assert resp.status_code == 200
+    return resp.get_json()
+
+
+def new_task(client, title, start_time):
+    resp = client.post('/api/tasks', json={'title': title, 'task_date': '2099-01-05', 'start_time': start_time, 'duration': 1})
+    assert resp.status_code == 201
+    return resp.get_json()['id']
+
+
+def test_delta_after_snapshot(client, db_path):
+    walk, nap = new_task(client, 'walk', 9), new_task(client, 'nap', 13)
+    client.post('/api/groceries', json={'item_name': 'Milk'})
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO tasks (user_email, title) VALUES ('someone@else.com', 'not mine')")
+    conn.commit()
+    conn.close()
+
+    snapshot = sync(client)
+    assert sorted(t['title'] for t in snapshot['changes']['tasks']) == ['nap', 'walk']
+    assert [g['item_name'] for g in snapshot['changes']['groceries']] == ['Milk']
+    assert not snapshot['reset'] and not snapshot['has_more']
+
+    client.put(f'/api/tasks/{walk}', json={'completed': True})
+    client.delete(f'/api/tasks/{nap}')
+    delta = sync(client, snapshot['version'])
+    assert [(t['id'], t['completed']) for t in delta['changes']['tasks']] == [(walk, True)]
+    assert delta['changes']['groceries'] == []
+    assert delta['deleted'] == {'tasks': [nap], 'reminders': [], 'expenses': [], 'groceries': []}
+    assert delta['version'] > snapshot['version']
+
+    # Nothing new: same token back, empty delta
+    again = sync(client, delta['version'])
+    assert again['version'] == delta['version']
+    assert all(rows == [] for rows in again['changes'].values())
+
+
+def test_pages_cover_every_change(momcare, client, monkeypatch):
+    ids = {new_task(client, f'task {i}', i) for i in range(7)}
+    monkeypatch.setattr(momcare, 'SYNC_PAGE_MAX', 3)
+    seen, since, calls = set(), 0, 0
+    while True:
+        body = sync(client, since)
+        seen |= {t['id'] for t in body['changes']['tasks']}
+        since, calls = body['version'], calls + 1
+        if not body['has_more']:
+            break
+    assert seen == ids
+    assert calls == 3
+
+
+def test_stale_tokens_reset(client, db_path):
+    new_task(client, 'walk', 9)
+    version = sync(client)['version']
+    assert sync(client, version + 100)['reset']
+
+    conn = sqlite3.connect(db_path)
+    conn.execute('UPDATE sync_clock SET tombstones_pruned_through = ?', (version + 1,))
+    conn.commit()
+    conn.close()
+    new_task(client, 'nap', 13)
+    body = sync(client, version)
+    assert body['reset']
+    assert sorted(t['title'] for t in body['changes']['tasks']) == ['nap', 'walk']
+
+
+def test_bad_requests(momcare, client):
+    assert client.get('/api/sync?since=abc').status_code == 400
+    assert momcare.app.test_client().get('/api/sync').status_code == 401
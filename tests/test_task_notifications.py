@@ -0,0 +1,34 @@
+import sqlite3
+from datetime import datetime
+
+from conftest import USER_EMAIL
+
+
+def add_task(db_path, start_time, title='walk'):
+    conn = sqlite3.connect(db_path)
+    cur = conn.execute(
+        'INSERT INTO tasks (user_email, title, task_date, start_time, duration) VALUES (?, ?, ?, ?, 1)',
+        (USER_EMAIL, title, datetime.now().strftime('%Y-%m-%d'), start_time),
+    )
+    conn.commit()
+    conn.close()
+    return cur.lastrowid
+
+
+def test_load_skips_rows_with_text_start_times(momcare, db_path):
+    soon = momcare.hours_since_midnight(datetime.now()) + 0.1
+    good = add_task(db_path, soon)
+    add_task(db_path, '9am', title='legacy')
+    assert [task_id for _, task_id in momcare.load_upcoming_tasks(10)] == [good]
+
+
+def test_due_task_is_queued_once_and_flagged(momcare, db_path):
+    task_id = add_task(db_path, momcare.hours_since_midnight(datetime.now()) + 0.1)
+    momcare.queue_due_task_notifications([task_id])
+    momcare.queue_due_task_notifications([task_id])
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT notified FROM tasks').fetchone()[0] == 1
+    assert conn.execute('SELECT to_email FROM email_outbox').fetchall() == [(USER_EMAIL,)]
+    conn.close()
+    assert momcare.load_upcoming_tasks(10) == []
@@ -0,0 +1,54 @@
+import random
+import threading
+
+import pytest
+
+from tips import EVAL_PREFIXES, FACTOR_TIPS, GOOD_TIPS, pick_wellness_tip
+
+
+def split(tip, score):
+    prefixes = next(p for floor, p in EVAL_PREFIXES if score >= floor)
+    prefix = next(p for p in prefixes if tip.startswith(p + ' '))
+    return prefix, tip[len(prefix) + 1:]
+
+
+def test_same_inputs_same_tip():
+    args = ('mom@example.com', '2026-01-05', 72, 'sleep')
+    assert len({pick_wellness_tip(*args) for _ in range(5)}) == 1
+
+
+def test_tip_does_not_touch_the_global_rng():
+    random.seed(42)
+    expected = random.random()
+    random.seed(42)
+    pick_wellness_tip('mom@example.com', '2026-01-05', 55, 'water')
+    assert random.random() == expected
+
+
+@pytest.mark.parametrize('score, factor, pool', [
+    (95, 'sleep', GOOD_TIPS),
+    (72, 'water', FACTOR_TIPS['water']),
+    (10, 'activity', FACTOR_TIPS['activity']),
+    (50, 'unknown', FACTOR_TIPS['stress']),
+])
+def test_tip_comes_from_the_tier_and_factor(score, factor, pool):
+    _, tip = split(pick_wellness_tip('mom@example.com', '2026-01-05', score, factor), score)
+    assert tip in pool
+
+
+def test_tips_vary_across_days_and_agree_across_threads():
+    days = [f'2026-01-{d:02d}' for d in range(1, 29)]
+    serial = [pick_wellness_tip('mom@example.com', d, 65, 'stress') for d in days]
+    assert len(set(serial)) > 1
+
+    results = {}
+
+    def pick(day):
+        results[day] = pick_wellness_tip('mom@example.com', day, 65, 'stress')
+
+    threads = [threading.Thread(target=pick, args=(d,)) for d in days]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [results[d] for d in days] == serial
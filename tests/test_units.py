@@ -0,0 +1,57 @@
+import sqlite3
+
+import pytest
+
+from conftest import USER_EMAIL
+from units import compute_bmi, parse_height, parse_number, parse_weight
+
+
+@pytest.mark.parametrize('raw, metres', [
+    ('165 cm', 1.65),
+    ("5'4\"", 64 * 0.0254),
+    ('5 ft 6 in', 66 * 0.0254),
+    ('5 feet', 60 * 0.0254),
+    ('64 in', 64 * 0.0254),
+    ('1.70', 1.70),
+    ('158', 1.58),
+    ('  165 CM ', 1.65),
+    ('', 0.0),
+    (None, 0.0),
+    ('tall', 0.0),
+])
+def test_parse_height(raw, metres):
+    assert parse_height(raw) == pytest.approx(metres)
+
+
+@pytest.mark.parametrize('raw, kg', [
+    ('60 kg', 60.0),
+    ('130 lbs', 130 * 0.453592),
+    ('145 Pounds', 145 * 0.453592),
+    ('72', 72.0),
+    ('', 0.0),
+    ('heavy', 0.0),
+])
+def test_parse_weight(raw, kg):
+    assert parse_weight(raw) == pytest.approx(kg)
+
+
+def test_parse_number_and_bmi():
+    assert parse_number('7.5 hrs') == 7.5
+    assert parse_number('none', default=8) == 8
+    assert parse_number(None) == 0.0
+    assert compute_bmi(1.6, 64) == 25.0
+    assert compute_bmi(0, 64) is None
+    assert compute_bmi(1.6, None) is None
+
+
+def test_profile_edit_stores_parsed_measurements(client, db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO users (id, first, last, email, password_hash) VALUES (1, 'Ana', 'Cruz', ?, 'x')", (USER_EMAIL,))
+    conn.commit()
+    form = {'first_name': 'Ana', 'last_name': 'Cruz', 'email': USER_EMAIL, 'birthdate': '1990-01-01', 'gender': 'F',
+            'height': "5'4\"", 'weight': '130 lbs'}
+    client.post('/profile/edit/1', data=form)
+    height_m, weight_kg = conn.execute('SELECT height_m, weight_kg FROM users WHERE id = 1').fetchone()
+    conn.close()
+    assert height_m == pytest.approx(64 * 0.0254)
+    assert weight_kg == pytest.approx(130 * 0.453592)
@@ -0,0 +1,72 @@
+import sqlite3
+import time
+
+import pytest
+
+from conftest import USER_EMAIL
+from leases import LeaderLease
+from migrations import run_migrations
+
+
+@pytest.fixture
+def lease_pair(db_path):
+    conns = [sqlite3.connect(db_path) for _ in range(2)]
+    run_migrations(conns[0])
+    yield [LeaderLease(conn, 'background-workers', ttl=30) for conn in conns]
+    for conn in conns:
+        conn.close()
+
+
+def test_one_holder_at_a_time(lease_pair):
+    first, second = lease_pair
+    assert first.renew() and first.renew()
+    assert not second.renew()
+    assert second.current_holder()[0] == first.holder
+
+
+def test_expired_lease_is_taken_over(lease_pair, monkeypatch):
+    first, second = lease_pair
+    now = time.time()
+    assert first.renew()
+    monkeypatch.setattr(time, 'time', lambda: now + 31)
+    assert second.renew()
+    # The old holder finds out on its next heartbeat
+    assert not first.renew()
+    assert not first.is_leader
+
+
+def test_release_hands_over_immediately(lease_pair):
+    first, second = lease_pair
+    assert first.renew()
+    first.release()
+    assert second.renew()
+    # Releasing a lease held by someone else changes nothing
+    first.release()
+    assert second.current_holder()[0] == second.holder
+
+
+def test_only_schedulers_whose_table_changed_are_woken(momcare, db_path):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    counters, changed = momcare.poll_table_changes(conn, None)
+    assert changed == []
+
+    def write(sql, *params):
+        nonlocal counters
+        conn.execute(sql, params)
+        counters, changed = momcare.poll_table_changes(conn, counters)
+        return changed
+
+    task_id = conn.execute("INSERT INTO tasks (user_email, title, task_date, start_time, duration) VALUES (?, 'walk', '2026-01-05', 9, 1)",
+                           (USER_EMAIL,)).lastrowid
+    counters, changed = momcare.poll_table_changes(conn, counters)
+    assert changed == [momcare.task_scheduler]
+
+    assert write('UPDATE tasks SET start_time = 10 WHERE id = ?', task_id) == [momcare.task_scheduler]
+    # The worker's own bookkeeping and unrelated tables wake nobody
+    assert write('UPDATE tasks SET notified = 1 WHERE id = ?', task_id) == []
+    assert write("INSERT INTO expenses (user_email, month_iso, category, amount) VALUES (?, '2026-01', 'Food', 5)", USER_EMAIL) == []
+    assert write("UPDATE email_outbox SET status = 'sent'") == []
+
+    assert write("INSERT INTO reminder_items (user_email, title, remind_at) VALUES (?, 'pills', '2026-01-05T09:00')", USER_EMAIL) == [momcare.reminder_scheduler]
+    assert write("INSERT INTO email_outbox (to_email, subject, body, next_attempt_at) VALUES (?, 's', 'b', 0)", USER_EMAIL) == [momcare.email_outbox.scheduler]
+    conn.close()
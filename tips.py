@@ -0,0 +1,63 @@
+"""
+Wellness tip selection.
+
+A tip is picked from fixed tables by a stable hash of its key (user, day,
+score, weakest factor), so the same inputs always give the same tip in any
+thread or process, without touching the global random module.
+"""
+import hashlib
+
+# (minimum overall score, evaluation prefixes), highest tier first
+EVAL_PREFIXES = (
+    (90, ('Outstanding wellness!', 'Exceptional work!', 'You are thriving!')),
+    (80, ('Excellent progress!', 'Great consistency!', 'Looking very good!')),
+    (70, ('Good job!', 'Solid effort.', 'You are on the right track.')),
+    (60, ('Fair effort.', 'Making progress.', 'Some fine-tuning needed.')),
+    (40, ('Needs improvement.', 'Room for growth.', 'Let us focus a bit more.')),
+    (0, ('Action required.', 'Please prioritize your well-being.', 'Take a step back to care for yourself.')),
+)
+
+GOOD_TIPS = (
+    'Keep up the healthy habits.',
+    'Maintain your routine for optimal wellness.',
+    'You are balancing things perfectly.',
+)
+
+FACTOR_TIPS = {
+    'sleep': (
+        'Try going to bed 15 minutes earlier tonight.',
+        'Avoid screens for an hour before bed.',
+        'A consistent bedtime routine can greatly improve your rest.',
+    ),
+    'water': (
+        'Try drinking a full glass of water right now!',
+        'Keep a reusable water bottle near you.',
+        'Sip water every hour to stay hydrated.',
+    ),
+    'activity': (
+        'Adding 10 minutes of light stretching can help.',
+        'Try taking a short walk outside.',
+        'Consider a quick 15-minute home workout.',
+    ),
+    'stress': (
+        'Try taking 5 minutes for deep breathing.',
+        'Consider a quick meditation or a warm bath.',
+        'Step away from work for a brief mental reset.',
+    ),
+}
+
+
+def _stable_indexes(key, *sizes):
+    """One index per size, derived from independent bytes of sha256(key)."""
+    digest = hashlib.sha256(key.encode('utf-8')).digest()
+    return [int.from_bytes(digest[i * 4:i * 4 + 4], 'big') % size for i, size in enumerate(sizes)]
+
+
+def pick_wellness_tip(user_email, date_iso, overall_score, weakest_factor):
+    """Evaluation prefix for the score tier plus a tip for the weakest factor."""
+    prefixes = next(p for floor, p in EVAL_PREFIXES if overall_score >= floor)
+    tips = GOOD_TIPS if overall_score >= 90 else FACTOR_TIPS.get(weakest_factor, FACTOR_TIPS['stress'])
+    prefix_idx, tip_idx = _stable_indexes(
+        f"{user_email}_{date_iso}_{overall_score}_{weakest_factor}", len(prefixes), len(tips)
+    )
+    return f"{prefixes[prefix_idx]} {tips[tip_idx]}"
@@ -0,0 +1,85 @@
+"""
+Parsers for the free-text values users type into their profile and wellness
+log ("5'4\"", "165 cm", "130 lbs", "7.5 hrs").
+
+Patterns are compiled once and results are memoized on the normalized
+string, so repeated values (the common case) cost a dict lookup.
+"""
+import re
+from functools import lru_cache
+
+NUMBER_RE = re.compile(r'\d+\.?\d*')
+
+CM_PER_M = 100.0
+M_PER_INCH = 0.0254
+KG_PER_LB = 0.453592
+
+
+def _normalize(val):
+    if val is None:
+        return ''
+    return str(val).strip().lower()
+
+
+@lru_cache(maxsize=4096)
+def _first_number(val_str):
+    match = NUMBER_RE.search(val_str)
+    return float(match.group(0)) if match else None
+
+
+def parse_number(val, default=0.0):
+    """First number in val, or default if val is empty or has no digits."""
+    if not val:
+        return default
+    number = _first_number(_normalize(val))
+    return default if number is None else number
+
+
+@lru_cache(maxsize=4096)
+def _parse_height(val_str):
+    if val_str in ('', '0'):
+        return 0.0
+    numbers = NUMBER_RE.findall(val_str)
+    if not numbers:
+        return 0.0
+    if 'cm' in val_str:
+        return float(numbers[0]) / CM_PER_M
+    # Feet first: "5'4\"" and "5 ft 4 in" also contain the inch markers
+    if 'ft' in val_str or 'feet' in val_str or "'" in val_str:
+        feet = float(numbers[0])
+        inches = float(numbers[1]) if len(numbers) > 1 else 0
+        return (feet * 12 + inches) * M_PER_INCH
+    if 'in' in val_str or '"' in val_str:
+        return float(numbers[0]) * M_PER_INCH
+    # Bare number: metres if it is plausibly one ("1.65"), otherwise cm
+    value = float(numbers[0])
+    return value if value < 3 else value / CM_PER_M
+
+
+def parse_height(val):
+    """Height in metres; bare numbers are centimetres (metres below 3). 0.0 if unset."""
+    return _parse_height(_normalize(val))
+
+
+@lru_cache(maxsize=4096)
+def _parse_weight(val_str):
+    if val_str in ('', '0'):
+        return 0.0
+    number = _first_number(val_str)
+    if number is None:
+        return 0.0
+    if 'lb' in val_str or 'pounds' in val_str:
+        return number * KG_PER_LB
+    return number  # assume kg
+
+
+def parse_weight(val):
+    """Weight in kilograms; bare numbers are kilograms. 0.0 if unset."""
+    return _parse_weight(_normalize(val))
+
+
+def compute_bmi(height_m, weight_kg):
+    """BMI rounded to one decimal, or None if either value is missing."""
+    if not height_m or not weight_kg or height_m <= 0 or weight_kg <= 0:
+        return None
+    return round(weight_kg / (height_m * height_m), 1)
@@ -0,0 +1,33 @@
+"""
+Standalone background worker process.
+
+Runs the task notification, scheduled reminder and email outbox workers
+without serving requests. Start the web processes with
+MOMCARE_BACKGROUND_WORKERS=off and run this once per deployment:
+
+    MOMCARE_BACKGROUND_WORKERS=off gunicorn 'app:create_app()'
+    python worker.py
+
+Starting more than one is safe; only the lease holder sends anything.
+"""
+import signal
+
+import app
+
+
+def main():
+    app.create_app({'BACKGROUND_WORKERS': False})
+    signal.signal(signal.SIGTERM, lambda *_: app.background_stop.set())
+    print("[WORKER] Running background workers; Ctrl+C to stop", flush=True)
+    thread = app.start_background_workers()
+    try:
+        while thread.is_alive():
+            thread.join(1)
+    except KeyboardInterrupt:
+        app.background_stop.set()
+        thread.join()
+    app.mailer.close()
+
+
+if __name__ == '__main__':
+    main()